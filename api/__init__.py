@@ -5,7 +5,7 @@ from api.exceptions import (
     AuthenticationError
 )
 
-from api.models import Song, SetListInfo
+from api.models import Song, SetListInfo, PlaylistWriteResult
 
 from api.setlistfm import SetlistFMClient, SetlistFMError
 
@@ -20,6 +20,7 @@ __all__ = [
     # Models
     'Song',
     'SetListInfo',
+    'PlaylistWriteResult',
     # Clients
     'SetlistFMClient',
     'SetlistFMError',
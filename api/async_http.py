@@ -0,0 +1,195 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
+
+from api.exceptions import APIError
+from api.cache_policy import conditional_headers
+from api.utils import AdaptiveConcurrency, CacheBackend, RateLimiter, RequestHandler
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Injected clients work without httpx installed; nothing they raise is then
+# taken for a transport error, since ``except ()`` matches nothing
+TRANSPORT_ERRORS = (httpx.TransportError,) if httpx is not None else ()
+TIMEOUT_ERRORS = (httpx.TimeoutException,) if httpx is not None else ()
+
+logger = logging.getLogger(__name__)
+
+def build_async_client(pool_size = 10, http2 = True, timeout = 30.0, **kwargs):
+    """Pooled ``httpx.AsyncClient``; speaks HTTP/2 when the h2 package is installed."""
+    if httpx is None:
+        raise ImportError("The async clients require the httpx package")
+    return httpx.AsyncClient(
+        http2=http2 and importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        timeout=timeout,
+        **kwargs
+    )
+
+async def run_blocking(blocking, fn, *args):
+    """``fn(*args)``, on a worker thread when ``blocking`` says it may wait on I/O."""
+    if not blocking:
+        return fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+class AsyncSingleFlight:
+    """``SingleFlight`` for coroutines: concurrent awaits of one key share one execution."""
+
+    def __init__(self):
+        self.in_flight = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield: one waiter being cancelled must not cancel the shared call
+            return await asyncio.shield(future)
+
+        self.executions += 1
+        future = self.in_flight[key] = asyncio.ensure_future(fn(*args, **kwargs))
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                del self.in_flight[key]
+            else:
+                future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+
+class AsyncAdaptiveConcurrency(AdaptiveConcurrency):
+    """``AdaptiveConcurrency`` for coroutines: callers over the limit await a free slot."""
+
+    def __init__(self, max_limit = 8, min_limit = 1, cooldown = 1.0):
+        super().__init__(max_limit, min_limit, cooldown)
+        self.condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, throttled = False):
+        async with self.condition:
+            self.in_flight -= 1
+            self._adjust(throttled)
+            self.condition.notify_all()
+
+class AsyncRequestHandler(RequestHandler):
+    """``RequestHandler`` on an async HTTP client.
+
+    Caching (per-endpoint freshness, stale-while-revalidate and conditional
+    revalidation), single-flight, rate limiting, the AIMD rate controller
+    and the retry policy (Retry-After on 429, full-jitter backoff on 5xx
+    and transport errors, an overall retry deadline) come from the shared
+    helpers on ``RequestHandler``; only the I/O differs: waits are awaited
+    instead of slept and refreshes run as tasks.
+
+    A cache backend that blocks (SQLite, Redis) is called from the default
+    executor's worker threads instead of the event loop, along with the
+    response handling that stores into it. Those threads then bound how
+    many cache calls run at once; the in-memory ``CacheManager`` is used
+    on the loop directly.
+    """
+
+    def __init__(self, api_key, rate_limiter: RateLimiter, cache: CacheBackend, client = None, base_url = None,
+                 pool_size = 10, **kwargs):
+        super().__init__(
+            api_key, rate_limiter, cache, session=client or build_async_client(pool_size), base_url=base_url, **kwargs
+        )
+        self.single_flight = AsyncSingleFlight()
+        self._refresh_tasks = set()
+
+    async def make_request(self, endpoint, params = None, use_cache = True, max_retries = 3):
+        cache_key = self._cache_key(endpoint, params)
+
+        if use_cache:
+            entry = await run_blocking(self.cache.blocking, self._cached, cache_key)
+            if entry is not None:
+                return self._serve_cached(entry, endpoint, params, max_retries, cache_key)
+
+        return await self.single_flight.do(
+            cache_key, self._fetch, endpoint, params, use_cache, max_retries, cache_key
+        )
+
+    def _refresh(self, endpoint, params, max_retries, cache_key, entry):
+        """Revalidate a stale entry in a background task, once per key at a time."""
+        if cache_key in self._refreshing:
+            return
+        self._refreshing.add(cache_key)
+
+        async def refresh():
+            try:
+                await self.single_flight.do(cache_key, self._fetch, endpoint, params, True, max_retries, cache_key, entry)
+                self._count("background_refreshes")
+            except Exception as e:
+                logger.warning(f"Background refresh of {endpoint} failed: {e}")
+            finally:
+                self._refreshing.discard(cache_key)
+
+        # The task set keeps a reference until the refresh finishes
+        task = asyncio.ensure_future(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _fetch(self, endpoint, params, use_cache, max_retries, cache_key, stale = None):
+        if use_cache and stale is None:
+            entry = await run_blocking(self.cache.blocking, self._cached, cache_key)
+            if entry is not None:
+                return self._hit(endpoint, entry)
+
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        deadline = time.monotonic() + self.retry_deadline
+
+        for attempt in range(max_retries):
+            await self.rate_limiter.acquire_async()
+            logger.info(f"Making async request to: {url} (attempt {attempt + 1})")
+            self._count("requests")
+
+            try:
+                response = await self.session.get(url, params=params, headers=conditional_headers(stale))
+            except TRANSPORT_ERRORS as e:
+                error, delay = self._transport_error(e, attempt, timed_out=isinstance(e, TIMEOUT_ERRORS))
+            else:
+                result, error, delay = await run_blocking(
+                    self.cache.blocking, self._handle_response,
+                    response, endpoint, params, use_cache, cache_key, stale, attempt
+                )
+                if error is None:
+                    return result
+
+            self._check_retry(endpoint, attempt, max_retries, deadline, error, delay)
+            await asyncio.sleep(delay)
+
+        raise APIError("max retries exceeded")
+
+    async def aclose(self):
+        await self.session.aclose()
+
+class EventLoopThread:
+    """An asyncio event loop running on a daemon thread.
+
+    Async clients and their connection pools belong to one loop, so a
+    sync Flask worker submits coroutines here with ``run`` instead of
+    starting a loop per request. Many requests' upstream calls then
+    share the loop and its connections.
+    """
+
+    def __init__(self, name = "async-clients"):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout = None):
+        """Run ``coro`` on the loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
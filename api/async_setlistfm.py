@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Dict, Iterable, List
+
+from api.async_http import AsyncRequestHandler, run_blocking
+from api.cache_policy import CachePolicies
+from api.exceptions import NotFoundError
+from api.models import Song
+from api.setlistfm import DataParser, _page_count, _take_recent
+from api.utils import AIMDRateController, CacheBackend, CacheManager, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+class AsyncSetlistFMClient:
+    """Async counterpart of ``SetlistFMClient`` with the same caching and rate limiting.
+
+    Pass the sync client's cache, rate limiter and the rate controller of
+    its request handler to share them with it.
+    """
+
+    def __init__(self, api_key, cache_ttl = 300, pool_size = 10, base_url = None, cache: CacheBackend = None,
+                 rate_limiter: RateLimiter = None, artist_mbid_ttl = 7 * 86400, client = None,
+                 cache_policies: CachePolicies = None, rate_controller: AIMDRateController = None):
+        self.api_key = api_key
+        self.artist_mbid_ttl = artist_mbid_ttl
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.cache = cache if cache is not None else CacheManager(default_ttl=cache_ttl)
+        self.request_handler = AsyncRequestHandler(
+            api_key, self.rate_limiter, self.cache, client=client, base_url=base_url, pool_size=pool_size,
+            cache_policies=cache_policies or CachePolicies(default_ttl=cache_ttl), rate_controller=rate_controller
+        )
+        self.parser = DataParser()
+
+    async def search_artist(self, artist_name, page = 1):
+        params = {
+            'artistName': artist_name,
+            'p': page,
+            'sort': 'relevance'
+        }
+        data = await self.request_handler.make_request('search/artists', params)
+        return self.parser.parse_artist_search(data)
+
+    async def get_artist_setlists_page(self, artistmbid, page):
+        return await self.request_handler.make_request(f'/artist/{artistmbid}/setlists', {'p': page})
+
+    async def get_artist_setlists(self, artistmbid, page = 1):
+        return self.parser.parse_setlist_search(await self.get_artist_setlists_page(artistmbid, page))
+
+    async def get_artist_setlists_pages(self, artistmbid, page_limit = 5):
+        """Setlists from the first ``page_limit`` pages, fetching pages 2.. concurrently."""
+        first_page = await self.get_artist_setlists_page(artistmbid, 1)
+        last_page = min(page_limit, _page_count(first_page))
+        # The shared rate limiter still paces the requests gather starts together
+        rest = await asyncio.gather(*(
+            self.get_artist_setlists(artistmbid, page) for page in range(2, last_page + 1)
+        ))
+        setlists = self.parser.parse_setlist_search(first_page)
+        for page in rest:
+            setlists.extend(page)
+        return setlists
+
+    async def resolve_artist_mbid(self, artist_name):
+        key = f"artist-mbid:{artist_name.strip().lower()}"
+        mbid = await run_blocking(self.cache.blocking, self.cache.get, key)
+        if mbid is not None:
+            return mbid
+
+        artists = await self.search_artist(artist_name)
+        if not artists:
+            raise NotFoundError(f"{artist_name} was not found")
+
+        mbid = artists[0]['mbid']
+        await run_blocking(self.cache.blocking, self.cache.set, key, mbid, self.artist_mbid_ttl)
+        return mbid
+
+    async def get_recent_setlists(self, artist_name = None, days = 365, limit = 20, artist_mbid = None):
+        artist_mbid = artist_mbid or await self.resolve_artist_mbid(artist_name)
+        cutoff = date.today() - timedelta(days=days)
+        recent = []
+        page = 1
+
+        while len(recent) < limit:
+            data = await self.get_artist_setlists_page(artist_mbid, page)
+            taken, done = _take_recent(self.parser.parse_setlist_search(data), cutoff, limit - len(recent))
+            recent.extend(taken)
+            if done or page >= _page_count(data):
+                break
+            page += 1
+
+        return recent
+
+    async def get_setlist_songs(self, setlist_id) -> List[Song]:
+        data = await self.request_handler.make_request(f'/setlist/{setlist_id}')
+        return self.parser.parse_setlist_songs(data)
+
+    async def get_setlists_songs(self, setlist_ids: Iterable[str]) -> Dict[str, List[Song]]:
+        """Songs of several setlists, fetched concurrently."""
+        setlist_ids = list(dict.fromkeys(setlist_ids))
+        songs = await asyncio.gather(*(self.get_setlist_songs(setlist_id) for setlist_id in setlist_ids))
+        return dict(zip(setlist_ids, songs))
+
+    async def aclose(self):
+        await self.request_handler.aclose()
@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from api.async_http import TRANSPORT_ERRORS, AsyncAdaptiveConcurrency, AsyncSingleFlight, build_async_client
+from api.exceptions import AuthenticationError
+from api.matching import AsyncTrackMatcher
+from api.models import Song, SetListInfo, PlaylistWriteResult
+from api.serialization import loads
+from api.spotify import SpotifyAppClient, SpotifyError
+from api.track_cache import MISSING, normalize_key
+from api.utils import CacheManager, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "https://api.spotify.com/v1/"
+TOKEN_URL = "https://accounts.spotify.com/api/token"
+
+class AsyncSpotifyClient(ABC):
+    """Spotify Web API calls on a pooled async HTTP client.
+
+    Subclasses supply the bearer token with ``_access_token``.
+
+    Retries follow the sync clients: 429s wait for Retry-After (times a
+    random factor up to 2, so waiting callers spread out) and 5xx and
+    transport errors back off with full jitter. As in ``SpotifyAppClient``,
+    in-flight calls are capped by an AIMD limit that starts at
+    ``max_in_flight``, halves when Spotify throttles and grows back slowly.
+    """
+
+    def __init__(self, client = None, api_prefix = None, max_in_flight = 8, max_retries = 4, backoff_base = 0.5,
+                 backoff_max = 10.0, retry_server_errors = True):
+        self.client = client or build_async_client(pool_size=max_in_flight)
+        self.api_prefix = api_prefix or API_PREFIX
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_server_errors = retry_server_errors
+        self.concurrency = AsyncAdaptiveConcurrency(max_limit=max_in_flight)
+        self.request_counts = Counter()
+
+    @abstractmethod
+    async def _access_token(self) -> str:
+        pass
+
+    async def _request(self, method, path, name, params = None, json = None):
+        self.request_counts[name] += 1
+        url = f"{self.api_prefix}{path}"
+        for attempt in range(self.max_retries + 1):
+            headers = {"Authorization": f"Bearer {await self._access_token()}"}
+            throttled = False
+            await self.concurrency.acquire()
+            try:
+                response = await self.client.request(method, url, params=params, json=json, headers=headers)
+                throttled = response.status_code == 429
+            except TRANSPORT_ERRORS as e:
+                if attempt == self.max_retries or not self.retry_server_errors:
+                    raise SpotifyError(f"Spotify request failed: {e}")
+                status, delay = None, self._backoff(attempt)
+            else:
+                status = response.status_code
+                retryable = status == 429 or (status >= 500 and self.retry_server_errors)
+                if response.is_error and (not retryable or attempt == self.max_retries):
+                    raise SpotifyError(f"Spotify returned {status} for {name}", http_status=status)
+                if not response.is_error:
+                    return loads(response.content) if response.content else None
+                if status == 429:
+                    delay = (parse_retry_after(response.headers.get("Retry-After")) or 1.0) * (1 + random.random())
+                else:
+                    delay = self._backoff(attempt)
+            finally:
+                await self.concurrency.release(throttled=throttled)
+            logger.info(f"[Async] Spotify {name} returned {status}, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def aclose(self):
+        await self.client.aclose()
+
+class AsyncSpotifyAppClient(AsyncSpotifyClient):
+    """Async counterpart of ``SpotifyAppClient`` (without the artist-catalog prefetch).
+
+    Shares the track cache format with the sync client, so either one can
+    reuse the other's matches.
+    """
+
+    ARTIST_BATCH_SIZE = 50
+
+    def __init__(self, client_id, client_secret, max_workers = 8, api_prefix = None, token_url = None,
+                 client = None, artist_cache_ttl = 3600, track_cache = None, refresh_margin = 300,
+                 empty_search_ttl = 3600):
+        if not client_id or not client_secret:
+            raise AuthenticationError("Spotify API credentials not found")
+        super().__init__(client=client, api_prefix=api_prefix, max_in_flight=max_workers)
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = token_url or TOKEN_URL
+        self.refresh_margin = refresh_margin
+        self.token_info = None
+        self.token_requests = 0
+        self._token_lock = asyncio.Lock()
+        self.artist_images = CacheManager(default_ttl=artist_cache_ttl)
+        self.track_cache = track_cache
+        self.empty_searches = CacheManager(default_ttl=empty_search_ttl)
+        self.negative_hits = Counter()
+        self.single_flight = AsyncSingleFlight()
+        self.matcher = AsyncTrackMatcher(self._search_candidates)
+
+    def _remaining(self) -> float:
+        return self.token_info["expires_at"] - time.time() if self.token_info else 0
+
+    async def _access_token(self) -> str:
+        if self._remaining() <= self.refresh_margin:
+            # Keep using a still-valid token while another task renews it
+            if self._remaining() <= 60 or not self._token_lock.locked():
+                async with self._token_lock:
+                    if self._remaining() <= self.refresh_margin:
+                        await self._fetch_token()
+        return self.token_info["access_token"]
+
+    async def _fetch_token(self):
+        logger.info("Fetching Spotify app access token")
+        self.token_requests += 1
+        response = await self.client.post(
+            self.token_url,
+            data={"grant_type": "client_credentials"},
+            auth=(self.client_id, self.client_secret)
+        )
+        if response.is_error:
+            raise AuthenticationError(f"Spotify token request failed: {response.status_code}")
+        token_info = loads(response.content)
+        token_info["expires_at"] = int(time.time()) + token_info["expires_in"]
+        self.token_info = token_info
+
+    async def get_artist_images(self, artist_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        images = {}
+        missing = []
+        for artist_id in dict.fromkeys(artist_ids):
+            cached = self.artist_images.get(artist_id)
+            if cached is not None:
+                images[artist_id] = cached or None
+            else:
+                missing.append(artist_id)
+
+        batches = [missing[start:start + self.ARTIST_BATCH_SIZE] for start in range(0, len(missing), self.ARTIST_BATCH_SIZE)]
+        results = await asyncio.gather(
+            *(self._request("GET", "artists", "artists", params={"ids": ",".join(batch)}) for batch in batches),
+            return_exceptions=True
+        )
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Error fetching artist images: {result}")
+                continue
+            for artist_id, artist in zip(batch, result.get("artists", [])):
+                if not artist:
+                    self.artist_images.set(artist_id, "")
+                    images[artist_id] = None
+                    continue
+                artist_images = artist.get("images", [])
+                url = artist_images[0]["url"] if artist_images else None
+                self.artist_images.set(artist["id"], url or "")
+                images[artist["id"]] = url
+
+        return images
+
+    async def search_track(self, song: Song):
+        track_data = await self._search_track(song)
+        if track_data:
+            images = await self.get_artist_images([track_data["artist_id"]])
+            track_data["artist_image"] = images.get(track_data["artist_id"])
+        return track_data
+
+    async def _search_track(self, song: Song):
+        key = normalize_key(song.name, song.original_artist)
+        if self.track_cache is not None:
+            # Track caches sit on SQLite or Redis, kept off the event loop
+            cached = await asyncio.to_thread(self.track_cache.get, key)
+            if cached is not MISSING:
+                return dict(cached) if cached else None
+
+        track_data = await self.single_flight.do(key, self._search_uncached, song, key)
+        return dict(track_data) if track_data else None
+
+    async def _search_uncached(self, song: Song, key: str):
+        try:
+            track, _, _ = await self.matcher.match(song.name, song.original_artist)
+        except Exception as e:
+            logger.warning(f"[Async] Spotify search failed for {song.name} - {song.original_artist}: {e}")
+            return None
+
+        track_data = SpotifyAppClient._track_data(track) if track else None
+        if self.track_cache is not None:
+            await asyncio.to_thread(self.track_cache.set, key, track_data)
+        return track_data
+
+    async def _search_candidates(self, query, limit):
+        if self.empty_searches.get(query) is not None:
+            self.negative_hits["search"] += 1
+            return []
+        logger.info(f"[Async] Spotify search: {query}")
+        results = await self._request("GET", "search", "search", params={"q": query, "type": "track", "limit": limit})
+        items = results.get("tracks", {}).get("items", [])
+        if not items:
+            self.empty_searches.set(query, True)
+        return items
+
+    async def resolve_tracks(self, songs: List[Song]) -> List[Optional[dict]]:
+        """Search every distinct song at once with ``gather``; results keep the order of ``songs``."""
+        keys = [normalize_key(song.name, song.original_artist) for song in songs]
+        unique = {}
+        for key, song in zip(keys, songs):
+            unique.setdefault(key, song)
+
+        found = await asyncio.gather(*(self._search_track(song) for song in unique.values()))
+        resolved = dict(zip(unique, found))
+
+        tracks = [track for track in resolved.values() if track]
+        images = await self.get_artist_images(track["artist_id"] for track in tracks)
+        for track in tracks:
+            track["artist_image"] = images.get(track["artist_id"])
+
+        return [resolved[key] for key in keys]
+
+class AsyncSpotifyUserClient(AsyncSpotifyClient):
+    """Async counterpart of ``SpotifyUserClient``; build it with ``create``.
+
+    Server errors are not retried blindly, since retrying a playlist write
+    could add tracks twice; 429s still are. Like ``PlaylistWriter``, a
+    chunk that fails with a server or transport error is only resent once
+    the playlist length shows it did not land.
+    """
+
+    CHUNK_SIZE = 100
+
+    def __init__(self, access_token: str, user_id: str, client = None, api_prefix = None):
+        if not access_token:
+            raise AuthenticationError("Missing Spotify user access token")
+        super().__init__(client=client, api_prefix=api_prefix, max_in_flight=4, retry_server_errors=False)
+        self.access_token = access_token
+        self.user_id = user_id
+
+    @classmethod
+    async def create(cls, access_token: str, user_id: str = None, **kwargs):
+        client = cls(access_token, user_id, **kwargs)
+        if client.user_id is None:
+            client.user_id = (await client._request("GET", "me", "me"))["id"]
+        return client
+
+    def set_access_token(self, access_token: str):
+        self.access_token = access_token
+
+    async def _access_token(self) -> str:
+        return self.access_token
+
+    async def create_playlist(self, setlist: SetListInfo, track_uris: List[str], public: bool) -> PlaylistWriteResult:
+        playlist_name = setlist.display_title
+        logger.info(f"Creating playlist: {playlist_name}")
+        playlist = await self._request("POST", f"users/{self.user_id}/playlists", "user_playlist_create", json={
+            "name": playlist_name,
+            "public": public,
+            "description": f"Playlist generated from {setlist.url}",
+        })
+
+        result = PlaylistWriteResult(playlist["id"], url=playlist["external_urls"]["spotify"])
+        # Chunks go out one after another to keep the setlist order
+        for start in range(0, len(track_uris), self.CHUNK_SIZE):
+            chunk = track_uris[start:start + self.CHUNK_SIZE]
+            try:
+                await self._append(playlist["id"], chunk, result.added)
+            except SpotifyError as e:
+                logger.warning(f"Failed to add tracks {start}-{start + len(chunk) - 1} to {playlist['id']}: {e}")
+                result.failed_chunks.append({"start": start, "count": len(chunk), "error": str(e)})
+            else:
+                result.added += len(chunk)
+        return result
+
+    async def playlist_length(self, playlist_id) -> int:
+        page = await self._request("GET", f"playlists/{playlist_id}/tracks", "playlist_items",
+                                   params={"fields": "total", "limit": 1})
+        return page["total"]
+
+    async def _append(self, playlist_id, chunk, position):
+        """Append one chunk that should land at ``position`` (the playlist's current length)."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._request("POST", f"playlists/{playlist_id}/tracks", "playlist_add_items",
+                                           json={"uris": chunk})
+            except SpotifyError as e:
+                # No status means a transport error, which may also have been applied
+                if e.http_status is not None and e.http_status < 500:
+                    raise
+                error = e
+            try:
+                length = await self.playlist_length(playlist_id)
+            except SpotifyError:
+                raise error
+            if length == position + len(chunk):
+                logger.info(f"Tracks {position}-{length - 1} reached {playlist_id} despite the server error")
+                return
+            if length != position or attempt == self.max_retries:
+                raise error
+            delay = self._backoff(attempt)
+            logger.info(f"[Async] Spotify add to {playlist_id} failed, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
@@ -0,0 +1,180 @@
+import logging
+import marshal
+import sqlite3
+import sys
+import threading
+import time
+
+from api.utils import CacheBackend, CacheManager
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class MarshalSerializer:
+    """Binary encoding for decoded JSON values (dict/list/str/number/bool/None).
+
+    Loading marshal data takes about half the time of ``json.loads`` on the
+    same payload, so a shared-cache hit does not pay for re-parsing JSON.
+    Only the Python version that wrote an entry can read it, which is why
+    the interpreter's major.minor version is part of every backend's key
+    namespace.
+    """
+
+    # marshal.version has been 4 since Python 3.4, so it cannot tell the interpreters apart
+    version = f"m{marshal.version}-py{sys.version_info[0]}{sys.version_info[1]}"
+
+    @staticmethod
+    def dumps(value) -> bytes:
+        return marshal.dumps(value)
+
+    @staticmethod
+    def loads(data: bytes):
+        return marshal.loads(data)
+
+class SQLiteBackend(CacheBackend):
+    """Cache in a local SQLite file, shared by every worker process on a host."""
+
+    def __init__(self, path, default_ttl = 300, max_entries = 50_000, serializer = MarshalSerializer):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.serializer = serializer
+        self._writes_since_prune = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS response_cache_expires_at ON response_cache (expires_at)")
+
+    def _key(self, key):
+        return f"{self.serializer.version}:{key}"
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value FROM response_cache WHERE key = ? AND expires_at > ?",
+                (self._key(key), time.time())
+            ).fetchone()
+        return self.serializer.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        data = self.serializer.dumps(value)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (self._key(key), data, now + ttl)
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= max(1, self.max_entries // 100):
+                self._prune(now)
+
+    def _prune(self, now):
+        self._writes_since_prune = 0
+        self.conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        count = self.conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        if count > self.max_entries:
+            # Entries closest to expiry go first
+            self.conn.execute(
+                "DELETE FROM response_cache WHERE key IN "
+                "(SELECT key FROM response_cache ORDER BY expires_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def delete(self, key):
+        with self.lock:
+            self.conn.execute("DELETE FROM response_cache WHERE key = ?", (self._key(key),))
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM response_cache")
+
+class RedisBackend(CacheBackend):
+    """Cache in Redis (or anything speaking its protocol), shared across nodes."""
+
+    def __init__(self, url = "redis://localhost:6379/0", client = None, default_ttl = 300, prefix = "setlist-to-playlist",
+                 serializer = MarshalSerializer):
+        if client is None:
+            if redis is None:
+                raise ImportError("RedisBackend requires the redis package")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.default_ttl = default_ttl
+        self.serializer = serializer
+        self.prefix = f"{prefix}:{serializer.version}:"
+
+    def get(self, key):
+        data = self.client.get(self.prefix + key)
+        return self.serializer.loads(data) if data is not None else None
+
+    def set(self, key, value, ttl = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        self.client.set(self.prefix + key, self.serializer.dumps(value), px=max(1, int(ttl * 1000)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*", count=500))
+        if keys:
+            self.client.delete(*keys)
+
+class TieredCache(CacheBackend):
+    """In-process ``CacheManager`` in front of a shared backend.
+
+    Repeat hits inside one worker come straight from memory without any
+    deserialization; the shared tier only sees local misses.
+    """
+
+    def __init__(self, shared: CacheBackend, local: CacheManager = None, local_ttl = 30):
+        self.shared = shared
+        self.local = local or CacheManager(default_ttl=local_ttl, max_entries=512)
+        self.local_ttl = local_ttl
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        value = self.shared.get(key)
+        if value is not None:
+            self.local.set(key, value, ttl=self.local_ttl)
+        return value
+
+    def set(self, key, value, ttl = None):
+        self.shared.set(key, value, ttl=ttl)
+        local_ttl = self.local_ttl if ttl is None else min(ttl, self.local_ttl)
+        self.local.set(key, value, ttl=local_ttl)
+
+    def delete(self, key):
+        self.local.delete(key)
+        self.shared.delete(key)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+def create_cache_backend(kind = "memory", default_ttl = 300, max_entries = 1024, max_bytes = 64 * 1024 * 1024,
+                         sqlite_path = None, redis_url = None) -> CacheBackend:
+    kind = (kind or "memory").lower()
+    if kind == "memory":
+        return CacheManager(default_ttl=default_ttl, max_entries=max_entries, max_bytes=max_bytes)
+    if kind == "sqlite":
+        logger.info(f"Using shared SQLite cache at {sqlite_path}")
+        return TieredCache(SQLiteBackend(sqlite_path or "api_cache.sqlite3", default_ttl=default_ttl))
+    if kind == "redis":
+        logger.info("Using shared Redis cache")
+        return TieredCache(RedisBackend(url=redis_url or "redis://localhost:6379/0", default_ttl=default_ttl))
+    raise ValueError(f"Unknown cache backend: {kind}")
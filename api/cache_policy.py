@@ -0,0 +1,86 @@
+import re
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+from api.models import event_date_ordinal
+
+_SETLIST = re.compile(r"^/?setlist/[^/]+$")
+_ARTIST_SETLISTS = re.compile(r"^/?artist/[^/]+/setlists$")
+_SEARCH = re.compile(r"^/?search/")
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float  # served as fresh for this long
+    stale_ttl: float  # then served stale, while a background refresh runs, for this long
+
+class CachePolicies:
+    """How long each kind of setlist.fm response stays fresh.
+
+    A published setlist of a past show rarely changes, so it is kept for
+    days; a show from the last ``recent_days`` days may still be edited.
+    An artist's first page changes after every show, later pages shift
+    by one setlist per show, and searches sit in between. Not-found and
+    empty responses are kept for ``negative_ttl`` and never served stale.
+    """
+
+    def __init__(self, default_ttl = 300, setlist_ttl = 7 * 86400, recent_setlist_ttl = 3600, latest_page_ttl = 300,
+                 page_ttl = 3600, search_ttl = 3600, stale_ttl = 86400, recent_days = 3, negative_ttl = 600):
+        self.default_ttl = default_ttl
+        self.setlist_ttl = setlist_ttl
+        self.recent_setlist_ttl = recent_setlist_ttl
+        self.latest_page_ttl = latest_page_ttl
+        self.page_ttl = page_ttl
+        self.search_ttl = search_ttl
+        self.stale_ttl = stale_ttl
+        self.recent_days = recent_days
+        self.negative = CachePolicy(negative_ttl, 0)
+
+    def ttl(self, endpoint, params = None, payload = None) -> float:
+        if _SETLIST.match(endpoint):
+            event = event_date_ordinal((payload or {}).get('eventDate'))
+            if event and date.today().toordinal() - event > self.recent_days:
+                return self.setlist_ttl
+            return self.recent_setlist_ttl
+        if _ARTIST_SETLISTS.match(endpoint):
+            page = int((params or {}).get('p', 1))
+            return self.latest_page_ttl if page <= 1 else self.page_ttl
+        if _SEARCH.match(endpoint):
+            return self.search_ttl
+        return self.default_ttl
+
+    def policy(self, endpoint, params = None, payload = None) -> CachePolicy:
+        if is_empty(payload):
+            return self.negative
+        return CachePolicy(self.ttl(endpoint, params, payload), self.stale_ttl)
+
+def is_empty(payload) -> bool:
+    """An empty body or a search page with no results."""
+    return not payload or (isinstance(payload, dict) and payload.get('total') == 0)
+
+def cache_entry(value, policy: CachePolicy, headers = None, not_found = False) -> dict:
+    """What ``RequestHandler`` stores: the payload, when it goes stale and its validators.
+
+    ``not_found`` entries record a 404 so it is raised again without a request.
+    """
+    headers = headers or {}
+    return {
+        'value': value,
+        'not_found': not_found,
+        'fresh_until': time.time() + policy.ttl,
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified'),
+    }
+
+def is_fresh(entry) -> bool:
+    return time.time() < entry['fresh_until']
+
+def conditional_headers(entry: Optional[dict]) -> dict:
+    """If-None-Match / If-Modified-Since for revalidating a cached entry."""
+    headers = {}
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
@@ -0,0 +1,126 @@
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from api.matching import normalize_artist, normalize_title, score, similarity
+from api.utils import CacheManager, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+class ArtistCatalog:
+    """An artist's Spotify albums and singles, fetched once and cached by artist id.
+
+    Matching a setlist against the catalog locally replaces one search per
+    song with a few paged calls: one artist search, one ``artist_albums``
+    page per 50 releases, one ``albums`` call per 20 releases and one
+    ``album_tracks`` page per 50 tracks past an album's first 50.
+
+    Catalogs stop growing at ``max_tracks`` and are cached apart from the
+    artist ids within their own ``max_bytes``, so a prolific artist
+    neither pushes other catalogs out nor gets refetched every setlist.
+    """
+
+    ALBUMS_PAGE_SIZE = 50
+    ALBUMS_BATCH_SIZE = 20
+    ALBUM_TRACKS_PAGE_SIZE = 50
+
+    def __init__(self, app, ttl = 86400, max_artists = 64, accept = 0.85, max_tracks = 5000,
+                 max_bytes = 128 * 1024 * 1024):
+        # Calls go through the app client for its token, throttling and request counts
+        self.app = app
+        self.accept = accept
+        self.max_tracks = max_tracks
+        self.cache = CacheManager(default_ttl=ttl, max_entries=max_artists * 2)
+        self.catalogs = CacheManager(default_ttl=ttl, max_entries=max_artists, max_bytes=max_bytes)
+        self.single_flight = SingleFlight()
+
+    def artist_id(self, name: str) -> Optional[str]:
+        """Spotify id of the artist whose name matches ``name``, if any."""
+        key = f"artist-id:{normalize_artist(name)}"
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached or None
+
+        results = self.app._call(self.app.sp.search, q=f"artist:{name}", type="artist", limit=5)
+        wanted = normalize_artist(name)
+        best = max(
+            results.get("artists", {}).get("items", []),
+            key=lambda a: similarity(wanted, normalize_artist(a["name"])),
+            default=None
+        )
+        artist_id = best["id"] if best and similarity(wanted, normalize_artist(best["name"])) >= 0.9 else ""
+        self.cache.set(key, artist_id)
+        return artist_id or None
+
+    def tracks(self, artist_id: str) -> Dict[str, List[dict]]:
+        """The artist's tracks, grouped by normalized title."""
+        cached = self.catalogs.get(artist_id)
+        if cached is not None:
+            return cached
+        # Setlists resolving concurrently for one artist share the fetch
+        return self.single_flight.do(artist_id, self._fetch_tracks, artist_id)
+
+    def _fetch_tracks(self, artist_id):
+        album_ids = []
+        offset = 0
+        while True:
+            page = self.app._call(
+                self.app.sp.artist_albums, artist_id, include_groups="album,single",
+                limit=self.ALBUMS_PAGE_SIZE, offset=offset
+            )
+            album_ids.extend(album["id"] for album in page.get("items", []))
+            offset += self.ALBUMS_PAGE_SIZE
+            if not page.get("next"):
+                break
+
+        tracks = defaultdict(list)
+        count = 0
+        for start in range(0, len(album_ids), self.ALBUMS_BATCH_SIZE):
+            if count >= self.max_tracks:
+                logger.info(f"Catalog of {artist_id} capped at {self.max_tracks} tracks")
+                break
+            albums = self.app._call(self.app.sp.albums, album_ids[start:start + self.ALBUMS_BATCH_SIZE])
+            for album in albums.get("albums", []):
+                if not album or count >= self.max_tracks:
+                    continue
+                # Tracks nested in an album omit the album itself
+                summary = {"name": album["name"], "images": album.get("images", [])}
+                for track in self._album_tracks(album)[:self.max_tracks - count]:
+                    tracks[normalize_title(track["name"])].append({
+                        "uri": track["uri"],
+                        "name": track["name"],
+                        "artists": track["artists"],
+                        "album": summary,
+                    })
+                    count += 1
+
+        logger.info(f"Fetched catalog of {artist_id}: {len(album_ids)} releases, {count} tracks")
+        tracks = dict(tracks)
+        self.catalogs.set(artist_id, tracks)
+        return tracks
+
+    def _album_tracks(self, album) -> List[dict]:
+        """Every track of an album; ``albums`` only nests the first page of them."""
+        page = album.get("tracks") or {}
+        items = list(page.get("items", []))
+        while page.get("next") and len(items) < self.max_tracks:
+            page = self.app._call(
+                self.app.sp.album_tracks, album["id"], limit=self.ALBUM_TRACKS_PAGE_SIZE, offset=len(items)
+            )
+            if not page.get("items"):
+                break
+            items.extend(page["items"])
+        return items
+
+    def match(self, tracks: Dict[str, List[dict]], title: str, artist: str) -> Optional[dict]:
+        """Best catalog track for a song, or None when nothing scores ``accept``."""
+        # Most songs match a title exactly; only the rest are scored against everything
+        candidates = tracks.get(normalize_title(title))
+        if candidates is None:
+            candidates = [track for group in tracks.values() for track in group]
+        best, best_score = None, 0.0
+        for track in candidates:
+            track_score = score(track, title, artist)
+            if track_score > best_score:
+                best, best_score = track, track_score
+        return best if best_score >= self.accept else None
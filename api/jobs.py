@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from api.exceptions import APIError
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueueFullError(APIError):
+    pass
+
+
+class Job:
+    """One unit of background work and the progress it has reported."""
+
+    def __init__(self, key, owner = None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.owner = owner
+        self.state = QUEUED
+        self.resolved = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (SUCCEEDED, FAILED)
+
+    def progress(self, resolved, total = None):
+        with self.lock:
+            self.resolved = resolved
+            if total is not None:
+                self.total = total
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {
+                'job_id': self.id,
+                'state': self.state,
+                'resolved': self.resolved,
+                'total': self.total,
+                'result': self.result,
+                'error': self.error,
+            }
+
+
+class JobManager:
+    """Runs jobs on a bounded thread pool, at most one live job per key.
+
+    Submitting a key whose job is queued, running or already succeeded
+    returns that job instead of starting another, so retried requests
+    (double clicks) do not repeat the work. Failed jobs can be resubmitted.
+    Finished jobs are forgotten after ``ttl`` seconds. ``owner`` records
+    who submitted a job, so callers can hide it from everyone else.
+    """
+
+    def __init__(self, max_workers = 4, max_pending = 100, ttl = 3600):
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jobs")
+        self.lock = threading.Lock()
+        self.jobs: Dict[str, Job] = {}
+        self.by_key: Dict[str, Job] = {}
+
+    def submit(self, key, fn: Callable[[Job], object], owner = None) -> Job:
+        with self.lock:
+            self._prune()
+            job = self.by_key.get(key)
+            if job is not None and job.state != FAILED:
+                return job
+
+            pending = sum(1 for j in self.jobs.values() if not j.finished)
+            if pending >= self.max_pending:
+                raise JobQueueFullError(f"Too many pending jobs ({pending})")
+
+            job = Job(key, owner)
+            self.jobs[job.id] = job
+            self.by_key[key] = job
+        self.executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id) -> Optional[Job]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _run(self, job, fn):
+        job.state = RUNNING
+        try:
+            result = fn(job)
+        except Exception as e:
+            logger.exception(f"Job {job.id} failed")
+            with job.lock:
+                job.error = str(e) if isinstance(e, APIError) else "Internal server error"
+                job.finished_at = time.time()
+                job.state = FAILED
+        else:
+            with job.lock:
+                job.result = result
+                job.finished_at = time.time()
+                job.state = SUCCEEDED
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        expired = [j for j in self.jobs.values() if j.finished and j.finished_at < cutoff]
+        for job in expired:
+            del self.jobs[job.id]
+            if self.by_key.get(job.key) is job:
+                del self.by_key[job.key]
+
+    def shutdown(self, wait = True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,148 @@
+import logging
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "(Live)", "[Remastered 2011]", "(feat. X)" ...
+_BRACKETED = re.compile(r"\s*[\(\[][^\)\]]*[\)\]]")
+# "Song - Live at Wembley", "Song - 2011 Remaster"
+_DASH_SUFFIX = re.compile(
+    r"\s+-\s+.*\b(live|remaster(ed)?|version|edit|mix|mono|stereo|demo|acoustic|session)\b.*$", re.IGNORECASE
+)
+_FEATURING = re.compile(r"\s+(feat\.?|ft\.?|featuring)\s+.*$", re.IGNORECASE)
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+# Words that mark a different recording when the setlist title does not ask for one
+_VERSION_WORDS = ("live", "remix", "karaoke", "instrumental", "acoustic", "demo", "tribute", "cover", "made famous")
+_COMPILATION_WORDS = ("greatest hits", "best of", "compilation", "tribute", "karaoke")
+
+def fold(value: str) -> str:
+    """Casefold and strip diacritics: "Sigur Rós" -> "sigur ros"."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+def _words(value: str) -> str:
+    value = _PUNCTUATION.sub(" ", fold(value).replace("&", " and ").replace("'", ""))
+    return " ".join(value.split())
+
+def normalize_title(title: str) -> str:
+    """Title without version suffixes, featured artists, punctuation or diacritics."""
+    title = _BRACKETED.sub("", title or "")
+    title = _DASH_SUFFIX.sub("", title)
+    title = _FEATURING.sub("", title)
+    return _words(title)
+
+def normalize_artist(artist: str) -> str:
+    artist = _words(artist)
+    return artist[4:] if artist.startswith("the ") else artist
+
+def similarity(a: str, b: str) -> float:
+    """0..1 similarity of two normalized strings, tolerant of word order and extra words."""
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    ratio = SequenceMatcher(None, a, b).ratio()
+    a_words, b_words = set(a.split()), set(b.split())
+    overlap = len(a_words & b_words) / max(len(a_words), len(b_words))
+    return max(ratio, overlap)
+
+def score(track: dict, title: str, artist: str) -> float:
+    """How likely a Spotify track is the studio recording of ``title`` by ``artist``."""
+    wanted_title = normalize_title(title)
+    title_score = similarity(wanted_title, normalize_title(track["name"]))
+    wanted_artist = normalize_artist(artist)
+    artist_score = max((similarity(wanted_artist, normalize_artist(a["name"])) for a in track["artists"]), default=0.0)
+
+    total = 0.6 * title_score + 0.4 * artist_score
+    if artist_score < 0.5:
+        # Same title by someone else, e.g. "Jam" by Michael Jackson for Pearl Jam
+        total -= 0.3
+    raw_title, raw_wanted = fold(track["name"]), fold(title)
+    if any(word in raw_title and word not in raw_wanted for word in _VERSION_WORDS):
+        total -= 0.15
+    album = fold(track.get("album", {}).get("name", ""))
+    if any(word in album for word in _COMPILATION_WORDS):
+        total -= 0.05
+    return total
+
+def query_cascade(title: str, artist: str, limit = 10, wide_limit = 50) -> List[Tuple[str, int]]:
+    """``(query, result limit)`` pairs for a song, cheapest and most precise first."""
+    clean = normalize_title(title)
+    artist_words = _words(artist)
+    queries = [
+        f"track:{clean} artist:{artist_words}",
+        f"{clean} {artist_words}",
+    ]
+    # Medleys and double titles ("Song A / Song B"): try the first song
+    for separator in (" / ", "/", " > "):
+        if separator in (title or ""):
+            first = normalize_title(title.split(separator, 1)[0])
+            if first:
+                queries.append(f"track:{first} artist:{artist_words}")
+            break
+    # The setlist may credit a different artist name than Spotify does
+    queries.append(f"track:{clean}")
+
+    unique = []
+    for query in queries:
+        if query not in unique and query.strip():
+            unique.append(query)
+    # Last resort for misspelled titles: rank the artist's catalog by title
+    return [(query, limit) for query in unique] + [(f"artist:{artist_words}", wide_limit)]
+
+class TrackMatcher:
+    """Finds the Spotify track for a setlist song.
+
+    Queries from ``query_cascade`` are tried in order and every candidate is
+    scored; the cascade stops at the first candidate scoring at least
+    ``accept``. Otherwise the best candidate overall is used if it reaches
+    ``minimum``.
+    """
+
+    def __init__(self, search: Callable[[str, int], List[dict]], limit = 10, wide_limit = 50, accept = 0.85,
+                 minimum = 0.65):
+        self.search = search
+        self.limit = limit
+        self.wide_limit = wide_limit
+        self.accept = accept
+        self.minimum = minimum
+
+    def match(self, title: str, artist: str) -> Tuple[Optional[dict], float, int]:
+        """Best track (or None), its score and the number of searches made."""
+        best, best_score, calls = None, 0.0, 0
+        for query, limit in query_cascade(title, artist, self.limit, self.wide_limit):
+            calls += 1
+            best, best_score = self._rank(self.search(query, limit), title, artist, best, best_score)
+            if best_score >= self.accept:
+                break
+        return self._result(title, artist, best, best_score, calls)
+
+    @staticmethod
+    def _rank(tracks, title, artist, best, best_score):
+        for track in tracks:
+            candidate_score = score(track, title, artist)
+            if candidate_score > best_score:
+                best, best_score = track, candidate_score
+        return best, best_score
+
+    def _result(self, title, artist, best, best_score, calls):
+        if best_score < self.minimum:
+            logger.info(f"No confident match for {title} - {artist} (best {best_score:.2f})")
+            return None, best_score, calls
+        return best, best_score, calls
+
+class AsyncTrackMatcher(TrackMatcher):
+    """``TrackMatcher`` whose ``search`` is a coroutine function."""
+
+    async def match(self, title: str, artist: str) -> Tuple[Optional[dict], float, int]:
+        best, best_score, calls = None, 0.0, 0
+        for query, limit in query_cascade(title, artist, self.limit, self.wide_limit):
+            calls += 1
+            best, best_score = self._rank(await self.search(query, limit), title, artist, best, best_score)
+            if best_score >= self.accept:
+                break
+        return self._result(title, artist, best, best_score, calls)
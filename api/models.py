@@ -1,7 +1,16 @@
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Iterable, List, Optional
 
-@dataclass
+def event_date_ordinal(value) -> Optional[int]:
+    """Proleptic ordinal of a setlist.fm eventDate (dd-MM-yyyy), or None."""
+    try:
+        day, month, year = value.split('-')
+        return date(int(year), int(month), int(day)).toordinal()
+    except (AttributeError, ValueError):
+        return None
+
+@dataclass(slots=True)
 class Song:
     name: str
     artist: str
@@ -24,9 +33,22 @@ class Song:
     @property
     def is_encore(self):
         return self.encore > 0
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'artist': self.artist,
+            'original_artist': self.original_artist,
+            'is_cover': self.cover is not None,
+            'is_encore': self.encore > 0,
+            'encore': self.encore,
+            'position': self.position,
+            'set_number': self.set_number,
+            'info': self.info,
+        }
     
 
-@dataclass
+@dataclass(slots=True)
 class SetListInfo:
     id: str
     artist: str
@@ -38,16 +60,51 @@ class SetListInfo:
     url: str = ""
     venue_id: str = None
     artist_mbid: str = None
+    # Parsed once from ``date``; None when the date is missing or malformed
+    date_ordinal: Optional[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.date_ordinal = event_date_ordinal(self.date)
+
+    @property
+    def event_date(self) -> Optional[date]:
+        return date.fromordinal(self.date_ordinal) if self.date_ordinal else None
 
     @property
-    def formatted_date(self):
-        if not self.date:
-            return None
-        try:
-            return datetime.strptime(self.date, '%m-%d-%Y')
-        except ValueError:
-            return None
+    def formatted_date(self) -> Optional[datetime]:
+        return datetime.fromordinal(self.date_ordinal) if self.date_ordinal else None
     
     @property
     def display_title(self):
-        return f"{self.artist} - {self.venue}, {self.city} ({self.date})"
\ No newline at end of file
+        return f"{self.artist} - {self.venue}, {self.city} ({self.date})"
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'artist': self.artist,
+            'date': self.date,
+            'venue': self.venue,
+            'city': self.city,
+            'country': self.country,
+            'tour': self.tour,
+            'url': self.url,
+            'display_title': f"{self.artist} - {self.venue}, {self.city} ({self.date})",
+        }
+
+def to_dicts(items: Iterable) -> List[dict]:
+    """JSON-ready dicts for a sequence of models, as the routes return them."""
+    return [item.to_dict() for item in items]
+
+
+@dataclass
+class PlaylistWriteResult:
+    playlist_id: str
+    url: str = ""
+    added: int = 0
+    removed: int = 0
+    # {"start": offset of the chunk's first track, "count": tracks in it, "error": message}
+    failed_chunks: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.failed_chunks
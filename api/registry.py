@@ -0,0 +1,240 @@
+import threading
+import logging
+
+from api.setlistfm import SetlistFMClient
+from api.spotify import SpotifyAppClient
+from api.utils import CacheBackend, RateLimiter
+from api.cache_policy import CachePolicies
+from api.cache_backends import RedisBackend, create_cache_backend
+from api.track_cache import BackendTrackCache, TrackResolutionCache
+from api.setlist_index import SetlistIndex
+from api.jobs import JobManager
+from api.resolutions import ResolutionStore
+from api.user_context import UserClientPool
+from api.async_http import EventLoopThread
+from api.async_setlistfm import AsyncSetlistFMClient
+from api.async_spotify import AsyncSpotifyAppClient
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_KEY = "client_registry"
+
+class ClientRegistry:
+    """Process-wide API clients shared by every request of one Flask app."""
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._cache = None
+        self._setlistfm = None
+        self._resolutions = None
+        self._track_cache = None
+        self._setlist_index = None
+        self._jobs = None
+        self._user_clients = None
+        self._async_loop = None
+        self._async_setlistfm = None
+        self._async_spotify_app = None
+        self._spotify_app = None
+
+    @property
+    def cache(self) -> CacheBackend:
+        """Response cache shared by the API clients (and, per its backend, by workers)."""
+        if self._cache is None:
+            with self._lock:
+                if self._cache is None:
+                    self._cache = create_cache_backend(
+                        kind=self.config.get("CACHE_BACKEND", "memory"),
+                        default_ttl=self.config.get("CACHE_TTL", 300),
+                        max_entries=self.config.get("CACHE_MAX_ENTRIES", 1024),
+                        max_bytes=self.config.get("CACHE_MAX_BYTES", 64 * 1024 * 1024),
+                        sqlite_path=self.config.get("CACHE_SQLITE_PATH"),
+                        redis_url=self.config.get("CACHE_REDIS_URL")
+                    )
+        return self._cache
+
+    @property
+    def setlistfm(self) -> SetlistFMClient:
+        cache = self.cache
+        if self._setlistfm is None:
+            with self._lock:
+                if self._setlistfm is None:
+                    logger.info("Creating shared setlist.fm client")
+                    self._setlistfm = SetlistFMClient(
+                        api_key=self.config.get("SETLISTFM_API_KEY"),
+                        cache=cache,
+                        rate_limiter=RateLimiter(
+                            max_requests=self.config.get("SETLISTFM_RATE_LIMIT", 2),
+                            shared_path=self.config.get("SETLISTFM_RATE_LIMIT_FILE")
+                        ),
+                        pool_size=self.config.get("HTTP_POOL_SIZE", 10),
+                        base_url=self.config.get("SETLISTFM_BASE_URL"),
+                        cache_policies=self.cache_policies
+                    )
+        return self._setlistfm
+
+    @property
+    def cache_policies(self) -> CachePolicies:
+        return CachePolicies(
+            default_ttl=self.config.get("CACHE_TTL", 300),
+            setlist_ttl=self.config.get("SETLISTFM_SETLIST_TTL", 7 * 86400),
+            recent_setlist_ttl=self.config.get("SETLISTFM_RECENT_SETLIST_TTL", 3600),
+            latest_page_ttl=self.config.get("SETLISTFM_LATEST_PAGE_TTL", 300),
+            page_ttl=self.config.get("SETLISTFM_PAGE_TTL", 3600),
+            search_ttl=self.config.get("SETLISTFM_SEARCH_TTL", 3600),
+            stale_ttl=self.config.get("SETLISTFM_STALE_TTL", 86400),
+            negative_ttl=self.config.get("SETLISTFM_NEGATIVE_TTL", 600)
+        )
+
+    @property
+    def spotify_app(self) -> SpotifyAppClient:
+        """App-level Spotify client; its token and connections are reused by every request."""
+        track_cache = self.track_cache
+        if self._spotify_app is None:
+            with self._lock:
+                if self._spotify_app is None:
+                    logger.info("Creating shared Spotify app client")
+                    self._spotify_app = SpotifyAppClient(
+                        client_id=self.config.get("SPOTIFY_CLIENT_ID"),
+                        client_secret=self.config.get("SPOTIFY_CLIENT_SECRET"),
+                        max_workers=self.config.get("SPOTIFY_RESOLVER_WORKERS", 8),
+                        track_cache=track_cache,
+                        catalog_ttl=self.config.get("SPOTIFY_CATALOG_TTL", 86400),
+                        catalog_min_songs=self.config.get("SPOTIFY_CATALOG_MIN_SONGS", 5),
+                        catalog_max_tracks=self.config.get("SPOTIFY_CATALOG_MAX_TRACKS", 5000),
+                        catalog_max_bytes=self.config.get("SPOTIFY_CATALOG_MAX_BYTES", 128 * 1024 * 1024),
+                        empty_search_ttl=self.config.get("SPOTIFY_EMPTY_SEARCH_TTL", 3600)
+                    )
+        return self._spotify_app
+
+    @property
+    def track_cache(self):
+        if self._track_cache is None:
+            with self._lock:
+                if self._track_cache is None:
+                    self._track_cache = self._create_track_cache()
+        return self._track_cache
+
+    def _create_track_cache(self):
+        ttl = self.config.get("TRACK_CACHE_TTL", 30 * 86400)
+        negative_ttl = self.config.get("TRACK_CACHE_NEGATIVE_TTL", 86400)
+
+        # The SQLite track cache is already shared by workers on one host;
+        # Redis extends that across nodes
+        if (self.config.get("CACHE_BACKEND") or "memory").lower() == "redis":
+            logger.info("Using Redis track resolution cache")
+            backend = RedisBackend(url=self.config.get("CACHE_REDIS_URL"), default_ttl=ttl)
+            return BackendTrackCache(backend, ttl=ttl, negative_ttl=negative_ttl)
+
+        path = self.config.get("TRACK_CACHE_PATH") or ":memory:"
+        logger.info(f"Opening track resolution cache at {path}")
+        return TrackResolutionCache(
+            path=path,
+            ttl=ttl,
+            negative_ttl=negative_ttl,
+            max_entries=self.config.get("TRACK_CACHE_MAX_ENTRIES", 100_000),
+            touch_interval=self.config.get("TRACK_CACHE_TOUCH_INTERVAL", 3600)
+        )
+
+    @property
+    def setlist_index(self) -> SetlistIndex:
+        if self._setlist_index is None:
+            with self._lock:
+                if self._setlist_index is None:
+                    path = self.config.get("SETLIST_INDEX_PATH") or ":memory:"
+                    logger.info(f"Opening setlist index at {path}")
+                    self._setlist_index = SetlistIndex(
+                        path=path,
+                        stale_after=self.config.get("SETLIST_INDEX_STALE_AFTER", 3600),
+                        backfill_pages=self.config.get("SETLIST_INDEX_BACKFILL_PAGES", 5),
+                        prefetch=self.config.get("SETLIST_INDEX_PREFETCH", 3)
+                    )
+        return self._setlist_index
+
+    @property
+    def jobs(self) -> JobManager:
+        if self._jobs is None:
+            with self._lock:
+                if self._jobs is None:
+                    self._jobs = JobManager(
+                        max_workers=self.config.get("PLAYLIST_JOB_WORKERS", 4),
+                        max_pending=self.config.get("PLAYLIST_JOB_MAX_PENDING", 100),
+                        ttl=self.config.get("PLAYLIST_JOB_TTL", 3600)
+                    )
+        return self._jobs
+
+    @property
+    def resolutions(self) -> ResolutionStore:
+        cache = self.cache
+        if self._resolutions is None:
+            with self._lock:
+                if self._resolutions is None:
+                    self._resolutions = ResolutionStore(cache, ttl=self.config.get("RESOLUTION_TTL", 3600))
+        return self._resolutions
+
+    @property
+    def user_clients(self) -> UserClientPool:
+        if self._user_clients is None:
+            with self._lock:
+                if self._user_clients is None:
+                    self._user_clients = UserClientPool(
+                        max_users=self.config.get("SPOTIFY_USER_POOL_SIZE", 256),
+                        idle_ttl=self.config.get("SPOTIFY_USER_IDLE_TTL", 3600)
+                    )
+        return self._user_clients
+
+    @property
+    def async_loop(self) -> EventLoopThread:
+        """Event loop the async clients live on; sync routes submit coroutines with ``run_async``."""
+        if self._async_loop is None:
+            with self._lock:
+                if self._async_loop is None:
+                    logger.info("Starting async client event loop")
+                    self._async_loop = EventLoopThread()
+        return self._async_loop
+
+    def run_async(self, coro, timeout = None):
+        return self.async_loop.run(coro, timeout)
+
+    @property
+    def async_setlistfm(self) -> AsyncSetlistFMClient:
+        """Async setlist.fm client sharing the sync client's cache, rate limit and rate controller."""
+        setlistfm = self.setlistfm
+        if self._async_setlistfm is None:
+            with self._lock:
+                if self._async_setlistfm is None:
+                    logger.info("Creating shared async setlist.fm client")
+                    self._async_setlistfm = AsyncSetlistFMClient(
+                        api_key=self.config.get("SETLISTFM_API_KEY"),
+                        cache=setlistfm.cache,
+                        rate_limiter=setlistfm.rate_limiter,
+                        rate_controller=setlistfm.request_handler.rate_controller,
+                        pool_size=self.config.get("HTTP_POOL_SIZE", 10),
+                        base_url=self.config.get("SETLISTFM_BASE_URL"),
+                        cache_policies=setlistfm.request_handler.cache_policies
+                    )
+        return self._async_setlistfm
+
+    @property
+    def async_spotify_app(self) -> AsyncSpotifyAppClient:
+        track_cache = self.track_cache
+        if self._async_spotify_app is None:
+            with self._lock:
+                if self._async_spotify_app is None:
+                    logger.info("Creating shared async Spotify app client")
+                    self._async_spotify_app = AsyncSpotifyAppClient(
+                        client_id=self.config.get("SPOTIFY_CLIENT_ID"),
+                        client_secret=self.config.get("SPOTIFY_CLIENT_SECRET"),
+                        max_workers=self.config.get("SPOTIFY_RESOLVER_WORKERS", 8),
+                        track_cache=track_cache,
+                        empty_search_ttl=self.config.get("SPOTIFY_EMPTY_SEARCH_TTL", 3600)
+                    )
+        return self._async_spotify_app
+
+    def init_app(self, app):
+        app.extensions[EXTENSION_KEY] = self
+        return self
+
+
+def get_registry(app) -> ClientRegistry:
+    return app.extensions[EXTENSION_KEY]
@@ -0,0 +1,49 @@
+import uuid
+from typing import List, Optional
+
+from api.models import Song
+from api.utils import CacheBackend
+
+
+class ResolutionStore:
+    """Spotify matches issued along with a setlist's details.
+
+    The detail view hands out a resolution id; playlist creation can pass
+    it back to reuse those matches instead of fetching the setlist and
+    searching every song again. Entries live in the shared response cache,
+    so any worker can redeem an id another one issued.
+    """
+
+    def __init__(self, cache: CacheBackend, ttl = 3600):
+        self.cache = cache
+        self.ttl = ttl
+
+    def issue(self, setlist_id, songs: List[Song], tracks: List[Optional[dict]]) -> str:
+        resolution_id = uuid.uuid4().hex
+        self.cache.set(f"resolution:{resolution_id}", {
+            'setlist_id': setlist_id,
+            'artist': songs[0].artist if songs else None,
+            # (set_number, position, uri) per song, in setlist order
+            'songs': [
+                (song.set_number, song.position, track['uri'] if track else None)
+                for song, track in zip(songs, tracks)
+            ],
+        }, ttl=self.ttl)
+        return resolution_id
+
+    def get(self, resolution_id, setlist_id) -> Optional[dict]:
+        """The stored resolution, or None if it expired or belongs to another setlist."""
+        if not resolution_id:
+            return None
+        resolution = self.cache.get(f"resolution:{resolution_id}")
+        if resolution is None or resolution['setlist_id'] != setlist_id:
+            return None
+        return resolution
+
+    @staticmethod
+    def track_uris(resolution, selected = None) -> List[str]:
+        """URIs of the matched songs, optionally limited to ``{(set_number, position)}``."""
+        return [
+            uri for set_number, position, uri in resolution['songs']
+            if uri and (not selected or (set_number, position) in selected)
+        ]
@@ -0,0 +1,59 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+def dumps(value) -> bytes:
+    """Compact UTF-8 JSON; uses orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def loads(data):
+    """Decode a JSON document from bytes or str; uses orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _expect(text, pos, chars):
+    pos = _WHITESPACE.match(text, pos).end()
+    if pos >= len(text) or text[pos] not in chars:
+        raise json.JSONDecodeError(f"Expecting one of {chars!r}", text, pos)
+    return text[pos], _WHITESPACE.match(text, pos + 1).end()
+
+def iter_array_items(data, key):
+    """Yield the items of the array under top-level ``key`` of a JSON object.
+
+    Items are decoded one at a time as the iterator advances, so the first
+    ones are usable before the rest of the document has been decoded and
+    only one item is held in memory at a time. Top-level values before
+    ``key`` are decoded and dropped; anything after the array is ignored.
+    """
+    text = data.decode('utf-8') if isinstance(data, (bytes, bytearray)) else data
+    decode = _decoder.raw_decode
+    _, pos = _expect(text, 0, '{')
+    if text[pos:pos + 1] == '}':
+        return
+    while True:
+        name, pos = decode(text, pos)
+        _, pos = _expect(text, pos, ':')
+        if name == key and text[pos:pos + 1] == '[':
+            pos = _WHITESPACE.match(text, pos + 1).end()
+            if text[pos:pos + 1] == ']':
+                return
+            while True:
+                item, pos = decode(text, pos)
+                yield item
+                separator, pos = _expect(text, pos, ',]')
+                if separator == ']':
+                    return
+        _, pos = decode(text, pos)
+        separator, pos = _expect(text, pos, ',}')
+        if separator == '}':
+            return
@@ -0,0 +1,319 @@
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from typing import List, Optional
+
+from api.models import SetListInfo
+from api.utils import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS setlists (
+    id TEXT PRIMARY KEY,
+    artist_mbid TEXT NOT NULL,
+    event_date TEXT,
+    year INTEGER,
+    month INTEGER,
+    date TEXT,
+    artist TEXT,
+    venue TEXT,
+    venue_lc TEXT,
+    city TEXT,
+    city_lc TEXT,
+    country TEXT,
+    tour TEXT,
+    tour_lc TEXT,
+    url TEXT,
+    venue_id TEXT
+);
+CREATE INDEX IF NOT EXISTS setlists_artist_date ON setlists (artist_mbid, event_date DESC);
+CREATE INDEX IF NOT EXISTS setlists_artist_year_month ON setlists (artist_mbid, year, month);
+CREATE INDEX IF NOT EXISTS setlists_artist_venue ON setlists (artist_mbid, venue_lc);
+CREATE INDEX IF NOT EXISTS setlists_artist_tour ON setlists (artist_mbid, tour_lc);
+CREATE TABLE IF NOT EXISTS artist_sync (
+    artist_mbid TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    total INTEGER NOT NULL,
+    per_page INTEGER NOT NULL,
+    complete INTEGER NOT NULL,
+    backfilled INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+def _prefix_upper_bound(prefix: str) -> str:
+    # Smallest string greater than every string starting with prefix
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+class SetlistIndex:
+    """Local per-artist setlist history, kept in SQLite and synced incrementally.
+
+    Filtered browsing (year/month, venue, city, tour) is answered from the
+    index. Syncing fetches newest-first pages until it meets setlists it
+    already has, then backfills older pages a few at a time until the
+    artist's full history is indexed, with up to ``prefetch`` pages in
+    flight. The backfill position is stored with
+    the upstream total it was measured against and moved when that total
+    changes, so setlists published or deleted meanwhile neither stall the
+    backfill nor make it skip setlists.
+    """
+
+    def __init__(self, path = ":memory:", stale_after = 3600, backfill_pages = 5, prefetch = 3):
+        self.path = path
+        self.stale_after = stale_after
+        self.backfill_pages = backfill_pages
+        self.prefetch = prefetch
+        self.lock = threading.Lock()
+        self.single_flight = SingleFlight()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(artist_sync)")}
+        if "backfilled" not in columns:
+            # Indexes written before the backfill position was stored were positioned by their row count
+            self.conn.execute("ALTER TABLE artist_sync ADD COLUMN backfilled INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute(
+                "UPDATE artist_sync SET backfilled = "
+                "(SELECT COUNT(*) FROM setlists WHERE setlists.artist_mbid = artist_sync.artist_mbid)"
+            )
+
+    # Sync state
+
+    def sync_state(self, artist_mbid):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT synced_at, total, per_page, complete, backfilled FROM artist_sync WHERE artist_mbid = ?",
+                (artist_mbid,)
+            ).fetchone()
+            if row is None:
+                return None
+            count, oldest = self.conn.execute(
+                "SELECT COUNT(*), MIN(event_date) FROM setlists WHERE artist_mbid = ?", (artist_mbid,)
+            ).fetchone()
+        return {
+            "synced_at": row[0],
+            "total": row[1],
+            "per_page": row[2],
+            "complete": bool(row[3]),
+            "backfilled": row[4],
+            "count": count,
+            "oldest": date.fromisoformat(oldest) if oldest else None,
+        }
+
+    def is_fresh(self, artist_mbid) -> bool:
+        state = self.sync_state(artist_mbid)
+        return state is not None and time.time() - state["synced_at"] < self.stale_after
+
+    def covers(self, artist_mbid, since: Optional[date] = None, newest = None) -> bool:
+        """True when the index holds every setlist on or after ``since``, the ``newest`` N, or all of them."""
+        state = self.sync_state(artist_mbid)
+        if state is None:
+            return False
+        if state["complete"]:
+            return True
+        if newest is not None and state["count"] >= newest:
+            return True
+        return since is not None and state["oldest"] is not None and state["oldest"] < since
+
+    def _save_state(self, artist_mbid, total, per_page, backfilled):
+        backfilled = min(max(0, backfilled), total)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO artist_sync (artist_mbid, synced_at, total, per_page, complete, backfilled) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (artist_mbid, time.time(), total, per_page, int(backfilled >= total), backfilled)
+            )
+
+    # Writes
+
+    def add(self, artist_mbid, setlists: List[SetListInfo]) -> int:
+        """Upsert setlists; returns how many were not indexed before."""
+        if not setlists:
+            return 0
+        rows = []
+        for s in setlists:
+            parsed = s.event_date
+            rows.append((
+                s.id, artist_mbid, parsed.isoformat() if parsed else None,
+                parsed.year if parsed else None, parsed.month if parsed else None,
+                s.date, s.artist,
+                s.venue, (s.venue or "").lower(),
+                s.city, (s.city or "").lower(),
+                s.country,
+                s.tour, (s.tour or "").lower(),
+                s.url, s.venue_id,
+            ))
+        ids = [s.id for s in setlists]
+        with self.lock:
+            known = self.conn.execute(
+                f"SELECT COUNT(*) FROM setlists WHERE id IN ({','.join('?' * len(ids))})", ids
+            ).fetchone()[0]
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO setlists VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.conn.execute("COMMIT")
+        return len(ids) - known
+
+    def sync(self, client, artist_mbid, since: Optional[date] = None, newest = None, max_pages = None):
+        """Bring the index up to date for one artist; concurrent callers share one sync."""
+        return self.single_flight.do(artist_mbid, self._sync, client, artist_mbid, since, newest, max_pages)
+
+    def _sync(self, client, artist_mbid, since, newest, max_pages):
+        budget = self.backfill_pages if max_pages is None else max_pages
+        state = self.sync_state(artist_mbid)
+        fetched = 0
+
+        if state is None or time.time() - state["synced_at"] >= self.stale_after:
+            fetched += self._sync_newest(client, artist_mbid, state, budget)
+
+        state = self.sync_state(artist_mbid)
+        while not state["complete"] and fetched < budget and not self.covers(artist_mbid, since, newest):
+            per_page = state["per_page"]
+            first = state["backfilled"] // per_page + 1
+            last = min(-(-state["total"] // per_page), first + budget - fetched - 1)
+            if newest is not None:
+                # Do not prefetch past the page holding the newest-th setlist
+                last = min(last, max(first, -(-newest // per_page)))
+            planned = range(first, last + 1)
+            pages = client.iter_artist_setlists_pages(artist_mbid, planned, prefetch=self.prefetch)
+            added = 0
+            try:
+                for page, data in zip(planned, pages):
+                    fetched += 1
+                    added, shifted = self._backfill_page(client, artist_mbid, state, page, data)
+                    state = self.sync_state(artist_mbid)
+                    if shifted:
+                        # Pages still in flight were planned from the old numbering
+                        if shifted > 0 and fetched < budget:
+                            fetched += self._sync_newest(client, artist_mbid, state, budget - fetched)
+                            state = self.sync_state(artist_mbid)
+                        break
+                    if not added or state["complete"] or self.covers(artist_mbid, since, newest):
+                        break
+            finally:
+                pages.close()
+            if not added:
+                # Nothing new here; leave the rest to the next sync rather than spend the budget on known pages
+                break
+
+        if fetched:
+            logger.info(f"Synced setlist index for {artist_mbid}: {fetched} pages, {state['count']} setlists")
+        return fetched
+
+    def _backfill_page(self, client, artist_mbid, state, page, data):
+        """Index one backfill page and move the backfill position.
+
+        Returns the number of new setlists and how much the upstream total
+        changed since ``state`` was saved.
+        """
+        per_page = state["per_page"]
+        setlists = client.parser.parse_setlist_search(data)
+        added = self.add(artist_mbid, setlists)
+        total = data.get("total", 0)
+        shifted = total - state["total"]
+
+        if shifted < 0:
+            # Setlists were deleted somewhere above the backfill position;
+            # step back far enough that none of the ones it moved past are skipped
+            self._save_state(artist_mbid, total, per_page, state["backfilled"] + shifted)
+        elif shifted > 0:
+            # New setlists were published since the last sync, so this page is
+            # in the shifted numbering; the caller picks up the new ones at the top
+            self._save_state(artist_mbid, total, per_page, page * per_page)
+        else:
+            self._save_state(artist_mbid, total, per_page, page * per_page if setlists else total)
+        return added, shifted
+
+    def _sync_newest(self, client, artist_mbid, state, budget):
+        """Fetch newest-first pages until one contains setlists already indexed."""
+        page = 1
+        while True:
+            data = client.get_artist_setlists_page(artist_mbid, page)
+            setlists = client.parser.parse_setlist_search(data)
+            added = self.add(artist_mbid, setlists)
+            per_page = data.get("itemsPerPage") or 20
+            total = data.get("total", 0)
+            overlap = added < len(setlists)
+            # A first sync stops after page 1 and leaves the rest to the backfill
+            if state is None or overlap or page * per_page >= total or page >= budget:
+                break
+            page += 1
+
+        # Pages 1..page are indexed without gaps
+        backfilled = page * per_page
+        if state is not None and overlap:
+            # New setlists are listed first, so the backfill position moved down by
+            # as many as the total grew; deletions make that an underestimate, never an overshoot
+            backfilled = max(backfilled, state["backfilled"] + total - state["total"])
+        self._save_state(artist_mbid, total, per_page, backfilled)
+        return page
+
+    def browse(self, client, artist_mbid, year = None, month = None, venue = None, city = None, tour = None,
+               prefix = False, limit = None, max_pages = None) -> List[SetListInfo]:
+        """Answer a filtered query locally, syncing first only when the index is stale or too shallow."""
+        since = date(int(year), int(month) if month else 1, 1) if year else None
+        # Unfiltered browsing only needs the newest ``limit`` setlists
+        newest = limit if limit and not any((year, month, venue, city, tour)) else None
+        if not (self.is_fresh(artist_mbid) and self.covers(artist_mbid, since, newest)):
+            self.sync(client, artist_mbid, since=since, newest=newest, max_pages=max_pages)
+        return self.query(
+            artist_mbid, year=year, month=month, venue=venue, city=city, tour=tour, prefix=prefix, limit=limit
+        )
+
+    def recent(self, client, artist_mbid, days = 365, limit = 20) -> List[SetListInfo]:
+        """Newest ``limit`` setlists from the last ``days`` days.
+
+        A fresh index answers without any upstream call; a stale one only
+        re-checks the newest page.
+        """
+        since = date.today() - timedelta(days=days)
+        if not (self.is_fresh(artist_mbid) and self.covers(artist_mbid, since, limit)):
+            self.sync(client, artist_mbid, since=since, newest=limit)
+        return self.query(artist_mbid, since=since, limit=limit)
+
+    # Queries
+
+    def query(self, artist_mbid, year = None, month = None, venue = None, city = None, tour = None,
+              prefix = False, limit = None, since: Optional[date] = None) -> List[SetListInfo]:
+        clauses = ["artist_mbid = ?"]
+        params = [artist_mbid]
+        if since:
+            clauses.append("event_date >= ?")
+            params.append(since.isoformat())
+        if year:
+            clauses.append("year = ?")
+            params.append(int(year))
+        if month:
+            clauses.append("month = ?")
+            params.append(int(month))
+        for column, value in (("venue_lc", venue), ("city_lc", city), ("tour_lc", tour)):
+            if not value:
+                continue
+            value = value.lower()
+            if prefix:
+                # Range scan on the (artist, column) index
+                clauses.append(f"{column} >= ? AND {column} < ?")
+                params.extend([value, _prefix_upper_bound(value)])
+            else:
+                clauses.append(f"instr({column}, ?) > 0")
+                params.append(value)
+
+        sql = (
+            "SELECT id, artist, date, venue, city, country, tour, url, venue_id, artist_mbid FROM setlists "
+            f"WHERE {' AND '.join(clauses)} ORDER BY event_date DESC"
+        )
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [SetListInfo(*row) for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
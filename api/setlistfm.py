@@ -1,11 +1,17 @@
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from itertools import islice
 from dotenv import load_dotenv
 
 from api.models import Song, SetListInfo
+from api.serialization import iter_array_items
+from api.cache_policy import CachePolicies
 from api.exceptions import (
     APIError, NotFoundError)
 from api.utils import (
-    RateLimiter, CacheManager, RequestHandler
+    RateLimiter, CacheBackend, CacheManager, RequestHandler, build_session
 )
 
 logging.basicConfig(level=logging.INFO)
@@ -16,95 +22,166 @@ load_dotenv()
 class SetlistFMError(APIError):
     pass
 
+# Shared stand-in for missing nested objects, so lookups do not allocate; never mutated
+_EMPTY = {}
+
 class DataParser:
     @staticmethod
     def parse_artist_search(data):
-        if 'artist' not in data:
-            return []
-        
-        artists = []
-        for artist_data in data['artist']:
-            artist = {
+        return [
+            {
                 'name': artist_data.get('name', ''),
                 'mbid': artist_data.get('mbid', ''),
                 'disambiguation': artist_data.get('disambiguation', ''),
                 'url': artist_data.get('url', '')
             }
-            artists.append(artist)
-        
-        return artists
+            for artist_data in data.get('artist') or ()
+        ]
 
     @staticmethod
     def parse_setlist_search(data):
-        if 'setlist' not in data:
-            return []
-        
-        setlists = []
-        for setlist_data in data['setlist']:
-            setlist = DataParser.parse_setlist_info(setlist_data)
-            setlists.append(setlist)
-        
-        return setlists
+        parse = DataParser.parse_setlist_info
+        return [parse(setlist_data) for setlist_data in data.get('setlist') or ()]
+
+    @staticmethod
+    def iter_setlist_search(data):
+        """Yield a page's setlists one by one.
+
+        ``data`` is a decoded page or the raw response body; a raw body is
+        decoded one setlist at a time, so the first setlists are ready
+        before the rest of the page has been decoded.
+        """
+        if isinstance(data, (bytes, bytearray, str)):
+            items = iter_array_items(data, 'setlist')
+        else:
+            items = data.get('setlist') or ()
+        for setlist_data in items:
+            yield DataParser.parse_setlist_info(setlist_data)
     
     @staticmethod
     def parse_setlist_info(setlist_data):
-        venue_info = setlist_data.get('venue', {})
-        city_info = venue_info.get('city', {})
+        get = setlist_data.get
+        venue_info = get('venue') or _EMPTY
+        city_info = venue_info.get('city') or _EMPTY
+        artist_info = get('artist') or _EMPTY
+        tour_info = get('tour')
 
         return SetListInfo(
-            id=setlist_data.get('id', ''),
-            artist=setlist_data.get('artist', {}).get('name', 'Unknown Artist'),
-            date=setlist_data.get('eventDate', ''),
+            id=get('id', ''),
+            artist=artist_info.get('name', 'Unknown Artist'),
+            date=get('eventDate', ''),
             venue=venue_info.get('name', 'Unknown Venue'),
             city=city_info.get('name', 'Unknown City'),
-            country=city_info.get('country', {}).get('name', 'Unknown Country'),
-            tour=setlist_data.get('tour', {}).get('name') if setlist_data.get('tour') else None,
-            url=setlist_data.get('url', ''),
+            country=(city_info.get('country') or _EMPTY).get('name', 'Unknown Country'),
+            tour=tour_info.get('name') if tour_info else None,
+            url=get('url', ''),
             venue_id=venue_info.get('id'),
-            artist_mbid=setlist_data.get('artist', {}).get('mbid')
+            artist_mbid=artist_info.get('mbid')
         )
     
     @staticmethod
     def parse_setlist_songs(setlist_data):
-        songs = []
-
-        if 'sets' not in setlist_data or 'set' not in setlist_data['sets']:
-            return songs
+        sets = (setlist_data.get('sets') or _EMPTY).get('set')
+        if not sets:
+            return []
         
-        artist_name = setlist_data.get('artist', {}).get('name', 'Unknown Artist')
+        artist_name = (setlist_data.get('artist') or _EMPTY).get('name', 'Unknown Artist')
+        songs = []
 
-        for set_idx, set_data in enumerate(setlist_data['sets']['set']):
-            if 'song' not in set_data:
+        for set_idx, set_data in enumerate(sets, 1):
+            song_list = set_data.get('song')
+            if not song_list:
                 continue
             
             encore_level = set_data.get('encore', 0)
 
-            for song_idx, song_data in enumerate(set_data['song']):
+            for song_idx, song_data in enumerate(song_list, 1):
                 # if song_data.get('tape', False):
                     # continue
-                cover_info = song_data.get('cover', {})
+                cover_info = song_data.get('cover')
+                cover = cover_info.get('name') if cover_info else None
 
-                song = Song(
+                songs.append(Song(
                     name=song_data.get('name', ''),
                     artist=artist_name,
                     encore=encore_level,
-                    cover=cover_info.get('name') if cover_info else None,
-                    original_artist=cover_info.get('name') if cover_info else artist_name,
+                    cover=cover,
+                    original_artist=cover or artist_name,
                     info=song_data.get('info', ''),
                     tape=song_data.get('tape', False),
-                    position=song_idx + 1,
-                    set_number=set_idx + 1
-                )
-                songs.append(song)
+                    position=song_idx,
+                    set_number=set_idx
+                ))
 
         return songs
 
+def _page_count(data):
+    per_page = data.get('itemsPerPage') or len(data.get('setlist', [])) or 1
+    total = data.get('total', 0)
+    return max(1, -(-total // per_page))
+
+def _period_start(month, year):
+    if not year:
+        return None
+    return date(int(year), int(month) if month else 1, 1)
+
+def _is_before(setlists, period_start):
+    """True once the oldest dated setlist on a page predates ``period_start``."""
+    start = period_start.toordinal()
+    for s in reversed(setlists):
+        if s.date_ordinal:
+            return s.date_ordinal < start
+    return False
+
+def _take_recent(setlists, cutoff, limit):
+    """Collect up to ``limit`` setlists dated on or after ``cutoff``.
+
+    Returns the collected setlists and whether paging can stop.
+    """
+    recent = []
+    cutoff = cutoff.toordinal()
+    for s in setlists:
+        if s.date_ordinal and s.date_ordinal < cutoff:
+            return recent, True
+        recent.append(s)
+        if len(recent) >= limit:
+            return recent, True
+    return recent, False
+
+def _matches(s, month, year, venue, tour):
+    if (month or year) and s.date_ordinal:
+        event_date = s.event_date
+        if month and event_date.month != int(month):
+            return False
+        if year and event_date.year != int(year):
+            return False
+
+    if venue and venue.lower() not in (s.venue or "").lower():
+        return False
+
+    if tour and tour.lower() not in (s.tour or "").lower():
+        return False
+
+    return True
+
 class SetlistFMClient:
-    def __init__(self, api_key, cache_ttl = 300):
+    def __init__(self, api_key, cache_ttl = 300, pool_size = 10, base_url = None,
+                 cache_max_entries = 1024, cache_max_bytes = 64 * 1024 * 1024, cache: CacheBackend = None,
+                 rate_limiter: RateLimiter = None, artist_mbid_ttl = 7 * 86400, cache_policies: CachePolicies = None):
         self.api_key = api_key
-        self.rate_limiter = RateLimiter()
-        self.cache = CacheManager(default_ttl=cache_ttl)
-        self.request_handler = RequestHandler(api_key, self.rate_limiter, self.cache)
+        self.artist_mbid_ttl = artist_mbid_ttl
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.cache = cache if cache is not None else CacheManager(
+            default_ttl=cache_ttl,
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes
+        )
+        self.session = build_session(pool_size)
+        self.request_handler = RequestHandler(
+            api_key, self.rate_limiter, self.cache,
+            session=self.session, base_url=base_url,
+            cache_policies=cache_policies or CachePolicies(default_ttl=cache_ttl)
+        )
         self.parser = DataParser()
 
 
@@ -120,13 +197,12 @@ class SetlistFMClient:
         return self.parser.parse_artist_search(data)
     
     def get_artist_setlists(self, artistmbid, page = 1):
+        return self.parser.parse_setlist_search(self.get_artist_setlists_page(artistmbid, page))
+
+    def get_artist_setlists_page(self, artistmbid, page):
         endpoint = f'/artist/{artistmbid}/setlists'
         params = {'p': page}
-
-        data = self.request_handler.make_request(endpoint, params)
-        setlists = self.parser.parse_setlist_search(data)
-        
-        return setlists
+        return self.request_handler.make_request(endpoint, params)
     
     def get_artist_setlists_filtered(
         self,
@@ -137,51 +213,102 @@ class SetlistFMClient:
         venue=None,
         tour=None
     ):
-        results = []
-        page = 1
+        return list(self.iter_artist_setlists_filtered(
+            artistmbid, page_limit=page_limit, month=month, year=year, venue=venue, tour=tour
+        ))
 
-        while page <= page_limit:
-            setlists = self.get_artist_setlists(artistmbid, page)
-            if not setlists:
-                break
+    def iter_artist_setlists_pages(self, artistmbid, pages, prefetch = 3):
+        """Yield raw setlist pages in the order of ``pages``, keeping up to ``prefetch`` requests in flight.
 
-            for s in setlists:
-                if (month or year) and s.formatted_date:
-                    if month and s.formatted_date.month != int(month):
-                        continue
-                    if year and s.formatted_date.year != int(year):
-                        continue
+        Closing the generator early cancels the pages not yet requested.
+        """
+        pages = iter(pages)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="setlistfm-pages") as pool:
+            try:
+                while True:
+                    # The shared rate limiter still paces the actual requests
+                    for page in islice(pages, prefetch - len(pending)):
+                        pending.append(pool.submit(self.get_artist_setlists_page, artistmbid, page))
+                    if not pending:
+                        return
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
 
-                if venue and venue.lower() not in (s.venue or "").lower():
-                    continue
+    def iter_artist_setlists_filtered(
+        self,
+        artistmbid,
+        page_limit=5,
+        month=None,
+        year=None,
+        venue=None,
+        tour=None,
+        prefetch=3
+    ):
+        """Yield matching setlists page by page while later pages are fetched.
 
-                if tour and tour.lower() not in (s.tour or "").lower():
-                    continue
+        setlist.fm lists setlists newest first, so with a year filter paging
+        stops at the first page that reaches back past the requested period.
+        """
+        period_start = _period_start(month, year)
 
-                results.append(s)
+        first_page = self.get_artist_setlists_page(artistmbid, 1)
+        last_page = min(page_limit, _page_count(first_page))
+        pages = self.iter_artist_setlists_pages(artistmbid, range(2, last_page + 1), prefetch)
+        data = first_page
+        try:
+            while data is not None:
+                setlists = self.parser.parse_setlist_search(data)
+                for s in setlists:
+                    if _matches(s, month, year, venue, tour):
+                        yield s
 
-            page += 1
+                if not setlists:
+                    break
+                if period_start and _is_before(setlists, period_start):
+                    logger.debug(f"Stopping early, setlists are older than {period_start}")
+                    break
 
-        return results
+                data = next(pages, None)
+        finally:
+            pages.close()
     
-    def get_recent_setlists(self, artist_name, days = 365, limit = 20):
+    def resolve_artist_mbid(self, artist_name):
+        """Best search match for an artist name, cached much longer than search responses."""
+        key = f"artist-mbid:{artist_name.strip().lower()}"
+        mbid = self.cache.get(key)
+        if mbid is not None:
+            return mbid
+
         artists = self.search_artist(artist_name)
         if not artists:
             raise NotFoundError(f"{artist_name} was not found")
 
-        artist_mbid = artists[0]['mbid']
-        all_setlists = []
+        mbid = artists[0]['mbid']
+        self.cache.set(key, mbid, ttl=self.artist_mbid_ttl)
+        return mbid
+
+    def get_recent_setlists(self, artist_name = None, days = 365, limit = 20, artist_mbid = None):
+        """Newest setlists from the last ``days`` days, at most ``limit`` of them.
+
+        Paging stops at the first setlist older than the window.
+        """
+        artist_mbid = artist_mbid or self.resolve_artist_mbid(artist_name)
+        cutoff = date.today() - timedelta(days=days)
+        recent = []
         page = 1
 
-        while len(all_setlists) < limit:
-            setlists = self.get_artist_setlists(artist_mbid, page)
-            if not setlists:
+        while len(recent) < limit:
+            data = self.get_artist_setlists_page(artist_mbid, page)
+            taken, done = _take_recent(self.parser.parse_setlist_search(data), cutoff, limit - len(recent))
+            recent.extend(taken)
+            if done or page >= _page_count(data):
                 break
-
-            all_setlists.extend(setlists)
             page += 1
-        
-        return all_setlists
+
+        return recent
     
     def get_setlist_songs(self, setlist_id):
         endpoint = f'/setlist/{setlist_id}'
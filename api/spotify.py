@@ -1,83 +1,531 @@
 from dotenv import load_dotenv
 import spotipy
+from spotipy.exceptions import SpotifyException
+from spotipy.cache_handler import MemoryCacheHandler
 from spotipy.oauth2 import SpotifyOAuth, SpotifyClientCredentials
-import logging, time
-from typing import List, Optional
+from urllib3.util.retry import Retry
+import logging, time, random, threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from api.models import Song, SetListInfo
+from api.models import Song, SetListInfo, PlaylistWriteResult
 from api.exceptions import APIError, AuthenticationError
+from api.utils import AdaptiveConcurrency, CacheManager, SingleFlight, build_session
+from api.track_cache import MISSING, normalize_key
+from api.matching import TrackMatcher
+from api.catalog import ArtistCatalog
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 load_dotenv()
 
 class SpotifyError(APIError):
-    pass
+    def __init__(self, message, http_status = None):
+        super().__init__(message)
+        self.http_status = http_status
 
-def _is_valid_album(album_name: str) -> bool:
-    name_lower = album_name.lower()
-    invalid_keywords = ["compilation", "greatest hits", "remaster", "live", "version"]
-    return not any(word in name_lower for word in invalid_keywords)
+def _retry_after(error: SpotifyException, default: float = 1.0) -> float:
+    try:
+        return float((error.headers or {}).get("Retry-After", default))
+    except (TypeError, ValueError):
+        return default
+
+def _server_error_retry() -> Retry:
+    # 429s are left to SpotifyAppClient._call so the adaptive limiter sees them
+    return Retry(
+        total=3,
+        connect=None,
+        read=False,
+        status=3,
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+
+def _backoff(attempt, backoff_base = 0.5, backoff_max = 10.0) -> float:
+    return random.uniform(0, min(backoff_max, backoff_base * 2 ** attempt))
+
+def _with_retries(method, *args, max_retries = 4, backoff_base = 0.5, backoff_max = 10.0, retry_server_errors = True,
+                  **kwargs):
+    """Call a spotipy method, retrying 429s after Retry-After and 5xx with jittered backoff.
+
+    Pass ``retry_server_errors=False`` for calls that are not idempotent:
+    after a 5xx the request may still have been applied.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return method(*args, **kwargs)
+        except SpotifyException as e:
+            status = e.http_status
+            # spotipy leaves the status unset for errors below HTTP
+            retryable = status is not None and (status == 429 or (status >= 500 and retry_server_errors))
+            if not retryable or attempt == max_retries:
+                raise
+            if status == 429:
+                delay = _retry_after(e) * (1 + random.random())
+            else:
+                delay = _backoff(attempt, backoff_base, backoff_max)
+        logger.info(f"[User] Spotify returned {status}, retrying in {delay:.2f}s")
+        time.sleep(delay)
+
+class SharedClientCredentials(SpotifyClientCredentials):
+    """Client-credentials token for a process-wide app client.
+
+    The token is renewed ``refresh_margin`` seconds before it expires, by one
+    thread at a time. While a renewal is in flight, other threads keep using
+    the current token if it is still valid instead of queueing behind it.
+    """
+
+    def __init__(self, *args, refresh_margin = 300, **kwargs):
+        kwargs.setdefault("cache_handler", MemoryCacheHandler())
+        super().__init__(*args, **kwargs)
+        self.refresh_margin = refresh_margin
+        self.token_requests = 0
+        self._refresh_lock = threading.Lock()
+
+    def _remaining(self, token_info) -> float:
+        return token_info["expires_at"] - time.time() if token_info else 0
+
+    def get_access_token(self, as_dict = False, check_cache = True):
+        token_info = self.cache_handler.get_cached_token() if check_cache else None
+        if self._remaining(token_info) <= self.refresh_margin:
+            # Only wait for the renewal when the current token is (nearly) expired
+            usable = self._remaining(token_info) > 60
+            if self._refresh_lock.acquire(blocking=not usable):
+                try:
+                    token_info = self.cache_handler.get_cached_token() if check_cache else None
+                    if self._remaining(token_info) <= self.refresh_margin:
+                        logger.info("Fetching Spotify app access token")
+                        self.token_requests += 1
+                        token_info = self._add_custom_values_to_token_info(self._request_access_token())
+                        self.cache_handler.save_token_to_cache(token_info)
+                finally:
+                    self._refresh_lock.release()
+        return token_info if as_dict else token_info["access_token"]
 
 class SpotifyAppClient:
-    def __init__(self, client_id, client_secret):
+    max_throttle_retries = 5
+    ARTIST_BATCH_SIZE = 50
+
+    def __init__(self, client_id, client_secret, max_workers = 8, api_prefix = None, auth_manager = None,
+                 artist_cache_ttl = 3600, track_cache = None, catalog_ttl = 86400, catalog_min_songs = 5,
+                 empty_search_ttl = 3600, catalog_max_tracks = 5000, catalog_max_bytes = 128 * 1024 * 1024):
         if not client_id or not client_secret:
             raise AuthenticationError("Spotify API credentials not found")
-        self.sp = spotipy.Spotify(
-            auth_manager=SpotifyClientCredentials(
-                client_id=client_id,
-                client_secret=client_secret
-            )
+        # Calls are capped at max_workers in flight by self.concurrency, so a
+        # pool of that size keeps every connection alive between requests
+        session = build_session(pool_size=max_workers, max_retries=_server_error_retry())
+        self.auth_manager = auth_manager or SharedClientCredentials(
+            client_id=client_id,
+            client_secret=client_secret,
+            requests_session=session
         )
+        self.sp = spotipy.Spotify(auth_manager=self.auth_manager, requests_session=session)
+        if api_prefix:
+            self.sp.prefix = api_prefix
+        self.max_workers = max_workers
+        self.concurrency = AdaptiveConcurrency(max_limit=max_workers)
+        self.artist_images = CacheManager(default_ttl=artist_cache_ttl)
+        self.track_cache = track_cache
+        # Queries Spotify had no tracks for; a match cascade often repeats them
+        self.empty_searches = CacheManager(default_ttl=empty_search_ttl)
+        self.single_flight = SingleFlight()
+        self.matcher = TrackMatcher(self._search_candidates)
+        self.catalog = ArtistCatalog(self, ttl=catalog_ttl, max_tracks=catalog_max_tracks, max_bytes=catalog_max_bytes)
+        # Setlists with fewer uncached songs by the main artist just search; None disables the catalog
+        self.catalog_min_songs = catalog_min_songs
+        self.request_counts = Counter()
+        # Calls answered from a cached "nothing there" instead of Spotify
+        self.negative_hits = Counter()
+        # setlists, songs, catalog_hits and Spotify calls, summed over resolutions
+        self.resolve_stats = Counter()
+        self._counts_lock = threading.Lock()
+
+    def _call(self, method, *args, **kwargs):
+        with self._counts_lock:
+            self.request_counts[method.__name__] += 1
+        for attempt in range(self.max_throttle_retries + 1):
+            throttled = False
+            self.concurrency.acquire()
+            try:
+                return method(*args, **kwargs)
+            except SpotifyException as e:
+                if e.http_status != 429 or attempt == self.max_throttle_retries:
+                    raise
+                throttled = True
+                delay = _retry_after(e) * (1 + random.random())
+            finally:
+                self.concurrency.release(throttled=throttled)
+            logger.info(f"[App] Spotify rate limited, retrying in {delay}s")
+            time.sleep(delay)
+
+    def get_artist_images(self, artist_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Image URL per artist id, fetched in batches of 50 and cached."""
+        images = {}
+        missing = []
+        for artist_id in dict.fromkeys(artist_ids):
+            cached = self.artist_images.get(artist_id)
+            if cached is not None:
+                images[artist_id] = cached or None
+            else:
+                missing.append(artist_id)
+
+        for start in range(0, len(missing), self.ARTIST_BATCH_SIZE):
+            batch = missing[start:start + self.ARTIST_BATCH_SIZE]
+            try:
+                artists = self._call(self.sp.artists, batch).get("artists", [])
+            except Exception as e:
+                logger.warning(f"Error fetching artist images: {e}")
+                continue
+            for artist_id, artist in zip(batch, artists):
+                if not artist:
+                    # Unknown ids come back as null; remember them as imageless
+                    self.artist_images.set(artist_id, "")
+                    images[artist_id] = None
+                    continue
+                artist_images = artist.get("images", [])
+                url = artist_images[0]["url"] if artist_images else None
+                # "" marks an artist without images so it is not refetched
+                self.artist_images.set(artist["id"], url or "")
+                images[artist["id"]] = url
+
+        return images
 
     def get_artist_image(self, artist_id: str) -> Optional[str]:
+        return self.get_artist_images([artist_id]).get(artist_id)
+
+    def search_track(self, song: Song):
+        track_data = self._search_track(song)
+        if track_data:
+            track_data["artist_image"] = self.get_artist_image(track_data["artist_id"])
+        return track_data
+
+    def _search_track(self, song: Song, lookup: bool = True):
+        """Search one song; ``lookup=False`` skips the track cache for songs
+        the caller already looked up, so each miss is counted once."""
+        key = normalize_key(song.name, song.original_artist)
+        if lookup and self.track_cache is not None:
+            cached = self.track_cache.get(key)
+            if cached is not MISSING:
+                return dict(cached) if cached else None
+
+        # Concurrent searches for the same song share one Spotify call
+        track_data = self.single_flight.do(key, self._search_uncached, song, key)
+        return dict(track_data) if track_data else None
+
+    def _search_uncached(self, song: Song, key: str):
         try:
-            artist = self.sp.artist(artist_id)
-            images = artist.get("images", [])
-            return images[0]["url"] if images else None
+            track_data = self._query_track(song)
         except Exception as e:
-            logger.warning(f"Error fetching artist image: {e}")
+            # Failures are not cached; only "Spotify has no match" is
+            logger.warning(f"[App] Spotify search failed for {song.name} - {song.original_artist}: {e}")
             return None
 
-    def search_track(self, song: Song):
-        query = f"track:{song.name} artist:{song.original_artist}"
+        if self.track_cache is not None:
+            self.track_cache.set(key, track_data)
+        return track_data
+
+    def _search_candidates(self, query, limit):
+        if self.empty_searches.get(query) is not None:
+            with self._counts_lock:
+                self.negative_hits["search"] += 1
+            return []
         logger.info(f"[App] Spotify search: {query}")
-        try:
-            results = self.sp.search(q=query, type="track", limit=5)
-            tracks = results.get("tracks", {}).get("items", [])
-            if not tracks:
-                return None
+        results = self._call(self.sp.search, q=query, type="track", limit=limit)
+        items = results.get("tracks", {}).get("items", [])
+        if not items:
+            self.empty_searches.set(query, True)
+        return items
 
-            filtered = [t for t in tracks if _is_valid_album(t["album"]["name"])]
+    def _query_track(self, song: Song):
+        track, _, _ = self.matcher.match(song.name, song.original_artist)
+        return self._track_data(track) if track else None
 
-            def artist_match(t):
-                return any(a["name"].lower() == song.original_artist.lower() for a in t["artists"])
+    @staticmethod
+    def _track_data(track):
+        return {
+            "uri": track["uri"],
+            "name": track["name"],
+            "album": track["album"]["name"],
+            "album_image": track["album"]["images"][0]["url"] if track["album"]["images"] else None,
+            "artist_id": track["artists"][0]["id"],
+            "artist_image": None,
+        }
 
-            filtered = [t for t in filtered if artist_match(t)] or filtered
-            track = filtered[0]
+    def _lookup_cached(self, unique: Dict[str, Song]) -> Tuple[Dict[str, Optional[dict]], Dict[str, Song]]:
+        """Split songs into cached track data and songs still to resolve,
+        looking each key up in the track cache exactly once."""
+        if self.track_cache is None:
+            return {}, dict(unique)
+        cached, pending = {}, {}
+        for key, song in unique.items():
+            track_data = self.track_cache.get(key)
+            if track_data is MISSING:
+                pending[key] = song
+            else:
+                cached[key] = dict(track_data) if track_data else None
+        return cached, pending
 
-            artist_id = track["artists"][0]["id"]
-            artist_image = self.get_artist_image(artist_id)
+    def _prematch(self, pending: Dict[str, Song]) -> Dict[str, dict]:
+        """Match the main artist's uncached songs against their catalog.
 
-            return {
-                "uri": track["uri"],
-                "name": track["name"],
-                "album": track["album"]["name"],
-                "album_image": track["album"]["images"][0]["url"] if track["album"]["images"] else None,
-                "artist_image": artist_image,
-            }
+        Returns the matched track data by key; covers, songs the catalog
+        has no match for, and setlists with too few songs by one artist are
+        left for search.
+        """
+        if self.catalog_min_songs is None:
+            return {}
+        artists = Counter(song.original_artist for song in pending.values() if song.original_artist)
+        if not artists:
+            return {}
+        artist, count = artists.most_common(1)[0]
+        if count < self.catalog_min_songs:
+            return {}
+
+        try:
+            artist_id = self.catalog.artist_id(artist)
+            tracks = self.catalog.tracks(artist_id) if artist_id else {}
         except Exception as e:
-            logger.warning(f"[App] Spotify search failed for {query}: {e}")
-            return None
+            logger.warning(f"[App] Spotify catalog fetch failed for {artist}: {e}")
+            return {}
+
+        matched = {}
+        for key, song in pending.items():
+            if song.original_artist != artist:
+                continue
+            track = self.catalog.match(tracks, song.name, artist)
+            if track is None:
+                continue
+            matched[key] = self._track_data(track)
+            if self.track_cache is not None:
+                self.track_cache.set(key, matched[key])
+        return matched
+
+    def _record_resolution(self, songs, catalog_hits, calls_before):
+        calls = sum(self.request_counts.values()) - calls_before
+        with self._counts_lock:
+            self.resolve_stats.update(
+                setlists=1, songs=len(songs), catalog_hits=catalog_hits, calls=calls
+            )
+        # Calls from setlists resolving at the same time are included too
+        logger.info(f"[App] Resolved {len(songs)} songs with {calls} Spotify calls ({catalog_hits} from catalog)")
+
+    def resolve_tracks(self, songs: List[Song]) -> List[Optional[dict]]:
+        """Resolve every song, from the artist catalog where possible and
+        searching the rest concurrently; results keep the order of ``songs``."""
+        calls_before = sum(self.request_counts.values())
+        keys = [normalize_key(song.name, song.original_artist) for song in songs]
+        unique = {}
+        for key, song in zip(keys, songs):
+            unique.setdefault(key, song)
+
+        resolved, pending = self._lookup_cached(unique)
+        matched = self._prematch(pending)
+        resolved.update(matched)
+        remaining = {key: song for key, song in pending.items() if key not in matched}
+        if len(remaining) <= 1:
+            resolved.update((key, self._search_track(song, lookup=False)) for key, song in remaining.items())
+        else:
+            workers = min(self.max_workers, len(remaining))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="spotify-resolve") as pool:
+                futures = {key: pool.submit(self._search_track, song, lookup=False) for key, song in remaining.items()}
+                resolved.update((key, future.result()) for key, future in futures.items())
+
+        # One batched artist lookup for the whole setlist instead of one per track
+        tracks = [track for track in resolved.values() if track]
+        images = self.get_artist_images(track["artist_id"] for track in tracks)
+        for track in tracks:
+            track["artist_image"] = images.get(track["artist_id"])
+
+        self._record_resolution(songs, len(matched), calls_before)
+        return [resolved[key] for key in keys]
+
+    def iter_resolve_tracks(self, songs: List[Song]) -> Iterator[Tuple[int, Optional[dict]]]:
+        """Yield ``(index, track)`` for every song as soon as its search finishes.
+
+        Songs come back in completion order, cached and catalog matches
+        first. Artist
+        images are looked up per track instead of in one batch, which costs
+        one call per distinct artist because the lookups are cached.
+        """
+        calls_before = sum(self.request_counts.values())
+        positions = defaultdict(list)
+        unique = {}
+        for index, song in enumerate(songs):
+            key = normalize_key(song.name, song.original_artist)
+            positions[key].append(index)
+            unique.setdefault(key, song)
+        if not unique:
+            return
+
+        found, pending = self._lookup_cached(unique)
+        prematched = self._prematch(pending)
+        found.update(prematched)
+        for key, track in found.items():
+            if track:
+                track["artist_image"] = self.get_artist_image(track["artist_id"])
+            for index in positions[key]:
+                yield index, track
+        remaining = {key: song for key, song in pending.items() if key not in prematched}
+        if not remaining:
+            self._record_resolution(songs, len(prematched), calls_before)
+            return
+
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(remaining)), thread_name_prefix="spotify-resolve")
+        futures = {pool.submit(self._search_track, song, lookup=False): key for key, song in remaining.items()}
+        try:
+            for future in as_completed(futures):
+                track = future.result()
+                if track:
+                    track["artist_image"] = self.get_artist_image(track["artist_id"])
+                for index in positions[futures[future]]:
+                    yield index, track
+            self._record_resolution(songs, len(prematched), calls_before)
+        finally:
+            # A client that disconnects mid-stream should not keep searches queued
+            pool.shutdown(wait=False, cancel_futures=True)
+
+class PlaylistWriter:
+    """Writes track URIs to a playlist in order, 100 per call (Spotify's limit).
+
+    Every chunk is retried on its own; chunks that still fail are reported
+    in the result instead of abandoning the rest of the playlist. Appends
+    are not idempotent, so after a server error the playlist length is
+    read back and the chunk only resent if it did not land.
+    """
+
+    CHUNK_SIZE = 100
+
+    def __init__(self, sp, max_retries = 4, backoff_base = 0.5):
+        self.sp = sp
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+    def _call(self, method, *args, **kwargs):
+        return _with_retries(method, *args, max_retries=self.max_retries, backoff_base=self.backoff_base, **kwargs)
+
+    def length(self, playlist_id) -> int:
+        return self._call(self.sp.playlist_items, playlist_id, fields="total", limit=1)["total"]
+
+    def _append(self, playlist_id, chunk, position):
+        """Append one chunk that should land at ``position`` (the playlist's current length)."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._call(self.sp.playlist_add_items, playlist_id, chunk, retry_server_errors=False)
+            except SpotifyException as e:
+                # Without a status the request failed below HTTP and may still have landed
+                if e.http_status is not None and e.http_status < 500:
+                    raise
+                error = e
+            try:
+                length = self.length(playlist_id)
+            except SpotifyException:
+                raise error
+            if length == position + len(chunk):
+                logger.info(f"Tracks {position}-{length - 1} reached {playlist_id} despite the server error")
+                return
+            # Anything but the old length means the playlist changed some other way
+            if length != position or attempt == self.max_retries:
+                raise error
+            delay = _backoff(attempt, self.backoff_base)
+            logger.info(f"[User] Spotify returned {error.http_status} adding to {playlist_id}, retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+    def add(self, playlist_id, uris: List[str], result: PlaylistWriteResult = None, offset = 0) -> PlaylistWriteResult:
+        """Append ``uris``; ``offset`` is the playlist's length beforehand, where they start."""
+        result = result or PlaylistWriteResult(playlist_id)
+        length = offset
+        # Chunks go out one after another: appending concurrently would
+        # interleave them and lose the setlist order
+        for start in range(0, len(uris), self.CHUNK_SIZE):
+            chunk = uris[start:start + self.CHUNK_SIZE]
+            try:
+                self._append(playlist_id, chunk, length)
+            except SpotifyException as e:
+                logger.warning(f"Failed to add tracks {offset + start}-{offset + start + len(chunk) - 1} to {playlist_id}: {e}")
+                result.failed_chunks.append({"start": offset + start, "count": len(chunk), "error": e.msg})
+            else:
+                result.added += len(chunk)
+                length += len(chunk)
+        return result
+
+    def current_uris(self, playlist_id) -> List[Optional[str]]:
+        uris = []
+        while True:
+            page = self._call(
+                self.sp.playlist_items, playlist_id,
+                fields="items(track(uri)),next", limit=self.CHUNK_SIZE, offset=len(uris)
+            )
+            uris.extend((item.get("track") or {}).get("uri") for item in page["items"])
+            if not page.get("next") or not page["items"]:
+                return uris
+
+    def sync(self, playlist_id, uris: List[str]) -> PlaylistWriteResult:
+        """Make an existing playlist hold exactly ``uris``, touching as little as possible.
+
+        Tracks already in place are kept and only the missing tail is
+        appended. Unwanted tracks are removed when that leaves the rest in
+        order; otherwise the playlist is rewritten in place, which keeps
+        its id and followers. Local or unplayable items have no URI and
+        cannot be removed by one, so a playlist holding any is rewritten.
+        """
+        result = PlaylistWriteResult(playlist_id)
+        current = self.current_uris(playlist_id)
+        wanted = set(uris)
+        kept = [uri for uri in current if uri in wanted]
+
+        if None not in current and kept == uris[:len(kept)]:
+            unwanted = list(dict.fromkeys(uri for uri in current if uri not in wanted and uri))
+            for start in range(0, len(unwanted), self.CHUNK_SIZE):
+                chunk = unwanted[start:start + self.CHUNK_SIZE]
+                self._call(self.sp.playlist_remove_all_occurrences_of_items, playlist_id, chunk)
+            result.removed = len(current) - len(kept)
+            return self.add(playlist_id, uris[len(kept):], result, offset=len(kept))
+
+        first = uris[:self.CHUNK_SIZE]
+        self._call(self.sp.playlist_replace_items, playlist_id, first)
+        result.removed = len(current)
+        result.added = len(first)
+        return self.add(playlist_id, uris[len(first):], result, offset=len(first))
 
 class SpotifyUserClient:
-    def __init__(self, access_token: str):
+    def __init__(self, access_token: str, user_id: str = None):
         if not access_token:
             raise AuthenticationError("Missing Spotify user access token")
-        self.sp = spotipy.Spotify(auth=access_token)
-        self.user_id = self.sp.me()["id"]
+        self.access_token = access_token
+        # No transport-level retries: a blind retry of a playlist append could
+        # add tracks twice, so PlaylistWriter checks whether a chunk landed first
+        self.sp = spotipy.Spotify(auth=access_token, requests_session=build_session(pool_size=4))
+        # A known user id (e.g. from the login session) saves a /me round trip
+        self.user_id = user_id or _with_retries(self.sp.me)["id"]
+        self.writer = PlaylistWriter(self.sp)
+
+    def set_access_token(self, access_token: str):
+        self.access_token = access_token
+        self.sp.set_auth(access_token)
+
+    def resolve_uris(self, songs: List[Song], search_with_app: SpotifyAppClient,
+                     progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """Spotify URIs for the songs found, in setlist order.
+
+        ``progress(resolved, total)`` is called as each song is looked up.
+        """
+        tracks = [None] * len(songs)
+        for resolved, (index, track_data) in enumerate(search_with_app.iter_resolve_tracks(songs), 1):
+            tracks[index] = track_data
+            if progress:
+                progress(resolved, len(songs))
+
+        return [
+            track_data["uri"]
+            for track_data in tracks
+            if track_data and track_data["uri"]
+        ]
 
-    def create_playlist_from_setlist(self, setlist: SetListInfo, songs: List[Song], search_with_app: SpotifyAppClient, public: bool):
+    def create_playlist(self, setlist: SetListInfo, track_uris: List[str], public: bool) -> PlaylistWriteResult:
         playlist_name = setlist.display_title
         description = f"Playlist generated from {setlist.url}"
         logger.info(f"Creating playlist: {playlist_name}")
@@ -89,13 +537,19 @@ class SpotifyUserClient:
             description=description
         )
 
-        track_uris = []
-        for song in songs:
-            track_data = search_with_app.search_track(song)
-            if track_data and track_data["uri"]:
-                track_uris.append(track_data["uri"])
+        result = self.writer.add(playlist["id"], track_uris)
+        result.url = playlist["external_urls"]["spotify"]
+        return result
 
-        if track_uris:
-            self.sp.playlist_add_items(playlist["id"], track_uris)
+    def sync_playlist(self, playlist_id, track_uris: List[str]) -> PlaylistWriteResult:
+        """Bring an existing playlist in line with ``track_uris`` instead of creating a new one."""
+        logger.info(f"Syncing playlist: {playlist_id}")
+        result = self.writer.sync(playlist_id, track_uris)
+        result.url = f"https://open.spotify.com/playlist/{playlist_id}"
+        return result
 
-        return playlist["external_urls"]["spotify"]
+    def create_playlist_from_setlist(self, setlist: SetListInfo, songs: List[Song], search_with_app: SpotifyAppClient,
+                                     public: bool, progress: Optional[Callable[[int, int], None]] = None
+                                     ) -> PlaylistWriteResult:
+        """Create the playlist and add every song found on Spotify, in setlist order."""
+        return self.create_playlist(setlist, self.resolve_uris(songs, search_with_app, progress), public)
@@ -0,0 +1,165 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Returned by get() when nothing is cached; None is a cached "not on Spotify"
+MISSING = object()
+
+def normalize_key(name: str, artist: str) -> str:
+    def clean(value):
+        value = unicodedata.normalize("NFKC", value or "").casefold()
+        return " ".join(value.split())
+    return f"{clean(name)}\x1f{clean(artist)}"
+
+class TrackResolutionCache:
+    """Persistent (song, original artist) -> Spotify track cache backed by SQLite.
+
+    Misses are cached too, with their own shorter TTL. Entries are evicted
+    by expiry and, beyond ``max_entries``, least recently used first. A hit
+    only rewrites ``last_used`` once it is ``touch_interval`` seconds old,
+    so reads of hot entries stay reads on the shared database.
+    """
+
+    def __init__(self, path = ":memory:", ttl = 30 * 86400, negative_ttl = 86400, max_entries = 100_000,
+                 touch_interval = 3600):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes_since_prune = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS track_resolution (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS track_resolution_last_used ON track_resolution (last_used)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS track_resolution_expires_at ON track_resolution (expires_at)")
+
+    def get(self, key: str):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, expires_at, last_used FROM track_resolution WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return MISSING
+            if now - row[2] >= self.touch_interval:
+                self.conn.execute("UPDATE track_resolution SET last_used = ? WHERE key = ?", (now, key))
+            if row[0] is None:
+                self.negative_hits += 1
+                return None
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value: Optional[dict]):
+        now = time.time()
+        ttl = self.ttl if value is not None else self.negative_ttl
+        payload = json.dumps(value) if value is not None else None
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO track_resolution (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, now + ttl, now)
+            )
+            self._writes_since_prune += 1
+            # Pruning is amortised over writes instead of running on every set
+            if self._writes_since_prune >= max(1, self.max_entries // 100):
+                self._prune(now)
+
+    def _prune(self, now):
+        self._writes_since_prune = 0
+        expired = self.conn.execute("DELETE FROM track_resolution WHERE expires_at <= ?", (now,)).rowcount
+        count = self.conn.execute("SELECT COUNT(*) FROM track_resolution").fetchone()[0]
+        overflow = max(0, count - self.max_entries)
+        if overflow:
+            self.conn.execute(
+                "DELETE FROM track_resolution WHERE key IN "
+                "(SELECT key FROM track_resolution ORDER BY last_used LIMIT ?)", (overflow,)
+            )
+        self.evictions += expired + overflow
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM track_resolution").fetchone()[0]
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM track_resolution")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def stats(self):
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+        }
+
+class BackendTrackCache:
+    """Track resolution cache on top of any ``CacheBackend`` (e.g. Redis).
+
+    Values are wrapped so a cached miss (``None``) can be told apart from an
+    absent key.
+    """
+
+    def __init__(self, backend, ttl = 30 * 86400, negative_ttl = 86400, namespace = "track"):
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.namespace = namespace
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        entry = self.backend.get(f"{self.namespace}:{key}")
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            if entry["track"] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+        return entry["track"]
+
+    def set(self, key: str, value: Optional[dict]):
+        ttl = self.ttl if value is not None else self.negative_ttl
+        self.backend.set(f"{self.namespace}:{key}", {"track": value}, ttl=ttl)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,59 @@
+import logging
+import threading
+import time
+
+from api.spotify import SpotifyUserClient
+from api.utils import CacheManager, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+def token_needs_refresh(token, margin = 60) -> bool:
+    """True when the access token expires within ``margin`` seconds."""
+    expires_at = token.get("expires_at")
+    return bool(token.get("refresh_token")) and expires_at is not None and expires_at - time.time() < margin
+
+class UserClientPool:
+    """One ``SpotifyUserClient`` per user, reused across requests.
+
+    Each pooled client keeps its own HTTP session, so repeat requests from
+    a user reuse the open connection and skip the profile lookup entirely.
+    Idle users drop out after ``idle_ttl`` seconds, and the least recently
+    used go first once ``max_users`` is reached.
+    """
+
+    def __init__(self, max_users = 256, idle_ttl = 3600, client_factory = SpotifyUserClient):
+        self.clients = CacheManager(default_ttl=idle_ttl, max_entries=max_users)
+        self.client_factory = client_factory
+        self.lock = threading.Lock()
+        self.refreshes = SingleFlight()
+
+    def get(self, user_id, access_token, client = None) -> SpotifyUserClient:
+        """Pooled client for ``user_id``; ``client``, if given, is one the
+        caller already built for ``access_token`` and is pooled instead of
+        building another when the user has none yet."""
+        built = client
+        client = self.clients.get(user_id)
+        if client is None:
+            with self.lock:
+                client = self.clients.get(user_id)
+                if client is None:
+                    client = built or self.client_factory(access_token, user_id=user_id)
+        elif client.access_token != access_token:
+            client.set_access_token(access_token)
+        # Re-setting renews the idle TTL
+        self.clients.set(user_id, client)
+        return client
+
+    def refresh(self, token, oauth) -> dict:
+        """Exchange the refresh token for a new access token.
+
+        Concurrent requests from one user share a single refresh, since
+        Spotify may rotate the refresh token on use.
+        """
+        def _refresh():
+            logger.info("Refreshing Spotify user access token")
+            return oauth.refresh_access_token(token["refresh_token"])
+        return self.refreshes.do(token["refresh_token"], _refresh)
+
+    def discard(self, user_id):
+        self.clients.delete(user_id)
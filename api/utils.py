@@ -1,113 +1,646 @@
+import os
 import time
+import sys
+import random
+import heapq
+import struct
+import asyncio
 import threading
 import requests
 import logging
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from requests.adapters import HTTPAdapter
 
 from api.exceptions import APIError, RateLimitError, NotFoundError
+from api.serialization import loads
+from api.cache_policy import CachePolicies, cache_entry, conditional_headers, is_empty, is_fresh
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+class LocalBucket:
+    """Token bucket state for one process."""
+
+    blocking = False
+
+    def __init__(self, capacity):
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, rate, capacity, max_wait = None):
+        with self.lock:
+            now = time.monotonic()
+            wait, self.tokens = _take_token(self.tokens, now - self.updated, rate, capacity, max_wait)
+            self.updated = now
+            return wait
+
+class FileBucket:
+    """Token bucket state in a small file, shared by every process that opens it.
+
+    Each reservation holds an exclusive file lock just long enough to
+    read, update and write back two floats.
+    """
+
+    # Waiting on another process's file lock would stall an event loop
+    blocking = True
+
+    def __init__(self, path, capacity):
+        if fcntl is None:
+            raise RuntimeError("A shared rate limit file needs fcntl (POSIX only)")
+        self.path = path
+        self.lock = threading.Lock()
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self.lock, self._file_lock():
+            if os.fstat(self.fd).st_size < _BUCKET_RECORD.size:
+                self._write(float(capacity), time.time())
+
+    def reserve(self, rate, capacity, max_wait = None):
+        with self.lock, self._file_lock():
+            tokens, updated = _BUCKET_RECORD.unpack(os.pread(self.fd, _BUCKET_RECORD.size, 0))
+            now = time.time()
+            wait, tokens = _take_token(tokens, max(0.0, now - updated), rate, capacity, max_wait)
+            self._write(tokens, now)
+            return wait
+
+    def _write(self, tokens, updated):
+        os.pwrite(self.fd, _BUCKET_RECORD.pack(tokens, updated), 0)
+
+    @contextmanager
+    def _file_lock(self):
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def close(self):
+        os.close(self.fd)
+
+_BUCKET_RECORD = struct.Struct("dd")
+
+def _take_token(tokens, elapsed, rate, capacity, max_wait):
+    """Refill, then take one token. Returns (wait seconds or None, new token count).
+
+    Tokens may go negative: that is a reservation for a future slot, which
+    the caller waits out *after* the lock is released.
+    """
+    tokens = min(capacity, tokens + elapsed * rate)
+    wait = max(0.0, (1 - tokens) / rate)
+    if max_wait is not None and wait > max_wait:
+        return None, tokens
+    return wait, tokens - 1
+
 class RateLimiter:
+    """Token bucket allowing ``max_requests`` per ``time_window`` seconds.
+
+    Callers reserve a slot under a short lock and sleep outside it, so a
+    waiting thread never blocks others. Pass ``shared_path`` to share one
+    budget between processes on the same host.
+    """
+
+    def __init__(self, max_requests = 2, time_window = 1, shared_path = None):
+        self.max_requests = max_requests
+        self.time_window = time_window
+        self.rate = max_requests / time_window
+        self.capacity = max_requests
+        self.bucket = FileBucket(shared_path, self.capacity) if shared_path else LocalBucket(self.capacity)
+
+    def try_acquire(self, timeout = 0.0) -> bool:
+        """Take a token if one is available within ``timeout`` seconds."""
+        wait = self.bucket.reserve(self.rate, self.capacity, max_wait=timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def acquire(self):
+        wait = self.bucket.reserve(self.rate, self.capacity)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        if self.bucket.blocking:
+            wait = await asyncio.to_thread(self.bucket.reserve, self.rate, self.capacity)
+        else:
+            wait = self.bucket.reserve(self.rate, self.capacity)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def wait_if_needed(self):
+        self.acquire()
+
+    def set_rate(self, rate):
+        self.rate = rate
+
+class AIMDRateController:
+    """Lowers a RateLimiter's rate when upstream throttles, then recovers it.
+
+    Each throttle event multiplies the rate by ``decrease`` (at most once
+    per ``cooldown`` seconds); each success adds ``increase`` requests per
+    second until the configured rate is reached again.
+    """
+
+    def __init__(self, limiter: RateLimiter, min_rate = 0.2, decrease = 0.5, increase = 0.05, cooldown = 1.0):
+        self.limiter = limiter
+        self.max_rate = limiter.rate
+        self.min_rate = min_rate
+        self.decrease = decrease
+        self.increase = increase
+        self.cooldown = cooldown
+        self.last_decrease = 0.0
+        self.lock = threading.Lock()
+
+    def on_throttle(self):
+        with self.lock:
+            now = time.monotonic()
+            if now - self.last_decrease < self.cooldown:
+                return
+            self.last_decrease = now
+            rate = max(self.min_rate, self.limiter.rate * self.decrease)
+            self.limiter.set_rate(rate)
+        logger.warning(f"Upstream throttling, rate lowered to {rate:.2f} req/s")
+
+    def on_success(self):
+        with self.lock:
+            if self.limiter.rate < self.max_rate:
+                self.limiter.set_rate(min(self.max_rate, self.limiter.rate + self.increase))
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight calls: halve on throttling, grow back slowly."""
+
+    def __init__(self, max_limit = 8, min_limit = 1, cooldown = 1.0):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.cooldown = cooldown
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, throttled = False):
+        with self.condition:
+            self.in_flight -= 1
+            self._adjust(throttled)
+            self.condition.notify_all()
+
+    def _adjust(self, throttled):
+        if throttled:
+            # One decrease per cooldown, so a burst of 429s only halves once
+            now = time.monotonic()
+            if now - self.last_decrease >= self.cooldown:
+                self.last_decrease = now
+                self.limit = max(self.min_limit, self.limit / 2)
+                logger.info(f"Throttled, concurrency limit lowered to {int(self.limit)}")
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait and receive the same result, or the same exception.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
     def __init__(self):
-        self.max_requests = 2
-        self.time_window = 1
-        self.requests = []
         self.lock = threading.Lock()
+        self.in_flight = {}
+        self.executions = 0
+        self.coalesced = 0
 
-    def wait_if_needed(self):
+    def do(self, key, fn, *args, **kwargs):
         with self.lock:
-            now = time.time()
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self.in_flight[key] = self._Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            call.done.set()
+
+def estimate_size(value) -> int:
+    """Rough byte size of a decoded JSON value (strings, numbers, lists, dicts)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += estimate_size(key) + estimate_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += estimate_size(item)
+    return size
+
+class CacheBackend(ABC):
+    """Key/value store used for API response caches.
 
-            self.requests = [req_time for req_time in self.requests if now - req_time < self.time_window]
+    ``get`` returns ``None`` on a miss; ``ttl`` is in seconds and falls back
+    to the backend's default. ``blocking`` backends may wait on disk or the
+    network, so async callers use them from a worker thread.
+    """
 
-            if len(self.requests) >= self.max_requests:
-                sleep_time = self.time_window - (now - self.requests[0])
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-                    self.requests.pop(0)
+    blocking = True
 
-            self.requests.append(now)
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    @abstractmethod
+    def set(self, key, value, ttl = None):
+        pass
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+class CacheManager(CacheBackend):
+    """Thread-safe TTL cache bounded by entry count and approximate bytes.
 
-class CacheManager:
-    def __init__(self, default_ttl: 300):
-        self.cache = {}
-        self.timestamps = {}
+    Entries are kept in LRU order; a heap of expiry times lets expired
+    entries be dropped without scanning the whole cache. A value larger
+    than ``max_bytes`` on its own is not stored, rather than flushing
+    everything else to make room for it.
+    """
+
+    blocking = False
+
+    def __init__(self, default_ttl = 300, max_entries = 1024, max_bytes = 64 * 1024 * 1024):
         self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache = OrderedDict()  # key -> (value, expires_at, size)
+        self.expiry_heap = []  # (expires_at, key)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.oversized = 0
         self.lock = threading.Lock()
 
     def get(self, key):
         with self.lock:
-            if key not in self.cache:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
                 return None
-            
-            if time.time() - self.timestamps[key] > self.default_ttl:
-                del self.cache[key]
-                del self.timestamps[key]
+
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
                 return None
-            
-            return self.cache[key]
+
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return entry[0]
         
-    def set(self, key, value, ttl = None):
+    def set(self, key, value, ttl = None, size = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        size = estimate_size(value) if size is None else size
+        with self.lock:
+            now = time.monotonic()
+            if key in self.cache:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.oversized += 1
+                logger.debug(f"Not caching {key}: {size} bytes exceeds the {self.max_bytes} byte budget")
+                return
+
+            expires_at = now + ttl
+            self.cache[key] = (value, expires_at, size)
+            self.current_bytes += size
+            heapq.heappush(self.expiry_heap, (expires_at, key))
+
+            self._expire(now)
+            self._enforce_bounds()
+
+    def _remove(self, key):
+        _, _, size = self.cache.pop(key)
+        self.current_bytes -= size
+
+    def _expire(self, now):
+        heap = self.expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self.cache.get(key)
+            # Heap items for overwritten or evicted keys are stale; skip them
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+                self.expirations += 1
+
+        if len(heap) > 2 * len(self.cache) + 64:
+            self.expiry_heap = [(entry[1], key) for key, entry in self.cache.items()]
+            heapq.heapify(self.expiry_heap)
+
+    def _enforce_bounds(self):
+        while self.cache and (
+            (self.max_entries is not None and len(self.cache) > self.max_entries)
+            or (self.max_bytes is not None and self.current_bytes > self.max_bytes)
+        ):
+            key = next(iter(self.cache))
+            self._remove(key)
+            self.evictions += 1
+
+    def delete(self, key):
         with self.lock:
-            self.cache[key] = value
-            self.timestamps[key] = time.time()
+            if key in self.cache:
+                self._remove(key)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.cache)
 
     def clear(self):
         with self.lock:
             self.cache.clear()
-            self.timestamps.clear()
+            self.expiry_heap.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.cache),
+                "bytes": self.current_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "oversized": self.oversized,
+            }
+
+def build_session(pool_size = 10, max_retries = 0):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=max_retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
 
 class RequestHandler:
-    def __init__(self, api_key, rate_limiter: RateLimiter, cache: CacheManager):
+    """GET requests to an API with caching, rate limiting and retries.
+
+    Responses are cached for as long as ``cache_policies`` says they stay
+    fresh, then served stale for a while longer while a background
+    refresh revalidates them with If-None-Match / If-Modified-Since, so a
+    caller never waits on an expired entry. 404s and empty results are
+    cached briefly too, so a bad id or an empty search is not re-requested
+    on every call.
+    """
+
+    RETRY_STATUS_CODES = {500, 502, 503, 504}
+
+    def __init__(self, api_key, rate_limiter: RateLimiter, cache: CacheBackend, session = None, base_url = None,
+                 retry_deadline = 60.0, backoff_base = 0.5, backoff_max = 20.0, cache_policies: CachePolicies = None,
+                 refresh_workers = 2, rate_controller: AIMDRateController = None):
         self.api_key = api_key
         self.rate_limiter = rate_limiter
+        # Handlers sharing a limiter must share its controller too, or each
+        # one's decreases and cooldowns fight the other's recovery
+        self.rate_controller = rate_controller or AIMDRateController(rate_limiter)
         self.cache = cache
-        self.session = requests.Session()
+        self.cache_policies = cache_policies or CachePolicies()
+        self.session = session or requests.Session()
         self.session.headers.update({
         "Accept": "application/json",
         "x-api-key": api_key,
         })
-        self.base_url = "https://api.setlist.fm/rest/1.0"
+        self.base_url = base_url or "https://api.setlist.fm/rest/1.0"
+        self.single_flight = SingleFlight()
+        self.retry_deadline = retry_deadline
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.refresh_workers = refresh_workers
+        self._refresher = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self.metrics = Counter()
+        self._metrics_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._metrics_lock:
+            self.metrics[name] += 1
+
+    def _backoff(self, attempt):
+        # Full jitter: a random point in an exponentially growing window
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _cached(self, cache_key):
+        entry = self.cache.get(cache_key)
+        # Bare payloads cached before entries carried their freshness are misses
+        if not isinstance(entry, dict) or 'fresh_until' not in entry:
+            return None
+        return entry
+
+    def _hit(self, endpoint, entry):
+        """The cached value, or the cached 404 raised again."""
+        if entry.get('not_found'):
+            self._count("negative_hits")
+            raise NotFoundError(f"Resource not found: {endpoint}")
+        if is_empty(entry['value']):
+            self._count("negative_hits")
+        return entry['value']
+
+    def _store(self, cache_key, endpoint, params, result, headers):
+        policy = self.cache_policies.policy(endpoint, params, result)
+        # The backend drops the entry once it is past serving stale too
+        self.cache.set(cache_key, cache_entry(result, policy, headers), ttl=policy.ttl + policy.stale_ttl)
+
+    def _store_not_found(self, cache_key):
+        policy = self.cache_policies.negative
+        self.cache.set(cache_key, cache_entry(None, policy, not_found=True), ttl=policy.ttl)
+
+    @staticmethod
+    def _cache_key(endpoint, params):
+        return f"{endpoint}:{str(sorted((params or {}).items()))}"
+
+    def _serve_cached(self, entry, endpoint, params, max_retries, cache_key):
+        """Answer from a cache entry; a stale one is revalidated in the background."""
+        if not is_fresh(entry) and not entry.get('not_found'):
+            self._count("stale_served")
+            self._refresh(endpoint, params, max_retries, cache_key, entry)
+        logger.debug(f"Cache hit for {endpoint}")
+        return self._hit(endpoint, entry)
+
+    def _handle_response(self, response, endpoint, params, use_cache, cache_key, stale, attempt):
+        """Interpret one upstream response.
+
+        Returns ``(result, None, None)`` once the request is answered, or
+        ``(None, error, delay)`` when it should be retried after ``delay``;
+        errors that retrying cannot fix are raised.
+        """
+        status = response.status_code
+        if status == 304 and stale is not None:
+            self._count("not_modified")
+            self.rate_controller.on_success()
+            self._store(cache_key, endpoint, params, stale['value'], {
+                'ETag': response.headers.get('ETag') or stale.get('etag'),
+                'Last-Modified': response.headers.get('Last-Modified') or stale.get('last_modified'),
+            })
+            return stale['value'], None, None
+        if status == 429:
+            self._count("throttled")
+            self.rate_controller.on_throttle()
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            delay = retry_after if retry_after is not None else self._backoff(attempt)
+            return None, RateLimitError("Rate limit exceeded"), delay
+        if status == 404:
+            if use_cache:
+                self._store_not_found(cache_key)
+            raise NotFoundError(f"Resource not found: {endpoint}")
+        if status in self.RETRY_STATUS_CODES:
+            self._count("server_errors")
+            return None, APIError(f"Request failed: {status} from {endpoint}"), self._backoff(attempt)
+        if status >= 400:
+            raise APIError(f"Request failed: {status} from {endpoint}")
+
+        try:
+            # Straight from the body bytes, skipping the client's text decoding
+            result = loads(response.content)
+        except ValueError as e:
+            # A truncated or non-JSON body is retried like a server error
+            self._count("invalid_responses")
+            return None, APIError(f"Invalid response from {endpoint}: {e}"), self._backoff(attempt)
+        self.rate_controller.on_success()
+        if use_cache:
+            self._store(cache_key, endpoint, params, result, response.headers)
+        return result, None, None
+
+    def _transport_error(self, error, attempt, timed_out = False):
+        if timed_out:
+            return APIError(f"Request timeout after {attempt + 1} attempts"), self._backoff(attempt)
+        return APIError(f"Request failed: {error}"), self._backoff(attempt)
+
+    def _check_retry(self, endpoint, attempt, max_retries, deadline, error, delay):
+        """Raise ``error`` unless another attempt fits in the retry budget."""
+        if attempt == max_retries - 1:
+            raise error
+        if time.monotonic() + delay > deadline:
+            logger.warning(f"Retry deadline reached for {endpoint}")
+            raise error
+        self._count("retries")
 
     def make_request(self, endpoint, params = None, use_cache = True, max_retries = 3):
-        cache_key = f"{endpoint}:{str(sorted((params or {}).items()))}"
+        cache_key = self._cache_key(endpoint, params)
 
         if use_cache:
-            cached_result = self.cache.get(cache_key)
-            if cached_result:
-                logger.debug(f"Cache hit for {endpoint}")
-                return cached_result
-            
-        for attempt in range(max_retries):
-            try:
-                self.rate_limiter.wait_if_needed()
+            entry = self._cached(cache_key)
+            if entry is not None:
+                return self._serve_cached(entry, endpoint, params, max_retries, cache_key)
 
-                url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        # Identical concurrent requests wait on one upstream call
+        return self.single_flight.do(
+            cache_key, self._fetch, endpoint, params, use_cache, max_retries, cache_key
+        )
 
-                logger.info(f"Making request to: {url} (attempt {attempt + 1})")
-                response = self.session.get(url, params=params, timeout=30)
+    def _refresh(self, endpoint, params, max_retries, cache_key, entry):
+        """Revalidate a stale entry on a background thread, once per key at a time."""
+        with self._refresh_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+            if self._refresher is None:
+                self._refresher = ThreadPoolExecutor(max_workers=self.refresh_workers, thread_name_prefix="cache-refresh")
 
-                if response.status_code == 429:
-                    raise RateLimitError("Rate limit exceeded")
-                elif response.status_code == 404:
-                    raise NotFoundError(f"Resource not found: {endpoint}")
-                
-                response.raise_for_status()
-                result = response.json()
+        def refresh():
+            try:
+                self.single_flight.do(cache_key, self._fetch, endpoint, params, True, max_retries, cache_key, entry)
+                self._count("background_refreshes")
+            except Exception as e:
+                # The stale entry keeps being served until it expires for good
+                logger.warning(f"Background refresh of {endpoint} failed: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(cache_key)
+
+        self._refresher.submit(refresh)
+
+    def _fetch(self, endpoint, params, use_cache, max_retries, cache_key, stale = None):
+        if use_cache and stale is None:
+            # A call that finished just before this one started may have filled the cache
+            entry = self._cached(cache_key)
+            if entry is not None:
+                return self._hit(endpoint, entry)
 
-                if use_cache:
-                    self.cache.set(cache_key, result)
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        deadline = time.monotonic() + self.retry_deadline
 
-                return result
-            
-            except requests.exceptions.Timeout:
-                if attempt == max_retries - 1:
-                    raise APIError(f"Request timeout after {max_retries} attempts")
-                time.sleep(2 ** attempt)
+        for attempt in range(max_retries):
+            self.rate_limiter.wait_if_needed()
+            logger.info(f"Making request to: {url} (attempt {attempt + 1})")
+            self._count("requests")
 
+            try:
+                response = self.session.get(url, params=params, timeout=30, headers=conditional_headers(stale))
+            except requests.exceptions.Timeout as e:
+                error, delay = self._transport_error(e, attempt, timed_out=True)
             except requests.exceptions.RequestException as e:
-                if attempt == max_retries - 1:
-                    raise APIError(f"Request failed: {e}")
-                time.sleep(2 ** attempt)
+                error, delay = self._transport_error(e, attempt)
+            else:
+                result, error, delay = self._handle_response(
+                    response, endpoint, params, use_cache, cache_key, stale, attempt
+                )
+                if error is None:
+                    return result
+
+            self._check_retry(endpoint, attempt, max_retries, deadline, error, delay)
+            time.sleep(delay)
 
         raise APIError("max retries exceeded")
@@ -1,10 +1,14 @@
 from flask import Flask
 from config import Config
 from routes import register_routes
+from api.registry import ClientRegistry
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+
+    # Shared API clients (cache, rate limiter, connection pool)
+    ClientRegistry(app.config).init_app(app)
     
     # Register all routes
     register_routes(app)
@@ -0,0 +1,111 @@
+"""Concurrent setlist-detail requests one worker can serve, sync versus async.
+
+Each request fetches a 20-song setlist from a stub setlist.fm and
+resolves every song against a stub Spotify API, with 50ms of latency per
+upstream call. The sync worker is the usual pool of 8 threads on
+``SetlistFMClient``/``SpotifyAppClient``. The async worker is one event
+loop on ``AsyncSetlistFMClient``/``AsyncSpotifyAppClient``, with every
+request in flight at once. Reports throughput and p50/p95 latency as the
+number of concurrent requests grows. Requires httpx.
+
+    python -m benchmarks.async_load
+"""
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.async_http import build_async_client, httpx
+from api.async_setlistfm import AsyncSetlistFMClient
+from api.async_spotify import AsyncSpotifyAppClient
+from api.setlistfm import SetlistFMClient
+from api.utils import RateLimiter
+from benchmarks.fixtures import make_setlist
+from benchmarks.spotify_stub import SpotifyStub, make_app_client
+from benchmarks.stub_server import StubServer
+
+LATENCY = 0.05
+SONGS = 20
+THREADS = 8
+CONCURRENCY = (8, 32, 128)
+
+
+class UpstreamStub(SpotifyStub):
+    """Spotify stub that also serves setlist.fm setlists with songs unique to each setlist."""
+
+    def route(self, method, path, query, body):
+        if path.startswith("/rest/1.0/setlist/"):
+            setlist_id = path.rsplit("/", 1)[1]
+            setlist = make_setlist("0123456789ab", 0, songs=SONGS)
+            for song in setlist["sets"]["set"][0]["song"]:
+                song["name"] = f"{song['name']} of {setlist_id}"
+            return 200, setlist
+        return super().route(method, path, query, body)
+
+
+def percentiles(latencies):
+    ordered = sorted(latencies)
+    return statistics.median(ordered), ordered[int(len(ordered) * 0.95) - 1]
+
+
+def run_sync(url, requests):
+    setlistfm = SetlistFMClient("key", base_url=f"{url}/rest/1.0", rate_limiter=RateLimiter(max_requests=100_000),
+                                pool_size=THREADS)
+    spotify = make_app_client(url, max_workers=THREADS)
+
+    def handle(setlist_id):
+        start = time.perf_counter()
+        spotify.resolve_tracks(setlistfm.get_setlist_songs(setlist_id))
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        latencies = list(pool.map(handle, requests))
+    return time.perf_counter() - start, latencies
+
+
+async def run_async(url, requests):
+    setlistfm = AsyncSetlistFMClient(
+        "key", base_url=f"{url}/rest/1.0", rate_limiter=RateLimiter(max_requests=100_000),
+        client=build_async_client(pool_size=64)
+    )
+    spotify = AsyncSpotifyAppClient(
+        "stub-id", "stub-secret", max_workers=64, api_prefix=f"{url}/v1/", token_url=f"{url}/api/token",
+        client=build_async_client(pool_size=64)
+    )
+
+    async def handle(setlist_id):
+        start = time.perf_counter()
+        await spotify.resolve_tracks(await setlistfm.get_setlist_songs(setlist_id))
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(handle(setlist_id) for setlist_id in requests))
+    elapsed = time.perf_counter() - start
+    await setlistfm.aclose()
+    await spotify.aclose()
+    return elapsed, latencies
+
+
+def main():
+    if httpx is None:
+        raise SystemExit("benchmarks.async_load needs httpx")
+
+    with StubServer(UpstreamStub(latency=LATENCY)) as server:
+        for label, run in (("sync, 8 threads", run_sync), ("async, 1 loop", None)):
+            print(label)
+            for concurrency in CONCURRENCY:
+                requests = [f"{label[:1]}{concurrency}x{n}" for n in range(concurrency)]
+                if run is None:
+                    elapsed, latencies = asyncio.run(run_async(server.url, requests))
+                else:
+                    elapsed, latencies = run(server.url, requests)
+                p50, p95 = percentiles(latencies)
+                print(
+                    f"    {concurrency:>4} concurrent: {concurrency / elapsed:6.1f} req/s "
+                    f"p50={p50 * 1000:6.0f}ms p95={p95 * 1000:6.0f}ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
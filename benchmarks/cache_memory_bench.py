@@ -0,0 +1,54 @@
+"""RSS of a long-running CacheManager under 100k distinct artist/setlist lookups.
+
+The bounded cache should level off once it is full; the unbounded run shows
+the old growth pattern for comparison.
+
+    python -m benchmarks.cache_memory_bench
+"""
+import gc
+import resource
+
+from api.utils import CacheManager
+from benchmarks.fixtures import make_setlist_page
+
+LOOKUPS = 100_000
+SAMPLE_EVERY = 10_000
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak rather than current RSS where /proc is unavailable
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(label, cache):
+    gc.collect()
+    baseline = rss_mb()
+    samples = []
+    for n in range(LOOKUPS):
+        mbid = f"{n:08d}-0000-0000-0000-000000000000"
+        key = f"/artist/{mbid}/setlists:[('p', 1)]"
+        if cache.get(key) is None:
+            cache.set(key, make_setlist_page(mbid, 1, per_page=5))
+        if (n + 1) % SAMPLE_EVERY == 0:
+            samples.append(rss_mb() - baseline)
+
+    stats = cache.stats()
+    print(f"{label}: entries={stats['entries']} bytes~{stats['bytes'] / 1e6:.1f}MB "
+          f"evictions={stats['evictions']}")
+    print("  RSS growth (MB) every 10k lookups: " + " ".join(f"{mb:6.1f}" for mb in samples))
+
+
+def main():
+    run("bounded (2k entries, 16MB)", CacheManager(default_ttl=300, max_entries=2000, max_bytes=16 * 1024 * 1024))
+    run("unbounded", CacheManager(default_ttl=300, max_entries=None, max_bytes=None))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Spotify calls per setlist with and without the artist-catalog prefetch.
+
+Resolves ten 20-song setlists by one artist (17 catalog songs, two covers
+and one unreleased song each) against an in-process Spotify fake with
+20ms of latency per call. The artist has 80 releases, so a catalog fetch
+takes one artist search, two ``artist_albums`` pages and four ``albums``
+batches; later setlists reuse the cached catalog.
+
+    python -m benchmarks.catalog_resolve_bench
+"""
+import random
+import time
+
+from api.models import Song
+from api.spotify import SpotifyAppClient
+from benchmarks.spotify_stub import LocalSpotify
+
+ARTIST = {"id": "stubartist", "name": "Stub Artist"}
+RELEASES = 80
+SETLISTS = 10
+
+
+class LocalCatalogSpotify(LocalSpotify):
+    """``LocalSpotify`` plus artist search and the album catalog endpoints."""
+
+    def __init__(self, latency = 0.0):
+        super().__init__(latency)
+        self.releases = [
+            {"id": f"album{n}", "name": f"Record {n}", "images": [{"url": f"https://img.example/album{n}.jpg"}],
+             "tracks": {"items": [
+                 {"uri": f"spotify:track:{n}x{i}", "name": title(n, i), "artists": [ARTIST]} for i in range(3)
+             ]}}
+            for n in range(RELEASES)
+        ]
+
+    def search(self, q, type = "track", limit = 10, offset = 0, market = None):
+        if type == "artist":
+            if self.latency:
+                time.sleep(self.latency)
+            return {"artists": {"items": [ARTIST] if "stub artist" in q.lower() else []}}
+        return super().search(q, type, limit, offset, market)
+
+    def artist_albums(self, artist_id, album_type = None, include_groups = None, country = None, limit = 20,
+                      offset = 0):
+        if self.latency:
+            time.sleep(self.latency)
+        items = [{"id": r["id"]} for r in self.releases[offset:offset + limit]]
+        return {"items": items, "next": "next" if offset + limit < len(self.releases) else None}
+
+    def albums(self, albums, market = None):
+        if self.latency:
+            time.sleep(self.latency)
+        wanted = set(albums)
+        return {"albums": [r for r in self.releases if r["id"] in wanted]}
+
+
+def title(release, index):
+    words = ("Neon", "Harbor", "Glass", "River", "Static", "Ember", "Velvet", "Northern", "Paper", "Signal")
+    return f"{words[release % 10]} {words[(release // 10 + index) % 10]} {release * 3 + index}"
+
+
+def make_setlist(rng):
+    picks = rng.sample([(n, i) for n in range(RELEASES) for i in range(3)], 17)
+    songs = [Song(name=title(n, i), artist=ARTIST["name"], position=p) for p, (n, i) in enumerate(picks)]
+    songs.append(Song(name=f"Borrowed Tune {rng.randrange(1000)}", artist=ARTIST["name"], cover="Someone Else",
+                      position=17))
+    songs.append(Song(name=f"Unreleased Demo {rng.randrange(1000)}", artist=ARTIST["name"], position=18))
+    songs.append(Song(name=title(*picks[0]) + " Reprise", artist=ARTIST["name"], position=19))
+    return songs
+
+
+def run(label, catalog_min_songs):
+    client = SpotifyAppClient("stub-id", "stub-secret", max_workers=8, catalog_min_songs=catalog_min_songs)
+    client.sp = LocalCatalogSpotify(latency=0.02)
+    rng = random.Random(7)
+    setlists = [make_setlist(rng) for _ in range(SETLISTS)]
+
+    first_calls = None
+    start = time.perf_counter()
+    for songs in setlists:
+        before = sum(client.request_counts.values())
+        client.resolve_tracks(songs)
+        if first_calls is None:
+            first_calls = sum(client.request_counts.values()) - before
+    elapsed = time.perf_counter() - start
+
+    total = sum(client.request_counts.values())
+    print(
+        f"{label:<18} calls/setlist={total / SETLISTS:5.1f} (first {first_calls}) "
+        f"catalog hits={client.resolve_stats['catalog_hits']}/{client.resolve_stats['songs']} "
+        f"time/setlist={elapsed / SETLISTS * 1000:6.1f}ms"
+    )
+    print(f"    {dict(client.request_counts)}")
+
+
+def main():
+    run("search only", None)
+    run("artist catalog", 5)
+
+
+if __name__ == "__main__":
+    main()
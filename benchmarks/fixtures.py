@@ -0,0 +1,41 @@
+from datetime import date, timedelta
+
+VENUES = ["Madison Square Garden", "The Forum", "Red Rocks Amphitheatre", "O2 Arena", "Wembley Stadium"]
+CITIES = [("New York", "United States"), ("Inglewood", "United States"), ("Morrison", "United States"),
+          ("London", "United Kingdom"), ("London", "United Kingdom")]
+TOURS = ["World Tour", "Summer Tour", None]
+
+
+def make_setlist(mbid, index, artist_name = "Stub Artist", newest = date(2025, 6, 1), songs = 0):
+    event_date = newest - timedelta(days=3 * index)
+    venue_idx = index % len(VENUES)
+    city, country = CITIES[venue_idx]
+    tour = TOURS[index % len(TOURS)]
+    setlist = {
+        "id": f"{mbid[:6]}{index:06d}",
+        "eventDate": event_date.strftime("%d-%m-%Y"),
+        "artist": {"mbid": mbid, "name": artist_name},
+        "venue": {
+            "id": f"v{venue_idx}",
+            "name": VENUES[venue_idx],
+            "city": {"name": city, "country": {"name": country}},
+        },
+        "url": f"https://www.setlist.fm/setlist/{index}",
+    }
+    if tour:
+        setlist["tour"] = {"name": f"{tour} {event_date.year}"}
+    if songs:
+        setlist["sets"] = {"set": [{"song": [{"name": f"Song {n}"} for n in range(1, songs + 1)]}]}
+    return setlist
+
+
+def make_setlist_page(mbid, page, per_page = 20, total = 400, artist_name = "Stub Artist"):
+    start = (page - 1) * per_page
+    items = [make_setlist(mbid, i, artist_name) for i in range(start, min(start + per_page, total))]
+    return {
+        "type": "setlists",
+        "itemsPerPage": per_page,
+        "page": page,
+        "total": total,
+        "setlist": items,
+    }
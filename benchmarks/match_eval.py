@@ -0,0 +1,112 @@
+"""Offline evaluation of Spotify track matching over a fixture corpus.
+
+``match_corpus.json`` holds a small catalog (studio recordings plus live,
+karaoke and tribute decoys) and setlist-style songs with the expected
+track, or null when the song is not on Spotify. ``CatalogSearch`` answers
+queries roughly the way Spotify's search does: every word of a ``track:``
+or ``artist:`` field must appear in that field, free text may match any
+field, and results are ordered by popularity.
+
+Reports precision (correct / matched), recall (correct / songs on
+Spotify), wrong matches for absent songs and searches per song, for the
+previous single-query matcher and for ``TrackMatcher``.
+
+    python -m benchmarks.match_eval
+"""
+import json
+import os
+import re
+from collections import Counter
+
+from api.matching import TrackMatcher, fold
+
+CORPUS = os.path.join(os.path.dirname(__file__), "match_corpus.json")
+
+
+def _tokens(value):
+    return re.sub(r"[^\w\s]", " ", fold(value).replace("'", "")).split()
+
+
+class CatalogSearch:
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.calls = 0
+
+    def __call__(self, query, limit):
+        self.calls += 1
+        fields = dict(re.findall(r"(track|artist):(.*?)(?=\s+(?:track|artist):|$)", query))
+        free = re.sub(r"(track|artist):.*", "", query)
+        results = []
+        for entry in self.catalog:
+            name, artists = set(_tokens(entry["name"])), set(_tokens(" ".join(entry["artists"])))
+            everything = name | artists | set(_tokens(entry["album"]))
+            if "track" in fields and not set(_tokens(fields["track"])) <= name:
+                continue
+            if "artist" in fields and not set(_tokens(fields["artist"])) <= artists:
+                continue
+            if not set(_tokens(free)) <= everything:
+                continue
+            results.append(entry)
+        results.sort(key=lambda e: -e["popularity"])
+        return [self._spotify_track(e) for e in results[:limit]]
+
+    @staticmethod
+    def _spotify_track(entry):
+        return {
+            "uri": entry["uri"],
+            "name": entry["name"],
+            "artists": [{"id": a.lower(), "name": a} for a in entry["artists"]],
+            "album": {"name": entry["album"], "images": []},
+        }
+
+
+def legacy_match(search, title, artist):
+    """The matcher this replaced: one fielded query, keyword album filter, exact artist."""
+    tracks = search(f"track:{title} artist:{artist}", 5)
+    if not tracks:
+        return None
+    invalid = ["compilation", "greatest hits", "remaster", "live", "version"]
+    filtered = [t for t in tracks if not any(word in t["album"]["name"].lower() for word in invalid)]
+    filtered = [t for t in filtered if any(a["name"].lower() == artist.lower() for a in t["artists"])] or filtered
+    return filtered[0] if filtered else None
+
+
+def evaluate(label, corpus, match):
+    search = CatalogSearch(corpus["catalog"])
+    counts = Counter()
+    misses = []
+    for case in corpus["cases"]:
+        track = match(search, case["title"], case["artist"])
+        uri = track["uri"] if track else None
+        expected = case["expected"]
+        if expected is None:
+            counts["absent"] += 1
+            counts["false_positive"] += uri is not None
+        else:
+            counts["present"] += 1
+            counts["correct"] += uri == expected
+        counts["matched"] += uri is not None
+        if uri != expected:
+            misses.append(f"{case['kind']}: {case['title']} - {case['artist']} -> {uri}")
+
+    correct = counts["correct"]
+    precision = correct / counts["matched"] if counts["matched"] else 0.0
+    recall = correct / counts["present"] if counts["present"] else 0.0
+    print(
+        f"{label:<16} precision={precision:5.1%} recall={recall:5.1%} "
+        f"wrong-for-absent={counts['false_positive']}/{counts['absent']} "
+        f"searches/song={search.calls / len(corpus['cases']):.2f}"
+    )
+    for miss in misses:
+        print(f"    {miss}")
+
+
+def main():
+    with open(CORPUS, encoding="utf-8") as f:
+        corpus = json.load(f)
+    evaluate("legacy", corpus, legacy_match)
+    evaluate("TrackMatcher", corpus, lambda search, title, artist: TrackMatcher(search).match(title, artist)[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Parse, filter and serialize 10k setlists, and memory per model object.
+
+Compares the previous models (plain dataclasses, ``strptime`` on every
+``formatted_date`` access, routes building dicts field by field and
+``json.dumps``) with the slotted models, their cached date ordinal and
+``to_dicts`` plus ``api.serialization.dumps``.
+
+    python -m benchmarks.models_bench
+"""
+import gc
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+
+from api import serialization
+from api.models import SetListInfo
+from api.setlistfm import DataParser, _matches
+from benchmarks.fixtures import make_setlist
+
+COUNT = 10_000
+
+
+@dataclass
+class LegacySetListInfo:
+    id: str
+    artist: str
+    date: str
+    venue: str
+    city: str
+    country: str
+    tour: str = None
+    url: str = ""
+    venue_id: str = None
+    artist_mbid: str = None
+
+    @property
+    def formatted_date(self):
+        if not self.date:
+            return None
+        try:
+            return datetime.strptime(self.date, '%d-%m-%Y')
+        except ValueError:
+            return None
+
+    @property
+    def display_title(self):
+        return f"{self.artist} - {self.venue}, {self.city} ({self.date})"
+
+
+def legacy_matches(s, year):
+    return not (s.formatted_date and s.formatted_date.year != int(year))
+
+
+def legacy_serialize(setlists):
+    return json.dumps({'success': True, 'data': [
+        {
+            'id': s.id, 'artist': s.artist, 'date': s.date, 'venue': s.venue, 'city': s.city,
+            'country': s.country, 'tour': s.tour, 'url': s.url, 'display_title': s.display_title
+        }
+        for s in setlists
+    ]}).encode()
+
+
+def serialize(setlists):
+    return serialization.dumps({'success': True, 'data': [s.to_dict() for s in setlists]})
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def bytes_per_object(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size / len(objects), objects
+
+
+def main():
+    raw = [make_setlist("0123456789ab", i) for i in range(COUNT)]
+    parser = DataParser()
+
+    parsed = [parser.parse_setlist_info(d) for d in raw]
+    parse_ms, _ = timed(lambda: [parser.parse_setlist_info(d) for d in raw])
+    print(f"{COUNT} setlists, DataParser.parse_setlist_info: {parse_ms:.1f}ms")
+
+    # Both rebuild from the same parsed strings, so memory is the objects' own
+    runs = (
+        ("dataclass", lambda: [LegacySetListInfo(*_fields(s)) for s in parsed],
+         lambda items: [s for s in items if legacy_matches(s, 2020)], legacy_serialize),
+        ("slotted", lambda: [SetListInfo(*_fields(s)) for s in parsed],
+         lambda items: [s for s in items if _matches(s, None, 2020, None, None)], serialize),
+    )
+
+    for label, build, filter_year, dump in runs:
+        per_object, items = bytes_per_object(build)
+        build_ms, _ = timed(build)
+        filter_ms, kept = timed(lambda: filter_year(items))
+        dump_ms, body = timed(lambda: dump(items))
+        print(
+            f"{label:<10} build={build_ms:6.1f}ms filter={filter_ms:6.1f}ms ({len(kept)} kept) "
+            f"serialize={dump_ms:6.1f}ms ({len(body) // 1024} KiB) memory/object={per_object:.0f} B"
+        )
+    print(f"json backend: {'orjson' if serialization.orjson else 'stdlib json'}")
+
+
+def _fields(s):
+    return (s.id, s.artist, s.date, s.venue, s.city, s.country, s.tour, s.url, s.venue_id, s.artist_mbid)
+
+
+if __name__ == "__main__":
+    main()
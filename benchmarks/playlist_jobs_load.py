@@ -0,0 +1,116 @@
+"""Load test: 50 concurrent POST /api/playlists/create against stubbed APIs.
+
+40 users each create a playlist from a 20-song setlist and 10 of them
+double-click, so 50 requests should create exactly 40 playlists. Every
+stubbed Spotify call takes 60ms and the setlist.fm lookup 200ms. Requests
+only enqueue work, so their latency stays flat while the bounded worker
+pool drains the jobs.
+
+    python -m benchmarks.playlist_jobs_load
+"""
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from api.models import Song
+from api.registry import get_registry
+from api.spotify import PlaylistWriter, SpotifyAppClient, SpotifyUserClient
+from app import create_app
+from benchmarks.spotify_stub import LocalSpotify
+from benchmarks.stub_server import report
+from routes import playlists
+
+USERS = 40
+DOUBLE_CLICKS = 10
+SONGS = 20
+LATENCY = 0.06
+
+created = Counter()
+created_lock = threading.Lock()
+
+
+class StubSetlistFM:
+    def get_setlist_songs(self, setlist_id):
+        time.sleep(0.2)
+        return [Song(name=f"{setlist_id} Song {n}", artist="Stub Artist", position=n, set_number=1)
+                for n in range(1, SONGS + 1)]
+
+
+class LocalUserSpotify:
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    def me(self):
+        time.sleep(LATENCY)
+        return {"id": self.user_id, "display_name": self.user_id}
+
+    def user_playlist_create(self, user, name, public, description):
+        time.sleep(LATENCY)
+        with created_lock:
+            created[user] += 1
+        return {"id": f"{user}-playlist", "external_urls": {"spotify": f"https://open.spotify.com/playlist/{user}"}}
+
+    def playlist_add_items(self, playlist_id, items, position = None):
+        time.sleep(LATENCY)
+        return {"snapshot_id": "stub"}
+
+
+class StubUserClient(SpotifyUserClient):
+    def __init__(self, access_token, user_id = None):
+        self.access_token = access_token
+        self.sp = LocalUserSpotify(access_token)
+        self.user_id = user_id or self.sp.me()["id"]
+        self.writer = PlaylistWriter(self.sp)
+
+
+def main():
+    app = create_app()
+    app.config["TRACK_CACHE_PATH"] = None
+    get_registry(app)._setlistfm = StubSetlistFM()
+
+    app_client = SpotifyAppClient("stub-id", "stub-secret", max_workers=8)
+    app_client.sp = LocalSpotify(latency=LATENCY)
+    playlists.get_spotify_app_client = lambda: app_client
+    get_registry(app).user_clients.client_factory = StubUserClient
+
+    users = [f"user{n}" for n in range(USERS)] + [f"user{n}" for n in range(DOUBLE_CLICKS)]
+    post_latencies = []
+    job_ids = set()
+
+    def create(user):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["spotify_token"] = {"access_token": user}
+            session["spotify_user"] = {"id": user, "name": user}
+        start = time.perf_counter()
+        response = client.post("/api/playlists/create", json={"setlist_id": f"setlist-{user}"})
+        post_latencies.append(time.perf_counter() - start)
+        assert response.status_code == 202, response.get_json()
+        return response.get_json()["data"]["status_url"]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(users)) as pool:
+        status_urls = list(pool.map(create, users))
+    enqueued = time.perf_counter() - start
+
+    client = app.test_client()
+    states = Counter()
+    for url in set(status_urls):
+        while True:
+            job = client.get(url).get_json()["data"]
+            if job["state"] in ("succeeded", "failed"):
+                break
+            time.sleep(0.05)
+        states[job["state"]] += 1
+        job_ids.add(job["job_id"])
+    drained = time.perf_counter() - start
+
+    report("POST /playlists/create", post_latencies)
+    print(f"{len(users)} requests enqueued in {enqueued * 1000:.0f}ms, all jobs finished after {drained:.1f}s")
+    print(f"jobs={len(job_ids)} {dict(states)} playlists created={sum(created.values())} "
+          f"duplicates={sum(n - 1 for n in created.values())}")
+
+
+if __name__ == "__main__":
+    main()
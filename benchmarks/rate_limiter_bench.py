@@ -0,0 +1,116 @@
+"""Throughput of the setlist.fm rate limiter with 50 concurrent threads.
+
+Each thread needs one token per simulated upstream call. The legacy
+limiter (a sliding window that slept while holding its lock) is included
+for comparison. A final run shares one budget across 4 processes through
+a lock file.
+
+    python -m benchmarks.rate_limiter_bench
+"""
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from api.utils import RateLimiter
+from benchmarks.stub_server import percentile
+
+THREADS = 50
+RATE = 100  # tokens per second
+CALLS_PER_THREAD = 6
+
+
+class LegacyRateLimiter:
+    def __init__(self, max_requests, time_window = 1):
+        self.max_requests = max_requests
+        self.time_window = time_window
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def wait_if_needed(self):
+        with self.lock:
+            now = time.time()
+            self.requests = [t for t in self.requests if now - t < self.time_window]
+            if len(self.requests) >= self.max_requests:
+                sleep_time = self.time_window - (now - self.requests[0])
+                if sleep_time > 0:
+                    time.sleep(sleep_time)
+                    self.requests.pop(0)
+            self.requests.append(now)
+
+
+def run_threads(limiter):
+    waits = []
+    probe_waits = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(CALLS_PER_THREAD):
+            start = time.perf_counter()
+            limiter.wait_if_needed()
+            with lock:
+                waits.append(time.perf_counter() - start)
+
+    def cache_hit_probe():
+        # A request served from cache still has to get past the limiter's lock
+        # in the legacy design; try_acquire(0) never waits in the new one.
+        for _ in range(20):
+            start = time.perf_counter()
+            if hasattr(limiter, "try_acquire"):
+                limiter.try_acquire(timeout=0)
+            else:
+                with limiter.lock:
+                    pass
+            probe_waits.append(time.perf_counter() - start)
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    probe = threading.Thread(target=cache_hit_probe)
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    probe.start()
+    for thread in threads + [probe]:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return len(waits) / elapsed, waits, probe_waits
+
+
+def process_worker(path, calls, results):
+    limiter = RateLimiter(max_requests=RATE, shared_path=path)
+    for _ in range(calls):
+        limiter.acquire()
+    results.put(time.time())
+
+
+def run_processes(path, processes = 4, calls = 150):
+    results = multiprocessing.Queue()
+    start = time.time()
+    workers = [multiprocessing.Process(target=process_worker, args=(path, calls, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    finished = max(results.get() for _ in workers)
+    return processes * calls / (finished - start)
+
+
+def main():
+    print(f"{THREADS} threads x {CALLS_PER_THREAD} calls, budget {RATE} req/s (burst {RATE})")
+    for label, limiter in (("legacy sliding window", LegacyRateLimiter(RATE)), ("token bucket", RateLimiter(RATE))):
+        throughput, waits, probe = run_threads(limiter)
+        print(
+            f"  {label:<22} throughput={throughput:6.1f} req/s  "
+            f"acquire p50={percentile(waits, 50) * 1000:6.1f}ms p95={percentile(waits, 95) * 1000:6.1f}ms  "
+            f"cache-hit probe p95={percentile(probe, 95) * 1000:6.2f}ms"
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bucket")
+        throughput = run_processes(path)
+        print(f"  shared file bucket, 4 processes: throughput={throughput:6.1f} req/s (budget {RATE})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Wall-clock time of filtered artist setlist browsing against a stub
+setlist.fm API with 250ms latency, at the standard 2 req/s budget and at
+a 10 req/s budget where latency rather than the limiter dominates.
+
+Compares the previous strictly sequential page walk with the prefetching,
+early-terminating iterator.
+
+    python -m benchmarks.setlist_pages_bench
+"""
+import time
+
+from api.setlistfm import SetlistFMClient, _matches
+from api.utils import RateLimiter
+from benchmarks.fixtures import make_setlist_page
+from benchmarks.stub_server import StubServer
+
+MBID = "b10bbbfc-cf9e-42e0-be17-e2c3e1d2600d"
+TOTAL = 400  # one show every 3 days back from June 2025
+SCENARIOS = (
+    ("no filter, 10 pages", dict(page_limit=10)),
+    ("year=2025, 20 pages", dict(page_limit=20, year="2025")),
+    ("year=2024 month=6, 20 pages", dict(page_limit=20, year="2024", month="6")),
+    ("venue=forum, 10 pages", dict(page_limit=10, venue="forum")),
+)
+
+
+def handler(method, path, query, headers, body):
+    return 200, make_setlist_page(MBID, int(query.get("p", 1)), total=TOTAL)
+
+
+def sequential(client, page_limit=5, month=None, year=None, venue=None, tour=None):
+    results = []
+    for page in range(1, page_limit + 1):
+        setlists = client.get_artist_setlists(MBID, page)
+        if not setlists:
+            break
+        results.extend(s for s in setlists if _matches(s, month, year, venue, tour))
+    return results
+
+
+def main():
+    with StubServer(handler, latency=0.25) as server:
+        for rate in (2, 10):
+            print(f"\nrate budget {rate} req/s")
+            run(server, rate)
+
+
+def run(server, rate):
+    for label, kwargs in SCENARIOS:
+        timings = {}
+        for mode in ("sequential", "prefetch"):
+            client = SetlistFMClient("key", base_url=server.url, rate_limiter=RateLimiter(max_requests=rate))
+            server.reset()
+            start = time.perf_counter()
+            if mode == "sequential":
+                results = sequential(client, **kwargs)
+            else:
+                results = client.get_artist_setlists_filtered(MBID, **kwargs)
+            timings[mode] = (time.perf_counter() - start, server.call_count, len(results))
+
+        (seq_time, seq_calls, seq_n), (pre_time, pre_calls, pre_n) = timings["sequential"], timings["prefetch"]
+        assert seq_n == pre_n, (label, seq_n, pre_n)
+        print(
+            f"{label:<30} results={pre_n:<4} sequential={seq_time:5.2f}s/{seq_calls:>2} calls  "
+            f"prefetch={pre_time:5.2f}s/{pre_calls:>2} calls"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Parse time and peak allocation for setlist.fm search pages.
+
+Uses 200 recorded-shape fixture pages of 20 setlists each, as raw
+response bodies. Compares the previous path (``response.json()`` then
+nested ``.get(..., {})`` lookups) with ``api.serialization.loads`` plus
+``DataParser.parse_setlist_search``, and with ``iter_setlist_search`` on
+the raw body, which decodes one setlist at a time. Time to first setlist
+shows how soon a consumer can start on a page.
+
+    python -m benchmarks.setlist_parse_bench
+"""
+import json
+import time
+import tracemalloc
+
+from api import serialization
+from api.models import SetListInfo
+from api.setlistfm import DataParser
+from benchmarks.fixtures import make_setlist_page
+
+PAGES = 200
+
+
+def legacy_parse(body):
+    data = json.loads(body.decode("utf-8"))
+    setlists = []
+    for setlist_data in data.get('setlist', []):
+        venue_info = setlist_data.get('venue', {})
+        city_info = venue_info.get('city', {})
+        setlists.append(SetListInfo(
+            id=setlist_data.get('id', ''),
+            artist=setlist_data.get('artist', {}).get('name', 'Unknown Artist'),
+            date=setlist_data.get('eventDate', ''),
+            venue=venue_info.get('name', 'Unknown Venue'),
+            city=city_info.get('name', 'Unknown City'),
+            country=city_info.get('country', {}).get('name', 'Unknown Country'),
+            tour=setlist_data.get('tour', {}).get('name') if setlist_data.get('tour') else None,
+            url=setlist_data.get('url', ''),
+            venue_id=venue_info.get('id'),
+            artist_mbid=setlist_data.get('artist', {}).get('mbid')
+        ))
+    return setlists
+
+
+def parse(body):
+    return DataParser.parse_setlist_search(serialization.loads(body))
+
+
+def stream(body):
+    return list(DataParser.iter_setlist_search(body))
+
+
+def measure(fn, bodies):
+    start = time.perf_counter()
+    for body in bodies:
+        fn(body)
+    total = time.perf_counter() - start
+
+    tracemalloc.start()
+    peak = 0
+    for body in bodies[:20]:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn(body)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+        del result
+    tracemalloc.stop()
+    return total, peak
+
+
+def first_item(fn, bodies):
+    start = time.perf_counter()
+    for body in bodies:
+        fn(body)
+    return (time.perf_counter() - start) / len(bodies)
+
+
+def main():
+    bodies = [json.dumps(make_setlist_page("0123456789ab", p, total=PAGES * 20)).encode() for p in range(1, PAGES + 1)]
+    print(f"{PAGES} pages, {len(bodies[0])} bytes each; json backend: "
+          f"{'orjson' if serialization.orjson else 'stdlib json'}")
+
+    runs = (
+        ("response.json()", legacy_parse, lambda body: legacy_parse(body)[0]),
+        ("loads + parse", parse, lambda body: parse(body)[0]),
+        ("iter raw body", stream, lambda body: next(DataParser.iter_setlist_search(body))),
+    )
+    for label, fn, first in runs:
+        total, peak = measure(fn, bodies)
+        print(
+            f"{label:<16} {total / PAGES * 1e6:7.1f}us/page  first setlist after "
+            f"{first_item(first, bodies) * 1e6:6.1f}us  peak={peak / 1024:6.1f} KiB/page"
+        )
+
+
+if __name__ == "__main__":
+    main()
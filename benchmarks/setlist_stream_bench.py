@@ -0,0 +1,60 @@
+"""Time to first byte and total time of /api/setlists/<id>, JSON vs NDJSON.
+
+Every Spotify search takes 60ms against an in-process stub. The JSON
+response waits for the whole setlist to resolve; the NDJSON stream sends
+the song list first, so its first byte should not grow with setlist size.
+
+    python -m benchmarks.setlist_stream_bench
+"""
+import time
+
+from api.models import Song
+from api.registry import get_registry
+from api.spotify import SpotifyAppClient
+from app import create_app
+from benchmarks.spotify_stub import LocalSpotify
+from routes import setlists
+
+SIZES = (10, 30, 60)
+
+
+class StubSetlistFM:
+    def __init__(self, size):
+        self.size = size
+
+    def get_setlist_songs(self, setlist_id):
+        return [Song(name=f"Song {n}", artist="Stub Artist", position=n) for n in range(1, self.size + 1)]
+
+
+def make_spotify_client():
+    client = SpotifyAppClient("stub-id", "stub-secret", max_workers=8)
+    client.sp = LocalSpotify(latency=0.06)
+    return client
+
+
+def timed_request(app, accept):
+    start = time.perf_counter()
+    response = app.test_client().get("/api/setlists/bench", headers={"Accept": accept})
+    chunks = iter(response.response)
+    next(chunks)
+    first = time.perf_counter() - start
+    for _ in chunks:
+        pass
+    return first, time.perf_counter() - start
+
+
+def main():
+    app = create_app()
+    app.config["TRACK_CACHE_PATH"] = None
+    app.config["SETLIST_INDEX_PATH"] = None
+    setlists.get_spotify_app_client = make_spotify_client
+
+    for size in SIZES:
+        get_registry(app)._setlistfm = StubSetlistFM(size)
+        for label, accept in (("json", "application/json"), ("ndjson", "application/x-ndjson")):
+            first, total = timed_request(app, accept)
+            print(f"{size:>3} songs  {label:<7} first byte={first * 1000:6.0f}ms  total={total * 1000:6.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Browse the same artist repeatedly through the Flask app.
+
+Compares a client built per request (old behaviour) against the shared
+``ClientRegistry`` client, reporting upstream cache hit rate and latency.
+
+    python -m benchmarks.setlistfm_cache_bench
+"""
+import time
+
+from app import create_app
+from api.registry import ClientRegistry, EXTENSION_KEY
+from benchmarks.fixtures import make_setlist_page
+from benchmarks.stub_server import StubServer, report
+
+MBID = "65f4f0c5-ef9e-490c-aee3-909e7ae6b2ab"
+BROWSES = 40
+PAGES = 2
+
+
+def handler(method, path, query, headers, body):
+    if path.endswith("/setlists"):
+        return 200, make_setlist_page(MBID, int(query.get("p", 1)))
+    return 404, {"code": 404, "message": "not found"}
+
+
+def browse(stub, per_request_client):
+    app = create_app()
+    app.config["SETLISTFM_BASE_URL"] = stub.url
+    app.config["SETLIST_INDEX_PATH"] = None
+    app.config["TRACK_CACHE_PATH"] = None
+    app.extensions[EXTENSION_KEY] = ClientRegistry(app.config)
+    client = app.test_client()
+
+    stub.reset()
+    samples = []
+    for _ in range(BROWSES):
+        if per_request_client:
+            app.extensions[EXTENSION_KEY] = ClientRegistry(app.config)
+        start = time.perf_counter()
+        response = client.get(f"/api/artists/{MBID}/setlists?pages={PAGES}")
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.data
+
+    lookups = BROWSES * PAGES
+    hit_rate = 1 - stub.call_count / lookups
+    return samples, hit_rate, stub.call_count
+
+
+def main():
+    with StubServer(handler, latency=0.08) as stub:
+        for label, per_request in (("per-request client", True), ("shared registry client", False)):
+            samples, hit_rate, upstream = browse(stub, per_request)
+            report(label, samples)
+            print(f"{'':<28} upstream calls={upstream} cache hit rate={hit_rate:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Per-request Spotify overhead: a fresh app client per request vs the shared one.
+
+Each simulated request searches one (uncached) song against a stub Spotify
+API with 20ms of latency per call. A fresh client pays for a token fetch
+and a new connection every time; the shared client fetches one token and
+keeps its connections open.
+
+    python -m benchmarks.spotify_overhead_bench
+"""
+import time
+
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials
+
+from api.models import Song
+from api.spotify import SharedClientCredentials, SpotifyAppClient
+from benchmarks.spotify_stub import SpotifyStub
+from benchmarks.stub_server import StubServer, report
+
+REQUESTS = 100
+
+
+def make_client(base_url, credentials):
+    credentials.OAUTH_TOKEN_URL = f"{base_url}/api/token"
+    return SpotifyAppClient("stub-id", "stub-secret", api_prefix=f"{base_url}/v1/", auth_manager=credentials)
+
+
+def fresh_client(base_url):
+    # A cold worker has no token to pick up (spotipy's default is a .cache file in the cwd)
+    credentials = SpotifyClientCredentials(
+        client_id="stub-id", client_secret="stub-secret", cache_handler=MemoryCacheHandler()
+    )
+    return make_client(base_url, credentials)
+
+
+def main():
+    with StubServer(SpotifyStub(), latency=0.02) as server:
+        shared = make_client(server.url, SharedClientCredentials(client_id="stub-id", client_secret="stub-secret"))
+        runs = (
+            ("client per request", lambda: fresh_client(server.url)),
+            ("shared client", lambda: shared),
+        )
+        for label, get_client in runs:
+            server.reset()
+            samples = []
+            for n in range(REQUESTS):
+                start = time.perf_counter()
+                get_client().search_track(Song(name=f"{label} {n}", artist="Stub Artist"))
+                samples.append(time.perf_counter() - start)
+            tokens = sum(1 for _, path, _ in server.calls if path == "/api/token")
+            report(label, samples)
+            print(f"{'':<28} token fetches={tokens} connections={server.connections}")
+
+
+if __name__ == "__main__":
+    main()
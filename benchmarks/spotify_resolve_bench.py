@@ -0,0 +1,51 @@
+"""End-to-end Spotify resolution latency for setlists of 10, 30 and 60 songs.
+
+Runs against a local stub Spotify API with 60ms of latency per call, once
+with plain serial ``search_track`` calls and once with ``resolve_tracks``.
+A throttled run shows the adaptive limiter backing off on 429s.
+
+    python -m benchmarks.spotify_resolve_bench
+"""
+import time
+
+from api.models import Song
+from benchmarks.spotify_stub import SpotifyStub, make_app_client
+from benchmarks.stub_server import StubServer
+
+SIZES = (10, 30, 60)
+
+
+def make_songs(count):
+    return [Song(name=f"Song {n}", artist="Stub Artist", position=n) for n in range(1, count + 1)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    runs = (
+        ("unthrottled", SpotifyStub(latency=0.06)),
+        ("throttled (max 4 in flight)", SpotifyStub(latency=0.06, max_in_flight=4)),
+    )
+    for label, stub in runs:
+        print(f"\n{label}")
+        with StubServer(stub) as server:
+            client = make_app_client(server.url)
+            for size in SIZES:
+                songs = make_songs(size)
+                serial, expected = timed(lambda: [client.search_track(song) for song in songs])
+                stub.throttled = 0
+                batched, resolved = timed(lambda: client.resolve_tracks(songs))
+                assert [t["uri"] for t in resolved] == [t["uri"] for t in expected]
+                print(
+                    f"  {size:>3} songs  serial={serial * 1000:7.0f}ms  "
+                    f"resolve_tracks={batched * 1000:7.0f}ms  "
+                    f"speedup={serial / batched:4.1f}x  429s={stub.throttled}"
+                )
+
+
+if __name__ == "__main__":
+    main()
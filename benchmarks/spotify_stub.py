@@ -0,0 +1,114 @@
+import re
+import threading
+import time
+from urllib.parse import unquote_plus
+
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials
+
+from api.spotify import SpotifyAppClient
+
+
+class SpotifyStub:
+    """Handler for ``StubServer`` that mimics the Spotify endpoints we use.
+
+    With ``max_in_flight`` set, calls beyond that many concurrent requests
+    are answered with 429 and a ``Retry-After`` header.
+    """
+
+    def __init__(self, latency = 0.0, max_in_flight = None, retry_after = 0.1):
+        self.latency = latency
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, method, path, query, headers, body):
+        if path == "/api/token":
+            return 200, {"access_token": "stub-token", "token_type": "Bearer", "expires_in": 3600}
+
+        with self.lock:
+            if self.max_in_flight and self.in_flight >= self.max_in_flight:
+                self.throttled += 1
+                return 429, {"error": {"status": 429, "message": "rate limited"}}, {"Retry-After": self.retry_after}
+            self.in_flight += 1
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            return self.route(method, path, query, body)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def route(self, method, path, query, body):
+        path = path.rstrip("/")
+        if path == "/v1/search":
+            return 200, {"tracks": {"items": [track_for_query(unquote_plus(query.get("q", "")))]}}
+
+        match = re.fullmatch(r"/v1/artists/(\w+)", path)
+        if match:
+            return 200, artist(match.group(1))
+
+        if path == "/v1/artists":
+            return 200, {"artists": [artist(i) for i in query.get("ids", "").split(",") if i]}
+
+        return 404, {"error": {"status": 404, "message": "not found"}}
+
+
+def artist(artist_id):
+    return {
+        "id": artist_id,
+        "name": "Stub Artist",
+        "images": [{"url": f"https://img.example/{artist_id}.jpg"}],
+    }
+
+
+def track_for_query(query):
+    title = re.search(r"track:(.*?) artist:", query)
+    name = title.group(1) if title else query
+    artist_name = query.split("artist:", 1)[-1]
+    slug = re.sub(r"\W+", "", name.lower()) or "track"
+    return {
+        "uri": f"spotify:track:{slug}",
+        "name": name,
+        "artists": [{"id": "stubartist", "name": artist_name}],
+        "album": {"name": "Studio Album", "images": [{"url": "https://img.example/album.jpg"}]},
+    }
+
+
+def make_app_client(base_url, max_workers = 8):
+    credentials = SpotifyClientCredentials(
+        client_id="stub-id",
+        client_secret="stub-secret",
+        cache_handler=MemoryCacheHandler(),
+    )
+    credentials.OAUTH_TOKEN_URL = f"{base_url}/api/token"
+    return SpotifyAppClient(
+        "stub-id", "stub-secret",
+        max_workers=max_workers,
+        api_prefix=f"{base_url}/v1/",
+        auth_manager=credentials,
+    )
+
+
+class LocalSpotify:
+    """In-process stand-in for ``spotipy.Spotify`` with the stub's answers.
+
+    Titles containing "Unreleased" have no match, like songs missing from Spotify.
+    """
+
+    def __init__(self, latency = 0.0):
+        self.latency = latency
+
+    def search(self, q, type = "track", limit = 10, offset = 0, market = None):
+        if self.latency:
+            time.sleep(self.latency)
+        if "unreleased" in q.lower():
+            return {"tracks": {"items": []}}
+        return {"tracks": {"items": [track_for_query(q)]}}
+
+    def artists(self, artists):
+        if self.latency:
+            time.sleep(self.latency)
+        return {"artists": [artist(artist_id) for artist_id in artists]}
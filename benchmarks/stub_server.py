@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class StubServer:
+    """Local HTTP server that answers API calls from a python handler.
+
+    ``handler(method, path, query, headers, body)`` returns ``(status, payload)``
+    or ``(status, payload, headers)``; ``latency`` seconds are added per call.
+    """
+
+    def __init__(self, handler, latency = 0.0):
+        self.handler = handler
+        self.latency = latency
+        self.calls = []
+        self.connections = 0
+        self._calls_lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_request_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def call_count(self):
+        with self._calls_lock:
+            return len(self.calls)
+
+    def reset(self):
+        with self._calls_lock:
+            self.calls.clear()
+            self.connections = 0
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _make_request_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._calls_lock:
+                    stub.connections += 1
+
+            def _dispatch(self, method):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                with stub._calls_lock:
+                    stub.calls.append((method, parsed.path, query))
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                result = stub.handler(method, parsed.path, query, self.headers, body)
+                status, payload = result[0], result[1]
+                extra_headers = result[2] if len(result) > 2 else {}
+
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in extra_headers.items():
+                    self.send_header(name, str(value))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_PUT(self):
+                self._dispatch("PUT")
+
+            def do_DELETE(self):
+                self._dispatch("DELETE")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label, samples):
+    print(
+        f"{label:<28} n={len(samples):<5} "
+        f"p50={percentile(samples, 50) * 1000:7.1f}ms "
+        f"p95={percentile(samples, 95) * 1000:7.1f}ms"
+    )
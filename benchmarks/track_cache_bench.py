@@ -0,0 +1,74 @@
+"""Replay 1,000 setlists through SpotifyAppClient with and without the
+persistent track resolution cache, then again after a restart (warm start).
+
+    python -m benchmarks.track_cache_bench
+"""
+import os
+import random
+import tempfile
+import time
+
+from api.models import Song
+from api.spotify import SpotifyAppClient
+from api.track_cache import TrackResolutionCache
+from benchmarks.spotify_stub import LocalSpotify
+
+SETLISTS = 1000
+ARTISTS = 50
+REPERTOIRE = 60
+SONGS_PER_SHOW = 20
+
+
+def make_setlists(seed = 7):
+    rng = random.Random(seed)
+    setlists = []
+    for _ in range(SETLISTS):
+        artist = f"Artist {rng.randrange(ARTISTS)}"
+        # Most of a show is the same core set every night, plus a few rotations
+        core = list(range(15))
+        rotation = rng.sample(range(15, REPERTOIRE), SONGS_PER_SHOW - len(core))
+        songs = []
+        for position, number in enumerate(core + rotation, start=1):
+            name = f"Unreleased {number}" if number % 29 == 0 else f"Song {number}"
+            cover = "Cover Band" if number % 10 == 9 else None
+            songs.append(Song(name=name, artist=artist, cover=cover, position=position))
+        setlists.append(songs)
+    return setlists
+
+
+def replay(setlists, track_cache):
+    client = SpotifyAppClient("id", "secret", track_cache=track_cache)
+    client.sp = LocalSpotify()
+    start = time.perf_counter()
+    for songs in setlists:
+        client.resolve_tracks(songs)
+    return time.perf_counter() - start, client.request_counts["search"]
+
+
+def main():
+    setlists = make_setlists()
+    lookups = sum(len(songs) for songs in setlists)
+
+    elapsed, searches = replay(setlists, None)
+    print(f"{'no cache':<14} searches={searches:<6} lookups={lookups} time={elapsed:.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tracks.sqlite3")
+
+        cache = TrackResolutionCache(path)
+        elapsed, searches = replay(setlists, cache)
+        stats = cache.stats()
+        print(f"{'cold cache':<14} searches={searches:<6} hit ratio={stats['hit_ratio']:.1%} "
+              f"(negative hits={stats['negative_hits']}) time={elapsed:.2f}s")
+        cache.close()
+
+        cache = TrackResolutionCache(path)
+        elapsed, searches = replay(setlists, cache)
+        stats = cache.stats()
+        print(f"{'warm restart':<14} searches={searches:<6} hit ratio={stats['hit_ratio']:.1%} "
+              f"entries={len(cache)} time={elapsed:.2f}s")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,66 @@ class Config:
     
     # API Keys
     SETLISTFM_API_KEY = os.getenv('SETLISTFM_API_KEY')
+    SETLISTFM_BASE_URL = os.getenv('SETLISTFM_BASE_URL')
+    SETLISTFM_RATE_LIMIT = float(os.getenv('SETLISTFM_RATE_LIMIT', 2))  # requests per second
+    # Set to a file path to share the rate limit between worker processes
+    SETLISTFM_RATE_LIMIT_FILE = os.getenv('SETLISTFM_RATE_LIMIT_FILE')
     SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
     SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET')
     SPOTIFY_REDIRECT_URI = os.getenv('SPOTIFY_REDIRECT_URI',)
+
+    # Concurrent Spotify track lookups per setlist
+    SPOTIFY_RESOLVER_WORKERS = int(os.getenv('SPOTIFY_RESOLVER_WORKERS', 8))
+    # Artist catalogs matched locally before falling back to search
+    SPOTIFY_CATALOG_TTL = 86400  # 1 day
+    SPOTIFY_CATALOG_MIN_SONGS = int(os.getenv('SPOTIFY_CATALOG_MIN_SONGS', 5))
+    SPOTIFY_CATALOG_MAX_TRACKS = 5000  # longer catalogs are cut off; the rest is searched
+    SPOTIFY_CATALOG_MAX_BYTES = 128 * 1024 * 1024  # cached catalogs, kept apart from other caches
+    SPOTIFY_EMPTY_SEARCH_TTL = 3600  # search queries that returned no tracks
     
     # Cache settings
-    CACHE_TTL = 300  # 5 minutes
\ No newline at end of file
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')  # memory, sqlite or redis
+    CACHE_SQLITE_PATH = os.getenv('CACHE_SQLITE_PATH', 'api_cache.sqlite3')
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_TTL = 300  # 5 minutes
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    # setlist.fm freshness per endpoint; CACHE_TTL covers everything else
+    SETLISTFM_SETLIST_TTL = 7 * 86400  # setlists of shows more than 3 days ago
+    SETLISTFM_RECENT_SETLIST_TTL = 3600  # setlists that may still be edited
+    SETLISTFM_LATEST_PAGE_TTL = 300  # an artist's newest setlists
+    SETLISTFM_PAGE_TTL = 3600  # older pages of them
+    SETLISTFM_SEARCH_TTL = 3600
+    SETLISTFM_STALE_TTL = 86400  # expired entries are served while refreshing for up to 1 day
+    SETLISTFM_NEGATIVE_TTL = 600  # 404s and empty results
+
+    # Persistent song -> Spotify track cache
+    TRACK_CACHE_PATH = os.getenv('TRACK_CACHE_PATH', 'track_cache.sqlite3')
+    TRACK_CACHE_TTL = 30 * 86400  # 30 days
+    TRACK_CACHE_NEGATIVE_TTL = 86400  # 1 day
+    TRACK_CACHE_MAX_ENTRIES = 100_000
+    TRACK_CACHE_TOUCH_INTERVAL = 3600  # a hit refreshes an entry's LRU position at most hourly
+
+    # Local per-artist setlist index
+    SETLIST_INDEX_PATH = os.getenv('SETLIST_INDEX_PATH', 'setlist_index.sqlite3')
+    SETLIST_INDEX_STALE_AFTER = 3600  # re-check an artist's newest page after 1 hour
+    SETLIST_INDEX_BACKFILL_PAGES = 5  # older pages fetched per request until history is complete
+    SETLIST_INDEX_PREFETCH = 3  # backfill pages requested concurrently
+
+    # Logged-in users' Spotify clients kept between requests
+    SPOTIFY_USER_POOL_SIZE = int(os.getenv('SPOTIFY_USER_POOL_SIZE', 256))
+    SPOTIFY_USER_IDLE_TTL = 3600  # drop a user's client after 1 hour without requests
+
+    # Background playlist creation
+    PLAYLIST_JOB_WORKERS = int(os.getenv('PLAYLIST_JOB_WORKERS', 4))
+    PLAYLIST_JOB_MAX_PENDING = int(os.getenv('PLAYLIST_JOB_MAX_PENDING', 100))
+    PLAYLIST_JOB_TTL = 3600  # finished jobs are kept (and deduplicated) for 1 hour
+    RESOLUTION_TTL = 3600  # how long Spotify matches from the detail view can be reused
+
+    # Serve setlist details through the asyncio clients (requires httpx). The
+    # SQLite/Redis caches and a shared rate limit file are then used from worker
+    # threads, so they never block the event loop
+    ASYNC_CLIENTS = os.getenv('ASYNC_CLIENTS', '').lower() in ('1', 'true', 'yes')
+
+    # Connection pool size for shared API sessions
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
\ No newline at end of file
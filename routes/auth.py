@@ -1,7 +1,11 @@
 import os, secrets, json
 from flask import Blueprint, current_app, session, redirect, request, url_for, make_response
 import spotipy
-from spotipy.oauth2 import SpotifyOAuth
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyOAuth, SpotifyOauthError
+
+from api.registry import get_registry
+from api.user_context import token_needs_refresh
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
@@ -11,7 +15,8 @@ def _oauth():
         client_secret=current_app.config["SPOTIFY_CLIENT_SECRET"],
         redirect_uri=current_app.config["SPOTIFY_REDIRECT_URI"],
         scope="playlist-modify-public playlist-modify-private user-read-email",
-        cache_path=None,
+        # Tokens live in the user's session, never in a shared cache file
+        cache_handler=MemoryCacheHandler(),
         show_dialog=True,   
         open_browser=False 
     )
@@ -34,6 +39,18 @@ def callback():
     oauth = _oauth()
     token_info = oauth.get_access_token(code=code, as_dict=True)
 
+    _store_token(token_info)
+
+    sp = spotipy.Spotify(auth=token_info["access_token"])
+    me = sp.me()
+    session["spotify_user"] = {"id": me["id"], "name": me.get("display_name") or me["id"]}
+
+    print("Authenticated Spotify user (callback):", me["id"], me.get("display_name"))
+
+    return _close_popup(success=True, payload={"user": session["spotify_user"]})
+
+
+def _store_token(token_info):
     session["spotify_token"] = {
         "access_token": token_info["access_token"],
         "refresh_token": token_info.get("refresh_token"),
@@ -42,17 +59,43 @@ def callback():
         "token_type": token_info.get("token_type"),
     }
 
-    sp = spotipy.Spotify(auth=token_info["access_token"])
-    me = sp.me()
-    session["spotify_user"] = {"id": me["id"], "name": me.get("display_name") or me["id"]}
 
-    print("Authenticated Spotify user (callback):", me["id"], me.get("display_name"))
+def get_user_client():
+    """Pooled SpotifyUserClient for the logged-in user, or None.
 
-    return _close_popup(success=True, payload={"user": session["spotify_user"]})
+    The user id comes from the session, so no /me call is made, and the
+    access token is refreshed shortly before it expires.
+    """
+    token = session.get("spotify_token")
+    if not token or not token.get("access_token"):
+        return None
+
+    pool = get_registry(current_app).user_clients
+    if token_needs_refresh(token):
+        try:
+            _store_token(pool.refresh(token, _oauth()))
+        except SpotifyOauthError as e:
+            current_app.logger.warning(f"Spotify token refresh failed: {e}")
+            session.pop("spotify_token", None)
+            session.pop("spotify_user", None)
+            return None
+        token = session["spotify_token"]
+
+    client = None
+    user = session.get("spotify_user")
+    if not user:
+        # Sessions from before the profile was stored; the client that looked
+        # the user up is the one pooled
+        client = pool.client_factory(token["access_token"])
+        user = session["spotify_user"] = {"id": client.user_id, "name": client.user_id}
+    return pool.get(user["id"], token["access_token"], client)
 
 
 @auth_bp.route("/logout", methods=["POST"])
 def logout():
+    user = session.get("spotify_user")
+    if user:
+        get_registry(current_app).user_clients.discard(user["id"])
     session.pop("spotify_token", None)
     session.pop("spotify_user", None)
     session.pop("spotify_oauth_state", None)
@@ -1,79 +1,136 @@
-from flask import Blueprint, request, jsonify, current_app, session
-from api.spotify import SpotifyAppClient, SpotifyUserClient
-from api.setlistfm import SetlistFMClient
+import hashlib
+import json
+
+from flask import Blueprint, request, jsonify, current_app, session, url_for
+from api.registry import get_registry
 from api.models import SetListInfo
+from api.jobs import JobQueueFullError
+from api.resolutions import ResolutionStore
 from api.exceptions import APIError, AuthenticationError, NotFoundError
+from routes.auth import get_user_client
 
 playlist_bp = Blueprint('playlists', __name__)
 
 def get_spotify_app_client():
-    return SpotifyAppClient(
-        client_id=current_app.config['SPOTIFY_CLIENT_ID'],
-        client_secret=current_app.config['SPOTIFY_CLIENT_SECRET']
-    )
+    return get_registry(current_app).spotify_app
 
 
 def get_setlistfm_client():
-    return SetlistFMClient(
-        api_key=current_app.config['SETLISTFM_API_KEY'],
-        cache_ttl=current_app.config['CACHE_TTL']
+    return get_registry(current_app).setlistfm
+
+def job_key(user_id, data):
+    """Identifies one user's request for one setlist and song selection."""
+    selected = sorted(selected_keyset(data))
+    payload = json.dumps([
+        user_id, data.get('setlist_id'), selected, bool(data.get('public', False)), data.get('playlist_id')
+    ])
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def selected_keyset(data):
+    return {(int(k.get('set_number', 0)), int(k.get('position', 0))) for k in data.get('selected') or []}
+
+def resolve_selection(job, user_spotify, app_spotify, setlistfm_client, resolution, data):
+    """Artist name and track URIs for the selected songs.
+
+    A resolution issued by the detail view is reused as is; without one the
+    setlist is fetched and every selected song searched on Spotify.
+    """
+    keyset = selected_keyset(data)
+    if resolution is not None:
+        track_uris = ResolutionStore.track_uris(resolution, keyset)
+        count = sum(1 for s in resolution['songs'] if not keyset or (s[0], s[1]) in keyset)
+        job.progress(count, count)
+        return resolution['artist'], track_uris, count
+
+    all_songs = setlistfm_client.get_setlist_songs(data.get('setlist_id'))
+
+    if keyset:
+        songs = [s for s in all_songs if (s.set_number, s.position) in keyset]
+    else:
+        songs = all_songs
+
+    if not songs:
+        raise APIError('No songs selected')
+    job.progress(0, len(songs))
+
+    track_uris = user_spotify.resolve_uris(songs, app_spotify, progress=job.progress)
+    return songs[0].artist, track_uris, len(songs)
+
+def build_playlist(job, user_spotify, app_spotify, setlistfm_client, resolution, data):
+    setlist_id = data.get('setlist_id')
+    public = data.get('public', False)
+
+    artist, track_uris, songs_count = resolve_selection(
+        job, user_spotify, app_spotify, setlistfm_client, resolution, data
     )
+    if not songs_count:
+        raise APIError('No songs selected')
+
+    setlist_info = SetListInfo(
+        id=setlist_id,
+        artist=artist or "Unknown Artist",
+        date=data.get('date', ''),
+        venue=data.get('venue', 'Unknown Venue'),
+        city=data.get('city', 'Unknown City'),
+        country=data.get('country', 'Unknown Country'),
+        tour=data.get('tour'),
+        url=f"https://setlist.fm/setlist/{setlist_id}"
+    )
+
+    if data.get('playlist_id'):
+        result = user_spotify.sync_playlist(data['playlist_id'], track_uris)
+    else:
+        result = user_spotify.create_playlist(setlist_info, track_uris, public)
+
+    return {
+        'playlist_url': result.url,
+        'songs_count': songs_count,
+        'setlist_id': setlist_id,
+        'added': result.added,
+        'removed': result.removed,
+        'failed_chunks': result.failed_chunks
+    }
+
+def job_response(job, status = 200):
+    data = job.to_dict()
+    data['status_url'] = url_for('playlists.get_playlist_job', job_id=job.id)
+    return jsonify({'success': True, 'data': data}), status
 
 @playlist_bp.route('/playlists/create', methods=['POST'])
 def create_playlist():
+    """Queue playlist creation and return the job to poll.
+
+    With a ``playlist_id`` the existing playlist is synced to the selection
+    instead of a new one being created. A ``resolution_id`` from the
+    setlist details reuses its Spotify matches, so no songs are searched.
+    """
     try:
-        token = session.get("spotify_token")
-        if not token or not token.get("access_token"):
+        user_spotify = get_user_client()
+        if user_spotify is None:
             return jsonify({'error': 'Spotify login required'}), 401
-        
-        access_token = token.get("access_token")
-        
-        user_spotify = SpotifyUserClient(access_token=access_token)
-        
-        me = user_spotify.sp.me()
-        print("Authenticated Spotify user (playlist):", me["id"], me.get("display_name"))
-
-        app_spotify = get_spotify_app_client()
 
         data = request.get_json() or {}
-        setlist_id = data.get('setlist_id')
-        public = data.get('public', False)
-        selected_keys = data.get('selected') or []
+        if not data.get('setlist_id'):
+            return jsonify({'error': 'setlist_id is required'}), 400
 
+        # Worker threads run outside the request, so resolve the clients here
+        registry = get_registry(current_app)
+        resolution = registry.resolutions.get(data.get('resolution_id'), data['setlist_id'])
+        app_spotify = get_spotify_app_client() if resolution is None else None
         setlistfm_client = get_setlistfm_client()
-        all_songs = setlistfm_client.get_setlist_songs(setlist_id)
-
-        if selected_keys:
-            keyset = {(int(k.get('set_number', 0)), int(k.get('position', 0))) for k in selected_keys}
-            songs = [s for s in all_songs if (s.set_number, s.position) in keyset]
-        else:
-            songs = all_songs
-
-        if not songs:
-            return jsonify({'error': 'No songs selected'}), 400
-
-        setlist_info = SetListInfo(
-            id=setlist_id,
-            artist=songs[0].artist if songs else "Unknown Artist",
-            date=data.get('date', ''),
-            venue=data.get('venue', 'Unknown Venue'),
-            city=data.get('city', 'Unknown City'),
-            country=data.get('country', 'Unknown Country'),
-            tour=data.get('tour'),
-            url=f"https://setlist.fm/setlist/{setlist_id}"
-        )
-
-        playlist_url = user_spotify.create_playlist_from_setlist(setlist_info, songs, app_spotify, public)
 
-        return jsonify({
-            'success': True,
-            'data': {
-                'playlist_url': playlist_url,
-                'songs_count': len(songs),
-                'setlist_id': setlist_id
-            }
-        })
+        job = registry.jobs.submit(
+            job_key(user_spotify.user_id, data),
+            lambda job: build_playlist(job, user_spotify, app_spotify, setlistfm_client, resolution, data),
+            owner=user_spotify.user_id
+        )
+        return job_response(job, 202)
 
+    except JobQueueFullError as e:
+        current_app.logger.warning(str(e))
+        response = jsonify({'error': 'Too many playlists are being created, try again shortly'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
     except AuthenticationError as e:
         return jsonify({'error': f'Spotify authentication failed: {str(e)}'}), 401
     except NotFoundError as e:
@@ -82,4 +139,20 @@ def create_playlist():
         return jsonify({'error': str(e)}), 500
     except Exception as e:
         current_app.logger.exception("Unexpected error in create_playlist")
-        return jsonify({'error': 'Internal server error'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Internal server error'}), 500
+
+@playlist_bp.route('/playlists/jobs/<job_id>', methods=['GET'])
+def get_playlist_job(job_id):
+    """Progress of a playlist job; ``result`` holds the playlist URL once it succeeds.
+
+    Only the user who queued the job can see it; for anyone else it does
+    not exist.
+    """
+    user = session.get('spotify_user')
+    if not user:
+        return jsonify({'error': 'Spotify login required'}), 401
+
+    job = get_registry(current_app).jobs.get(job_id)
+    if job is None or job.owner != user['id']:
+        return jsonify({'error': 'Job not found'}), 404
+    return job_response(job)
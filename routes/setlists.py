@@ -1,24 +1,23 @@
-from flask import Blueprint, request, jsonify, current_app
-from api.setlistfm import SetlistFMClient
-from api.spotify import SpotifyAppClient
-from api.exceptions import APIError, NotFoundError, AuthenticationError
+from flask import Blueprint, Response, request, current_app, stream_with_context
+from api.models import to_dicts
+from api.registry import get_registry
+from api.exceptions import APIError, NotFoundError
+from api.serialization import dumps
 
 setlist_bp = Blueprint('setlists', __name__)
 
 def get_setlistfm_client():
-    return SetlistFMClient(
-        api_key=current_app.config['SETLISTFM_API_KEY'],
-        cache_ttl=current_app.config['CACHE_TTL']
-    )
+    return get_registry(current_app).setlistfm
 
 def get_spotify_app_client():
-    try:
-        return SpotifyAppClient(
-            client_id=current_app.config['SPOTIFY_CLIENT_ID'],
-            client_secret=current_app.config['SPOTIFY_CLIENT_SECRET']
-        )
-    except AuthenticationError as e:
-        raise e
+    return get_registry(current_app).spotify_app
+
+async def resolve_setlist_async(registry, setlist_id):
+    songs = await registry.async_setlistfm.get_setlist_songs(setlist_id)
+    return songs, await registry.async_spotify_app.resolve_tracks(songs)
+
+def json_response(payload, status = 200):
+    return Response(dumps(payload), status=status, mimetype='application/json')
 
 @setlist_bp.route('/artists/search', methods=['GET'])
 def search_artists():
@@ -27,21 +26,21 @@ def search_artists():
         page = int(request.args.get('page', 1))
 
         if not query:
-            return jsonify({'error': 'Query parameter required'}), 400
+            return json_response({'error': 'Query parameter required'}, 400)
         
         client = get_setlistfm_client()
         artists = client.search_artist(query, page)
 
-        return jsonify ({
+        return json_response({
             'success': True,
             'data': artists,
             'page': page
         })
     
     except APIError as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
     except Exception as e:
-        return jsonify({'error': 'Internal server error'}), 500
+        return json_response({'error': 'Internal server error'}, 500)
     
 @setlist_bp.route('/artists/<mbid>/setlists', methods=['Get'])
 @setlist_bp.route('/artists/<mbid>/setlists', methods=['GET'])
@@ -51,87 +50,133 @@ def get_artist_setlists(mbid):
         month = request.args.get('month')
         year = request.args.get('year')
         venue = request.args.get('venue')
+        city = request.args.get('city')
         tour = request.args.get('tour')
+        prefix = request.args.get('match') == 'prefix'
+        limit = request.args.get('limit', type=int)
+
+        if limit is None and not (month or year or venue or city or tour):
+            # Unfiltered browsing keeps returning about as many as `pages` used to
+            limit = page_limit * 20
 
         client = get_setlistfm_client()
-        setlists = client.get_artist_setlists_filtered(
-            artistmbid=mbid,
-            page_limit=page_limit,
-            month=month,
+        setlists = get_registry(current_app).setlist_index.browse(
+            client,
+            mbid,
             year=year,
+            month=month,
             venue=venue,
-            tour=tour
+            city=city,
+            tour=tour,
+            prefix=prefix,
+            limit=limit,
+            max_pages=page_limit
         )
 
-        return jsonify({
+        return json_response({
             'success': True,
             'count': len(setlists),
-            'data': [
-                {
-                    'id': s.id,
-                    'artist': s.artist,
-                    'date': s.date,
-                    'venue': s.venue,
-                    'city': s.city,
-                    'country': s.country,
-                    'tour': s.tour,
-                    'url': s.url,
-                    'display_title': s.display_title
-                }
-                for s in setlists
-            ]
+            'data': to_dicts(setlists)
         })
 
     except APIError as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
     
+NDJSON_MIMETYPE = 'application/x-ndjson'
+SSE_MIMETYPE = 'text/event-stream'
+
+def song_details(song, track = None):
+    details = song.to_dict()
+    details.update(track_details(track))
+    return details
+
+def track_details(track):
+    return {
+        'album': track['album'] if track else None,
+        'album_image': track['album_image'] if track else None,
+        'artist_image': track['artist_image'] if track else None,
+        'spotify_uri': track['uri'] if track else None
+    }
+
+def setlist_events(setlist_id, songs, spotify_client, resolutions):
+    """The song list straight away, then one event per song as Spotify resolves it."""
+    tracks = [None] * len(songs)
+    yield {
+        'type': 'setlist',
+        'data': {
+            'setlist_id': setlist_id,
+            'songs': [song_details(song) for song in songs]
+        }
+    }
+    try:
+        for index, track in spotify_client.iter_resolve_tracks(songs):
+            tracks[index] = track
+            yield {'type': 'song', 'index': index, 'data': track_details(track)}
+    except Exception as e:
+        current_app.logger.error(f"Error streaming setlist {setlist_id}: {e}")
+        yield {'type': 'error', 'error': 'Failed to resolve songs on Spotify'}
+        return
+    yield {'type': 'done', 'resolution_id': resolutions.issue(setlist_id, songs, tracks)}
+
+def stream_events(events, mimetype):
+    if mimetype == SSE_MIMETYPE:
+        body = (b"event: " + event['type'].encode() + b"\ndata: " + dumps(event) + b"\n\n" for event in events)
+    else:
+        body = (dumps(event) + b'\n' for event in events)
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @setlist_bp.route('/setlists/<setlist_id>', methods=['GET'])
 def get_setlist_details(setlist_id):
+    """Setlist songs enriched with Spotify matches.
+
+    Clients sending ``Accept: application/x-ndjson`` (or
+    ``text/event-stream``) get the songs at once followed by each song's
+    Spotify match as it resolves; everyone else gets one JSON document.
+    """
     try:
-        client = get_setlistfm_client()
-        songs = client.get_setlist_songs(setlist_id)
-
-        spotify_client = get_spotify_app_client()
-        enriched_songs = []
-
-        for song in songs:
-            track_uri = spotify_client.search_track(song)
-            enriched_songs.append({
-                'name': song.name,
-                'artist': song.artist,
-                'original_artist': song.original_artist,
-                'is_cover': song.is_cover,
-                'is_encore': song.is_encore,
-                'encore': song.encore,
-                'position': song.position,
-                'set_number': song.set_number,
-                'info': song.info,
-                'album': track_uri['album'] if track_uri else None,
-                'album_image': track_uri['album_image'] if track_uri else None,
-                'artist_image': track_uri['artist_image'] if track_uri else None,
-                'spotify_uri': track_uri['uri'] if track_uri else None
-            })
+        registry = get_registry(current_app)
+        resolutions = registry.resolutions
+        mimetype = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE, SSE_MIMETYPE])
+
+        if mimetype in (NDJSON_MIMETYPE, SSE_MIMETYPE):
+            songs = get_setlistfm_client().get_setlist_songs(setlist_id)
+            spotify_client = get_spotify_app_client()
+            return stream_events(setlist_events(setlist_id, songs, spotify_client, resolutions), mimetype)
+
+        if current_app.config.get('ASYNC_CLIENTS'):
+            # Song searches fan out with gather on the shared event loop
+            songs, tracks = registry.run_async(resolve_setlist_async(registry, setlist_id))
+        else:
+            songs = get_setlistfm_client().get_setlist_songs(setlist_id)
+            tracks = get_spotify_app_client().resolve_tracks(songs)
+        enriched_songs = [song_details(song, track) for song, track in zip(songs, tracks)]
         
         artist_image = next(
             (s['artist_image'] for s in enriched_songs if s['artist_image']), None
         )
 
-        return jsonify({
+        return json_response({
             'success': True,
             'data': {
                 'setlist_id': setlist_id,
                 'artist_image': artist_image,
-                'songs': enriched_songs
+                'songs': enriched_songs,
+                # Pass back to /playlists/create to skip searching Spotify again
+                'resolution_id': resolutions.issue(setlist_id, songs, tracks)
             }
         })
     
     except NotFoundError as e:
-        return jsonify({'error': str(e)}), 404
+        return json_response({'error': str(e)}, 404)
     except APIError as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
     except Exception as e:
         current_app.logger.error(f"Unexpected error in get_setlist_details: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return json_response({'error': 'Internal server error'}, 500)
 
 
 @setlist_bp.route('/artists/<artist_name>/recent', methods=['GET'])
@@ -142,29 +187,15 @@ def get_recent_setlists(artist_name):
         limit = int(request.args.get('limit', 20))
         
         client = get_setlistfm_client()
-        setlists = client.get_recent_setlists(artist_name, days, limit)
-        
-        # Convert SetListInfo objects to dictionaries
-        setlists_data = [
-            {
-                'id': setlist.id,
-                'artist': setlist.artist,
-                'date': setlist.date,
-                'venue': setlist.venue,
-                'city': setlist.city,
-                'country': setlist.country,
-                'tour': setlist.tour,
-                'url': setlist.url,
-                'display_title': setlist.display_title
-            } for setlist in setlists
-        ]
+        artist_mbid = request.args.get('mbid') or client.resolve_artist_mbid(artist_name)
+        setlists = get_registry(current_app).setlist_index.recent(client, artist_mbid, days, limit)
         
-        return jsonify({
+        return json_response({
             'success': True,
-            'data': setlists_data
+            'data': to_dicts(setlists)
         })
         
     except NotFoundError as e:
-        return jsonify({'error': str(e)}), 404
+        return json_response({'error': str(e)}, 404)
     except APIError as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return json_response({'error': str(e)}, 500)
\ No newline at end of file
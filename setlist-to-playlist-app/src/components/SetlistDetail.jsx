@@ -5,6 +5,8 @@ export default function SetlistDetail({ setlist }) {
   const [selectedSongs, setSelectedSongs] = useState({});
   const [loading, setLoading] = useState(false);
   const [creating, setCreating] = useState(false);
+  const [progress, setProgress] = useState(null);
+  const [resolutionId, setResolutionId] = useState(null);
   const [playlistUrl, setPlaylistUrl] = useState(null);
   const [error, setError] = useState(null);
   const [artistImage, setArtistImage] = useState(null);
@@ -13,31 +15,84 @@ export default function SetlistDetail({ setlist }) {
 
   useEffect(() => {
     if (!setlist) return;
+    const controller = new AbortController();
     setLoading(true);
     setPlaylistUrl(null);
     setError(null);
+    setArtistImage(null);
+    setResolutionId(null);
 
-    fetch(`/api/setlists/${setlist.id}`)
-      .then((res) => res.json())
-      .then((data) => {
-        if (data.success) {
-          setSongs(data.data.songs);
-          setArtistImage(data.data.artist_image || null);
+    // Songs arrive first; each Spotify match is streamed in as it resolves
+    let listed = [];
 
-          const defaults = {};
-          data.data.songs.forEach((song) => {
-            defaults[song.position] = !(
-              song.is_cover ||
-              song.is_encore ||
-              song.spotify_uri == null ||
-              song.spotify_uri == undefined
-            );
-          });
-          setSelectedSongs(defaults);
+    function handleEvent(event) {
+      if (event.type === "setlist") {
+        listed = event.data.songs;
+        setSongs(listed.map((song) => ({ ...song, pending: true })));
+        setSelectedSongs({});
+        setLoading(false);
+      } else if (event.type === "song") {
+        setSongs((prev) =>
+          prev.map((song, i) =>
+            i === event.index ? { ...song, ...event.data, pending: false } : song
+          )
+        );
+        const song = listed[event.index];
+        setSelectedSongs((prev) => ({
+          ...prev,
+          [song.position]: !(
+            song.is_cover ||
+            song.is_encore ||
+            event.data.spotify_uri == null ||
+            event.data.spotify_uri == undefined
+          ),
+        }));
+        if (event.data.artist_image) {
+          setArtistImage((prev) => prev || event.data.artist_image);
         }
+      } else if (event.type === "done" || event.type === "error") {
+        setResolutionId(event.resolution_id || null);
+        setSongs((prev) => prev.map((song) => ({ ...song, pending: false })));
+      }
+    }
+
+    async function load() {
+      const res = await fetch(`/api/setlists/${setlist.id}`, {
+        headers: { Accept: "application/x-ndjson" },
+        signal: controller.signal,
+      });
+      if (!res.ok || !res.headers.get("Content-Type")?.includes("ndjson")) {
+        const data = await res.json();
+        if (data.success) {
+          handleEvent({ type: "setlist", data: data.data });
+          data.data.songs.forEach((song, index) =>
+            handleEvent({ type: "song", index, data: song })
+          );
+          handleEvent({ type: "done", resolution_id: data.data.resolution_id });
+        }
+        return;
+      }
+
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = "";
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+        const lines = buffered.split("\n");
+        buffered = lines.pop();
+        lines.filter((line) => line.trim()).forEach((line) => handleEvent(JSON.parse(line)));
+      }
+    }
+
+    load()
+      .catch((err) => {
+        if (err.name !== "AbortError") console.error("Error fetching setlist details:", err);
       })
-      .catch((err) => console.error("Error fetching setlist details:", err))
       .finally(() => setLoading(false));
+
+    return () => controller.abort();
   }, [setlist]);
 
   async function checkAuth() {
@@ -113,6 +168,8 @@ export default function SetlistDetail({ setlist }) {
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
           setlist_id: setlist.id,
+          // Lets the server reuse the Spotify matches shown here
+          resolution_id: resolutionId,
           selected: selectedKeys,
           date: setlist.date,
           venue: setlist.venue,
@@ -123,17 +180,35 @@ export default function SetlistDetail({ setlist }) {
         }),
       });
 
-      const data = await res.json();
-      if (data.success) {
-        setPlaylistUrl(data.data.playlist_url);
-      } else {
+      let data = await res.json();
+      if (!data.success) {
         setError(data.error || "Failed to create playlist");
+        return;
+      }
+
+      // Creation runs as a background job; poll it until it finishes
+      let job = data.data;
+      while (job.state === "queued" || job.state === "running") {
+        setProgress(job.total ? { resolved: job.resolved, total: job.total } : null);
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        data = await (await fetch(job.status_url)).json();
+        if (!data.success) break;
+        job = data.data;
+      }
+
+      if (data.success && job.state === "succeeded") {
+        setPlaylistUrl(job.result.playlist_url);
+        const missing = job.result.failed_chunks.reduce((n, chunk) => n + chunk.count, 0);
+        if (missing) setError(`${missing} songs could not be added to the playlist.`);
+      } else {
+        setError(job.error || data.error || "Failed to create playlist");
       }
     } catch (err) {
       console.error("Error creating playlist:", err);
       setError("An unexpected error occurred.");
     } finally {
       setCreating(false);
+      setProgress(null);
     }
   };
 
@@ -155,7 +230,7 @@ export default function SetlistDetail({ setlist }) {
             {!loading && songs.length > 0 && (
               <ol className="song-list">
                 {songs.map((song) => {
-                  const isSpotifyMissing = song.spotify_uri == null || song.spotify_uri == undefined;
+                  const isSpotifyMissing = !song.pending && (song.spotify_uri == null || song.spotify_uri == undefined);
                   const isSelected = selectedSongs[song.position] && !isSpotifyMissing;
 
                   return (
@@ -163,7 +238,7 @@ export default function SetlistDetail({ setlist }) {
                       key={song.position}
                       className={`song-item ${isSelected ? "selected" : "faded"}`}
                       onClick={() => {
-                        if (!isSpotifyMissing) toggleSong(song.position);
+                        if (!isSpotifyMissing && !song.pending) toggleSong(song.position);
                       }}
                     >
                       <div className="song-entry">
@@ -189,6 +264,10 @@ export default function SetlistDetail({ setlist }) {
                             <span className="song-album">{song.album}</span>
                           )}
 
+                          {song.pending && (
+                            <span className="song-album">Searching Spotify…</span>
+                          )}
+
                           {isSpotifyMissing && (
                             <span className="song-missing">Not found on Spotify</span>
                           )}
@@ -243,7 +322,11 @@ export default function SetlistDetail({ setlist }) {
                       disabled={creating}
                       className="spotify-button"
                     >
-                      {creating ? "Creating..." : "Create Spotify Playlist"}
+                      {creating
+                        ? progress
+                          ? `Creating... ${progress.resolved}/${progress.total}`
+                          : "Creating..."
+                        : "Create Spotify Playlist"}
                     </button>
                   )}
 
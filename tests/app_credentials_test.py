@@ -0,0 +1,46 @@
+import threading
+import time
+
+from api.spotify import SharedClientCredentials
+
+
+class CountingCredentials(SharedClientCredentials):
+    def __init__(self, expires_in = 3600, **kwargs):
+        super().__init__(client_id="id", client_secret="secret", **kwargs)
+        self.expires_in = expires_in
+
+    def _request_access_token(self):
+        time.sleep(0.05)
+        return {"access_token": f"token-{self.token_requests}", "expires_in": self.expires_in}
+
+
+def test_concurrent_callers_share_one_token_fetch():
+    credentials = CountingCredentials()
+    tokens = []
+
+    threads = [threading.Thread(target=lambda: tokens.append(credentials.get_access_token())) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert credentials.token_requests == 1
+    assert set(tokens) == {"token-1"}
+
+
+def test_token_is_renewed_ahead_of_expiry():
+    credentials = CountingCredentials(expires_in=200, refresh_margin=300)
+
+    credentials.get_access_token()
+    credentials.get_access_token()
+
+    assert credentials.token_requests == 2
+
+
+def test_current_token_is_used_while_another_thread_renews():
+    credentials = CountingCredentials(expires_in=200, refresh_margin=300)
+    first = credentials.get_access_token()
+
+    with credentials._refresh_lock:
+        assert credentials.get_access_token() == first
+    assert credentials.token_requests == 1
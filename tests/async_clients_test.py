@@ -0,0 +1,328 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from api import async_http, async_spotify
+from api.async_http import AsyncAdaptiveConcurrency, AsyncSingleFlight, EventLoopThread
+from api.async_setlistfm import AsyncSetlistFMClient
+from api.async_spotify import AsyncSpotifyAppClient, AsyncSpotifyUserClient
+from api.exceptions import NotFoundError
+from api.models import SetListInfo, Song
+from api.registry import get_registry
+from api.setlistfm import SetlistFMClient
+from api.utils import CacheManager, RateLimiter
+from app import create_app
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload = None, headers = None):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode() if payload is not None else b""
+        self.headers = headers or {}
+
+    @property
+    def is_error(self):
+        return self.status_code >= 400
+
+
+class FakeAsyncClient:
+    """Answers ``get``/``request``/``post`` from a handler after ``latency`` seconds."""
+
+    def __init__(self, handler, latency = 0.01):
+        self.handler = handler
+        self.latency = latency
+        self.headers = {}
+        self.calls = []
+        self.bodies = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def request(self, method, url, params = None, json = None, headers = None, data = None, auth = None):
+        self.calls.append((method, url, params))
+        self.bodies.append(json)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            return self.handler(method, url, params or {})
+        finally:
+            self.in_flight -= 1
+
+    async def get(self, url, params = None, headers = None):
+        return await self.request("GET", url, params, headers=headers)
+
+    async def post(self, url, data = None, auth = None):
+        return await self.request("POST", url)
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def setlistfm_handler(make_setlist, make_setlist_page):
+    def handler(method, url, params):
+        if "/setlist/missing" in url:
+            return FakeResponse(404, {})
+        if "/setlist/" in url:
+            setlist_id = url.rsplit("/", 1)[1]
+            return FakeResponse(200, make_setlist("0123456789ab", int(setlist_id), songs=3))
+        return FakeResponse(200, make_setlist_page("0123456789ab", int(params["p"]), total=100))
+    return handler
+
+
+def make_setlistfm(handler):
+    fake = FakeAsyncClient(handler)
+    client = AsyncSetlistFMClient("key", client=fake, rate_limiter=RateLimiter(max_requests=1000))
+    return client, fake
+
+
+def test_setlistfm_requests_are_cached_and_fanned_out(setlistfm_handler):
+    client, fake = make_setlistfm(setlistfm_handler)
+
+    async def run():
+        songs = await client.get_setlists_songs(["1", "2", "3", "1"])
+        setlists = await client.get_artist_setlists_pages("0123456789ab", page_limit=3)
+        await client.get_setlist_songs("2")
+        return songs, setlists
+
+    songs, setlists = asyncio.run(run())
+
+    assert sorted(songs) == ["1", "2", "3"] and len(songs["2"]) == 3
+    assert len(setlists) == 60
+    assert fake.max_in_flight >= 3
+    # Three setlists and three pages; the repeat is a cache hit
+    assert len(fake.calls) == 6
+    assert fake.headers["x-api-key"] == "key"
+
+
+def test_setlistfm_retries_server_errors_and_raises_not_found(setlistfm_handler):
+    truncated = FakeResponse(200)
+    truncated.content = b'{"id": '
+    responses = [FakeResponse(503), FakeResponse(429, headers={"Retry-After": "0"})]
+
+    def flaky(method, url, params):
+        return responses.pop(0) if responses else setlistfm_handler(method, url, params)
+
+    client, fake = make_setlistfm(flaky)
+    client.request_handler.backoff_base = 0.001
+
+    assert len(asyncio.run(client.get_setlist_songs("4"))) == 3
+    assert client.request_handler.metrics["retries"] == 2
+    responses.append(truncated)
+    assert len(asyncio.run(client.get_setlist_songs("5"))) == 3
+    assert client.request_handler.metrics["invalid_responses"] == 1
+    with pytest.raises(NotFoundError):
+        asyncio.run(client.get_setlist_songs("missing"))
+    # The 404 is cached, so asking again does not reach the API
+    calls = len(fake.calls)
+    with pytest.raises(NotFoundError):
+        asyncio.run(client.get_setlist_songs("missing"))
+    assert len(fake.calls) == calls and client.request_handler.metrics["negative_hits"] == 1
+
+
+class ThreadRecordingCache(CacheManager):
+    """A cache that claims to block and records which threads call it."""
+
+    blocking = True
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.current_thread())
+        return super().get(key)
+
+    def set(self, key, value, ttl = None):
+        self.threads.add(threading.current_thread())
+        super().set(key, value, ttl)
+
+
+def test_blocking_cache_backends_are_used_off_the_event_loop(setlistfm_handler, tmp_path):
+    cache = ThreadRecordingCache()
+    rate_limiter = RateLimiter(max_requests=1000, shared_path=str(tmp_path / "bucket"))
+    fake = FakeAsyncClient(setlistfm_handler)
+    client = AsyncSetlistFMClient("key", client=fake, cache=cache, rate_limiter=rate_limiter)
+    loop = EventLoopThread()
+    try:
+        first = loop.run(client.get_setlist_songs("1"))
+        assert loop.run(client.get_setlist_songs("1")) == first
+    finally:
+        loop.close()
+
+    assert client.cache is cache and len(fake.calls) == 1
+    assert cache.threads and loop.thread not in cache.threads
+
+
+def test_injected_clients_work_without_httpx(monkeypatch, setlistfm_handler):
+    monkeypatch.setattr(async_http, "TRANSPORT_ERRORS", ())
+    monkeypatch.setattr(async_spotify, "TRANSPORT_ERRORS", ())
+
+    def broken(method, url, params):
+        raise ConnectionError("refused")
+
+    client, _ = make_setlistfm(broken)
+    with pytest.raises(ConnectionError):
+        asyncio.run(client.get_setlist_songs("1"))
+    with pytest.raises(ConnectionError):
+        asyncio.run(AsyncSpotifyUserClient.create("token", client=FakeAsyncClient(broken)))
+
+
+def test_async_client_created_after_a_throttle_recovers_the_configured_rate(setlistfm_handler):
+    sync = SetlistFMClient("key", rate_limiter=RateLimiter(max_requests=100))
+    controller = sync.request_handler.rate_controller
+    controller.on_throttle()
+    assert sync.rate_limiter.rate == 50
+
+    client = AsyncSetlistFMClient("key", client=FakeAsyncClient(setlistfm_handler, latency=0),
+                                  rate_limiter=sync.rate_limiter, rate_controller=controller)
+    controller.increase = 10
+
+    async def fetch():
+        for n in range(10):
+            await client.get_setlist_songs(str(n))
+
+    asyncio.run(fetch())
+    assert client.request_handler.rate_controller is controller
+    assert sync.rate_limiter.rate == 100
+
+
+def test_registry_shares_one_rate_controller_per_limiter():
+    pytest.importorskip("httpx")
+    app = create_app()
+    app.config["SETLISTFM_API_KEY"] = "key"
+    registry = get_registry(app)
+
+    assert registry.async_setlistfm.request_handler.rate_controller is registry.setlistfm.request_handler.rate_controller
+
+
+def test_single_flight_coalesces_concurrent_awaits():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", fetch, 21) for _ in range(10)))
+
+    assert asyncio.run(run()) == [42] * 10
+    assert calls == [21] and flight.coalesced == 9 and not flight.in_flight
+
+
+def spotify_handler(method, url, params):
+    if url.endswith("/token"):
+        return FakeResponse(200, {"access_token": "app-token", "expires_in": 3600})
+    if url.endswith("/artists"):
+        return FakeResponse(200, {"artists": [{"id": a, "images": [{"url": f"{a}.jpg"}]} for a in params["ids"].split(",")]})
+    name = params["q"].split("track:", 1)[-1].split(" artist:", 1)[0].title()
+    return FakeResponse(200, {"tracks": {"items": [{
+        "uri": f"spotify:track:{name}",
+        "name": name,
+        "artists": [{"id": "band", "name": "Band"}],
+        "album": {"name": "Album", "images": []},
+    }]}})
+
+
+def test_spotify_resolve_tracks_gathers_searches_with_one_token():
+    fake = FakeAsyncClient(spotify_handler)
+    client = AsyncSpotifyAppClient("id", "secret", max_workers=4, client=fake)
+    songs = [Song(name=f"Song {n}", artist="Band", position=n) for n in range(10)]
+
+    tracks = asyncio.run(client.resolve_tracks(songs + songs[:2]))
+
+    assert [t["uri"] for t in tracks[:10]] == [f"spotify:track:Song {n}" for n in range(10)]
+    assert tracks[10]["uri"] == "spotify:track:Song 0" and tracks[0]["artist_image"] == "band.jpg"
+    assert client.request_counts["search"] == 10 and client.request_counts["artists"] == 1
+    assert client.token_requests == 1
+    assert fake.max_in_flight == 4
+
+
+def test_async_adaptive_concurrency_halves_on_throttling():
+    async def run():
+        limiter = AsyncAdaptiveConcurrency(max_limit=4)
+        for _ in range(4):
+            await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await limiter.release(throttled=True)
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await limiter.release()
+        await limiter.release()
+        await asyncio.wait_for(waiter, 1)
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert int(limiter.limit) == 2 and limiter.in_flight == 2
+
+
+def test_spotify_throttling_lowers_the_concurrency_limit():
+    throttles = []
+
+    def handler(method, url, params):
+        if url.endswith("/search") and len(throttles) < 3:
+            throttles.append(url)
+            return FakeResponse(429, {}, {"Retry-After": "0.01"})
+        return spotify_handler(method, url, params)
+
+    client = AsyncSpotifyAppClient("id", "secret", max_workers=8, client=FakeAsyncClient(handler))
+    songs = [Song(name=f"Song {n}", artist="Band", position=n) for n in range(5)]
+
+    tracks = asyncio.run(client.resolve_tracks(songs))
+
+    assert all(tracks)
+    assert client.concurrency.limit < 8 and client.concurrency.in_flight == 0
+
+
+def playlist_handler(fail_adds, landed_adds = ()):
+    """A playlist whose add calls fail with the statuses in ``fail_adds``, applied anyway if in ``landed_adds``."""
+    items, adds = [], []
+
+    def handler(method, url, params):
+        if url.endswith("/playlists"):
+            return FakeResponse(201, {"id": "p1", "external_urls": {"spotify": "url"}})
+        if method == "GET":
+            return FakeResponse(200, {"total": len(items)})
+        adds.append(url)
+        status = fail_adds.get(len(adds))
+        if status is None or len(adds) in landed_adds:
+            items.extend(fake.bodies[-1]["uris"])
+        return FakeResponse(status or 201, {"snapshot_id": "s"})
+
+    fake = FakeAsyncClient(handler, latency=0)
+    return fake, items, adds
+
+
+def create_playlist(fake, track_uris):
+    client = AsyncSpotifyUserClient("token", "user", client=fake)
+    client.backoff_base = 0
+    setlist = SetListInfo(id="s1", artist="Band", date="01-06-2025", venue="Venue", city="City", country="Country",
+                          url="https://setlist.fm/setlist/s1")
+    return asyncio.run(client.create_playlist(setlist, track_uris, public=False))
+
+
+def test_user_client_resends_only_chunks_that_did_not_land():
+    track_uris = [f"spotify:track:{n}" for n in range(250)]
+    fake, items, adds = playlist_handler({2: 502, 4: 500}, landed_adds={4})
+
+    result = create_playlist(fake, track_uris)
+
+    assert items == track_uris
+    assert len(adds) == 4
+    assert result.added == 250 and result.ok
+
+
+def test_event_loop_thread_runs_coroutines_from_sync_code():
+    loop = EventLoopThread()
+    try:
+        async def double(value):
+            await asyncio.sleep(0)
+            return value * 2
+
+        assert loop.run(double(4)) == 8
+    finally:
+        loop.close()
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+from spotipy.oauth2 import SpotifyOauthError
+
+from api.registry import get_registry
+from routes import auth
+
+
+class FakeOAuth:
+    def __init__(self, error = None):
+        self.error = error
+        self.refreshed = []
+
+    def refresh_access_token(self, refresh_token):
+        self.refreshed.append(refresh_token)
+        if self.error:
+            raise SpotifyOauthError(self.error)
+        return {
+            "access_token": "new-token", "refresh_token": "new-refresh", "expires_at": time.time() + 3600,
+            "scope": "playlist-modify-public", "token_type": "Bearer",
+        }
+
+
+@pytest.fixture
+def oauth(monkeypatch):
+    """Replaces Spotify's token endpoint; set ``.error`` to make refreshes fail."""
+    fake = FakeOAuth()
+    monkeypatch.setattr(auth, "_oauth", lambda: fake)
+    return fake
+
+
+def create(client):
+    # Without a setlist_id the route stops right after resolving the user's client
+    return client.post("/api/playlists/create", json={})
+
+
+def test_expired_token_is_refreshed_and_stored_in_the_session(fake_app, login, oauth):
+    app, _, _ = fake_app
+    client = app.test_client()
+    login(client, refresh_token="refresh", expires_at=time.time() + 10)
+
+    assert create(client).status_code == 400
+
+    assert oauth.refreshed == ["refresh"]
+    with client.session_transaction() as session:
+        token = session["spotify_token"]
+    assert token["access_token"] == "new-token"
+    assert token["refresh_token"] == "new-refresh"
+    assert get_registry(app).user_clients.clients.get("user").access_token == "new-token"
+
+
+def test_fresh_token_is_used_without_refreshing(fake_app, login, oauth):
+    app, _, _ = fake_app
+    client = app.test_client()
+    login(client, refresh_token="refresh", expires_at=time.time() + 3600)
+
+    assert create(client).status_code == 400
+
+    assert oauth.refreshed == []
+    assert get_registry(app).user_clients.clients.get("user").access_token == "token"
+
+
+def test_failed_refresh_logs_the_user_out(fake_app, login, oauth):
+    app, _, _ = fake_app
+    client = app.test_client()
+    login(client, refresh_token="revoked", expires_at=time.time() - 10)
+    oauth.error = "invalid_grant"
+
+    assert create(client).status_code == 401
+
+    with client.session_transaction() as session:
+        assert "spotify_token" not in session and "spotify_user" not in session
+    assert client.get("/api/auth/me").get_json() == {"authenticated": False}
+
+
+def test_session_without_profile_looks_the_user_up_once(fake_app, oauth):
+    app, _, _ = fake_app
+    client = app.test_client()
+    pool = get_registry(app).user_clients
+    built = []
+    factory = pool.client_factory
+
+    def counting_factory(*args, **kwargs):
+        built.append(factory(*args, **kwargs))
+        return built[-1]
+    pool.client_factory = counting_factory
+    with client.session_transaction() as session:
+        session["spotify_token"] = {"access_token": "token"}
+
+    assert create(client).status_code == 400
+
+    with client.session_transaction() as session:
+        assert session["spotify_user"] == {"id": "user", "name": "user"}
+    assert client.get("/api/auth/me").get_json()["user"] == {"id": "user", "name": "user"}
+    # The client that looked the user up is the one pooled
+    assert len(built) == 1
+    assert pool.clients.get("user") is built[0]
@@ -0,0 +1,155 @@
+import fnmatch
+import socketserver
+import sys
+import threading
+import time
+
+from api.cache_backends import MarshalSerializer, RedisBackend, SQLiteBackend, TieredCache
+from api.setlistfm import SetlistFMClient
+from api.track_cache import MISSING, BackendTrackCache
+from api.utils import CacheManager
+
+
+class RedisStandIn(socketserver.ThreadingTCPServer):
+    """Just enough of the RESP3 protocol for RedisBackend: HELLO, GET, SET PX, DEL, SCAN."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), RedisStandInHandler)
+
+    def command(self, args):
+        name = args[0].upper()
+        if name == b"HELLO":
+            return {b"server": b"stand-in", b"proto": int(args[1])}
+        with self.lock:
+            for key in [k for k, (_, expires) in self.data.items() if expires and expires <= time.time()]:
+                del self.data[key]
+            if name == b"GET":
+                entry = self.data.get(args[1])
+                return entry[0] if entry else None
+            if name == b"SET":
+                expires = None
+                if len(args) > 3 and args[3].upper() == b"PX":
+                    expires = time.time() + int(args[4]) / 1000
+                self.data[args[1]] = (args[2], expires)
+                return "OK"
+            if name == b"DEL":
+                return sum(1 for key in args[1:] if self.data.pop(key, None) is not None)
+            if name == b"SCAN":
+                pattern = args[args.index(b"MATCH") + 1].decode()
+                return [b"0", [k for k in self.data if fnmatch.fnmatchcase(k.decode(), pattern)]]
+            return "OK"
+
+
+class RedisStandInHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            self.wfile.write(encode(self.server.command(args)))
+
+
+def encode(value):
+    if value is None:
+        return b"_\r\n"
+    if isinstance(value, str):
+        return f"+{value}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, dict):
+        return f"%{len(value)}\r\n".encode() + b"".join(encode(k) + encode(v) for k, v in value.items())
+    if isinstance(value, list):
+        return f"*{len(value)}\r\n".encode() + b"".join(encode(item) for item in value)
+    return f"${len(value)}\r\n".encode() + value + b"\r\n"
+
+
+def redis_stand_in():
+    server = RedisStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+PAGE = {"setlist": [{"id": "63de4613", "venue": {"name": "Wembley"}, "sets": {"set": []}}], "total": 1}
+
+
+def test_sqlite_backend_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteBackend(path).set("search/artists", PAGE)
+
+    other_worker = SQLiteBackend(path)
+    assert other_worker.get("search/artists") == PAGE
+
+    other_worker.delete("search/artists")
+    assert SQLiteBackend(path).get("search/artists") is None
+
+
+def test_sqlite_backend_expires_entries(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    backend.set("key", PAGE, ttl=-1)
+    assert backend.get("key") is None
+
+
+def test_entries_are_namespaced_by_python_version(tmp_path):
+    class OtherPython(MarshalSerializer):
+        version = "m4-py399"
+
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteBackend(path).set("key", PAGE)
+
+    assert f"py{sys.version_info[0]}{sys.version_info[1]}" in MarshalSerializer.version
+    assert SQLiteBackend(path, serializer=OtherPython).get("key") is None
+
+
+def test_redis_backend_round_trip():
+    server = redis_stand_in()
+    try:
+        url = f"redis://127.0.0.1:{server.server_address[1]}/0"
+        backend = RedisBackend(url=url)
+        backend.set("setlist/63de4613", PAGE)
+
+        assert RedisBackend(url=url).get("setlist/63de4613") == PAGE
+
+        backend.set("short", PAGE, ttl=0.01)
+        time.sleep(0.02)
+        assert backend.get("short") is None
+
+        backend.clear()
+        assert backend.get("setlist/63de4613") is None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_tiered_cache_serves_repeat_hits_locally(tmp_path):
+    shared = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    shared.set("key", PAGE)
+    cache = TieredCache(shared)
+
+    first = cache.get("key")
+    shared.delete("key")
+
+    assert cache.get("key") is first
+
+
+def test_backend_track_cache_keeps_negative_entries():
+    cache = BackendTrackCache(CacheManager())
+    cache.set("song\x1fartist", None)
+
+    assert cache.get("song\x1fartist") is None
+    assert cache.get("other\x1fartist") is MISSING
+
+
+def test_setlistfm_client_accepts_a_backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    client = SetlistFMClient("key", cache=backend)
+
+    assert client.request_handler.cache is backend
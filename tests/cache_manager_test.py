@@ -0,0 +1,72 @@
+import time
+
+from api.utils import CacheManager
+
+
+def test_set_honours_per_entry_ttl():
+    cache = CacheManager(default_ttl=300)
+    cache.set("short", "value", ttl=0.01)
+    cache.set("long", "value")
+
+    time.sleep(0.02)
+
+    assert cache.get("short") is None
+    assert cache.get("long") == "value"
+    assert cache.stats()["expirations"] == 1
+
+
+def test_expired_entries_are_dropped_without_being_read():
+    cache = CacheManager(default_ttl=0.01)
+    for n in range(50):
+        cache.set(f"k{n}", n)
+
+    time.sleep(0.02)
+    cache.set("fresh", 1)
+
+    assert len(cache) == 1
+
+
+def test_least_recently_used_entry_is_evicted_at_max_entries():
+    cache = CacheManager(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_bound_evicts_until_under_budget():
+    cache = CacheManager(max_entries=None, max_bytes=1000)
+    for n in range(10):
+        cache.set(f"k{n}", "x", size=300)
+
+    stats = cache.stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= 1000
+    assert cache.get("k9") == "x"
+
+
+def test_oversized_value_is_skipped_without_evicting_others():
+    cache = CacheManager(max_entries=None, max_bytes=1000)
+    cache.set("a", "x", size=100)
+    cache.set("b", "x", size=100)
+
+    cache.set("big", "x", size=5000)
+
+    assert cache.get("a") == "x" and cache.get("b") == "x"
+    assert cache.get("big") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"], stats["oversized"]) == (2, 200, 0, 1)
+
+
+def test_hit_and_miss_counters():
+    cache = CacheManager()
+    cache.set("a", {"setlist": []})
+    cache.get("a")
+    cache.get("missing")
+
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,111 @@
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from api.exceptions import NotFoundError
+from api.cache_policy import CachePolicies, cache_entry, conditional_headers, is_fresh
+from api.utils import CacheManager, RateLimiter, RequestHandler, build_session
+
+
+def setlist(days_ago):
+    return {"id": "1", "eventDate": (date.today() - timedelta(days=days_ago)).strftime("%d-%m-%Y")}
+
+
+def test_ttls_follow_the_endpoint():
+    policies = CachePolicies(default_ttl=1, setlist_ttl=2, recent_setlist_ttl=3, latest_page_ttl=4, page_ttl=5,
+                             search_ttl=6)
+
+    assert policies.ttl("/setlist/1", payload=setlist(30)) == 2
+    assert policies.ttl("/setlist/1", payload=setlist(1)) == 3
+    assert policies.ttl("/setlist/1", payload={}) == 3
+    assert policies.ttl("/artist/x/setlists", {"p": 1}) == 4
+    assert policies.ttl("/artist/x/setlists", {"p": 3}) == 5
+    assert policies.ttl("search/artists", {"artistName": "x"}) == 6
+    assert policies.ttl("/venue/x") == 1
+
+
+def test_entries_carry_freshness_and_validators():
+    entry = cache_entry({"a": 1}, CachePolicies().policy("/artist/x/setlists"), {"ETag": '"v1"'})
+
+    assert is_fresh(entry)
+    assert conditional_headers(entry) == {"If-None-Match": '"v1"'}
+    assert conditional_headers(None) == {}
+
+
+class Upstream:
+    """Serves a versioned payload with an ETag and answers 304 while the version is unchanged."""
+
+    def __init__(self):
+        self.version = 1
+        self.conditional = []
+
+    def __call__(self, method, path, query, headers, body):
+        etag = f'"v{self.version}"'
+        self.conditional.append(headers.get("If-None-Match"))
+        if headers.get("If-None-Match") == etag:
+            return 304, b"", {"ETag": etag}
+        return 200, {"version": self.version}, {"ETag": etag}
+
+
+def make_handler(server, ttl = 0.1):
+    return RequestHandler(
+        "key", RateLimiter(max_requests=100), CacheManager(), session=build_session(), base_url=server.url,
+        cache_policies=CachePolicies(default_ttl=ttl, stale_ttl=60)
+    )
+
+
+def wait_for_refreshes(handler, count):
+    deadline = time.monotonic() + 5
+    while handler.metrics["background_refreshes"] < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_stale_entries_are_served_and_revalidated_in_the_background(stub_server):
+    upstream = Upstream()
+    server = stub_server(upstream)
+    handler = make_handler(server)
+    assert handler.make_request("/venue/x") == {"version": 1}
+
+    time.sleep(0.15)
+    assert handler.make_request("/venue/x") == {"version": 1}
+    wait_for_refreshes(handler, 1)
+
+    assert handler.metrics["stale_served"] == 1 and handler.metrics["not_modified"] == 1
+    assert upstream.conditional == [None, '"v1"']
+    # The 304 made the entry fresh again
+    assert handler.make_request("/venue/x") == {"version": 1}
+    assert server.call_count == 2
+
+
+def test_a_changed_resource_replaces_the_stale_entry(stub_server):
+    upstream = Upstream()
+    server = stub_server(upstream)
+    handler = make_handler(server)
+    handler.make_request("/venue/x")
+
+    upstream.version = 2
+    time.sleep(0.15)
+    assert handler.make_request("/venue/x") == {"version": 1}
+    wait_for_refreshes(handler, 1)
+
+    assert handler.make_request("/venue/x") == {"version": 2}
+    assert handler.metrics["not_modified"] == 0
+
+
+def test_not_found_and_empty_results_are_cached_briefly(stub_server):
+    def upstream(method, path, query, headers, body):
+        if path == "/setlist/missing":
+            return 404, {}
+        return 200, {"type": "setlists", "total": 0, "setlist": []}
+
+    server = stub_server(upstream)
+    handler = make_handler(server)
+    for _ in range(3):
+        with pytest.raises(NotFoundError):
+            handler.make_request("/setlist/missing")
+        assert handler.make_request("/artist/x/setlists", {"p": 9}) == {"type": "setlists", "total": 0, "setlist": []}
+
+    assert server.call_count == 2
+    assert handler.metrics["negative_hits"] == 4
+    assert CachePolicies().policy("/artist/x/setlists", {"p": 9}, {"total": 0}).stale_ttl == 0
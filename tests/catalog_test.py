@@ -0,0 +1,141 @@
+from api.models import Song
+from api.track_cache import TrackResolutionCache, normalize_key
+
+BAND = {"id": "band", "name": "The Band"}
+
+
+class CatalogSpotify:
+    """Spotify fake with one artist of 60 releases of two tracks each."""
+
+    def __init__(self):
+        self.releases = [
+            {"id": f"album{n}", "name": f"Album {n}", "images": [{"url": f"album{n}.jpg"}],
+             "tracks": {"items": [
+                 {"uri": f"spotify:track:{n}-{i}", "name": f"Song {2 * n + i}", "artists": [BAND]} for i in range(2)
+             ]}}
+            for n in range(60)
+        ]
+
+    def search(self, q, type = "track", limit = 10, offset = 0, market = None):
+        if type == "artist":
+            return {"artists": {"items": [BAND] if "band" in q.lower() else []}}
+        name = q.split("track:", 1)[-1].split(" artist:", 1)[0].title()
+        return {"tracks": {"items": [{
+            "uri": f"spotify:track:search-{name}",
+            "name": name,
+            "artists": [{"id": "other", "name": q.split("artist:", 1)[-1].title()}],
+            "album": {"name": "Album", "images": []},
+        }]}}
+
+    def artist_albums(self, artist_id, include_groups = None, limit = 20, offset = 0):
+        items = [{"id": r["id"]} for r in self.releases[offset:offset + limit]]
+        return {"items": items, "next": "more" if offset + limit < len(self.releases) else None}
+
+    def albums(self, albums, market = None):
+        assert len(albums) <= 20
+        return {"albums": [r for r in self.releases if r["id"] in albums]}
+
+    def artists(self, artists):
+        return {"artists": [{"id": a, "images": [{"url": f"{a}.jpg"}]} for a in artists]}
+
+
+def make_setlist():
+    songs = [Song(name=f"Song {n}", artist="The Band", position=n) for n in range(0, 40, 3)]
+    songs.append(Song(name="Cover Song", artist="The Band", cover="Someone Else", position=99))
+    return songs
+
+
+def test_setlist_resolves_from_catalog_with_paged_calls(spotify_app_client):
+    client = spotify_app_client(CatalogSpotify(), catalog_min_songs=5)
+
+    tracks = client.resolve_tracks(make_setlist())
+
+    assert tracks[0]["uri"] == "spotify:track:0-0"
+    assert tracks[1]["uri"] == "spotify:track:1-1"
+    assert tracks[1]["album"] == "Album 1" and tracks[1]["album_image"] == "album1.jpg"
+    assert tracks[0]["artist_image"] == "band.jpg"
+    # Covers are not in the artist's catalog and fall back to search
+    assert tracks[-1]["uri"] == "spotify:track:search-Cover Song"
+    # One artist search plus one track search, two album pages, three album batches
+    assert client.request_counts["search"] == 2
+    assert client.request_counts["artist_albums"] == 2
+    assert client.request_counts["albums"] == 3
+    assert client.resolve_stats["catalog_hits"] == 14
+    assert client.resolve_stats["songs"] == 15
+
+
+def test_catalog_is_cached_by_artist_and_fills_the_track_cache(spotify_app_client):
+    cache = TrackResolutionCache()
+    client = spotify_app_client(CatalogSpotify(), cache, catalog_min_songs=5)
+    client.resolve_tracks(make_setlist())
+
+    other = [Song(name=f"Song {n}", artist="The Band", position=n) for n in range(1, 40, 3)]
+    client.resolve_tracks(other)
+    assert client.request_counts["artist_albums"] == 2
+    assert client.request_counts["search"] == 2
+
+    assert cache.get(normalize_key("Song 3", "The Band"))["uri"] == "spotify:track:1-1"
+
+
+def test_small_or_unknown_artist_setlists_just_search(spotify_app_client):
+    client = spotify_app_client(CatalogSpotify(), catalog_min_songs=5)
+
+    client.resolve_tracks([Song(name=f"Song {n}", artist="The Band", position=n) for n in range(3)])
+    assert client.request_counts["artist_albums"] == 0
+    assert client.request_counts["search"] == 3
+
+    results = dict(client.iter_resolve_tracks(
+        [Song(name=f"Song {n}", artist="Nobody", position=n) for n in range(6)]
+    ))
+    assert len(results) == 6
+    assert client.request_counts["artist_albums"] == 0
+    assert client.request_counts["search"] == 3 + 1 + 6
+
+
+class DeluxeSpotify(CatalogSpotify):
+    """Adds a 120-track compilation; ``albums`` nests only its first 50 tracks."""
+
+    def __init__(self):
+        super().__init__()
+        self.deluxe = [{"uri": f"spotify:track:deluxe-{i}", "name": f"Deluxe {i}", "artists": [BAND]} for i in range(120)]
+        self.releases.append({"id": "deluxe", "name": "Deluxe", "images": [],
+                              "tracks": {"items": self.deluxe[:50], "next": "more"}})
+
+    def album_tracks(self, album_id, limit = 50, offset = 0, market = None):
+        items = self.deluxe[offset:offset + limit]
+        return {"items": items, "next": "more" if offset + limit < len(self.deluxe) else None}
+
+
+def test_long_albums_are_paged_past_the_nested_tracks(spotify_app_client):
+    client = spotify_app_client(DeluxeSpotify(), catalog_min_songs=5)
+    songs = [Song(name=f"Deluxe {n}", artist="The Band", position=n) for n in (10, 60, 119, 75, 100)]
+
+    tracks = client.resolve_tracks(songs)
+
+    assert [t["uri"] for t in tracks] == [f"spotify:track:deluxe-{n}" for n in (10, 60, 119, 75, 100)]
+    assert client.request_counts["album_tracks"] == 2
+    assert client.request_counts["search"] == 1
+
+
+def test_catalog_size_is_capped(spotify_app_client):
+    client = spotify_app_client(DeluxeSpotify(), catalog_min_songs=5)
+    client.catalog.max_tracks = 30
+
+    tracks = client.catalog.tracks("band")
+
+    assert sum(len(group) for group in tracks.values()) == 30
+    assert client.request_counts["albums"] == 1
+    assert client.catalog.catalogs.get("band") is tracks
+
+
+def test_each_unresolved_song_is_one_track_cache_miss(spotify_app_client):
+    cache = TrackResolutionCache()
+    client = spotify_app_client(CatalogSpotify(), cache, catalog_min_songs=5)
+    songs = make_setlist()
+
+    client.resolve_tracks(songs)
+    assert cache.misses == len(songs)
+
+    dict(client.iter_resolve_tracks(songs + [Song(name="New Song", artist="Nobody", position=100)]))
+    assert cache.misses == len(songs) + 1
+    assert cache.hits == len(songs)
@@ -0,0 +1,346 @@
+import json
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from spotipy.exceptions import SpotifyException
+
+from api.models import Song
+from api.registry import get_registry
+from api.setlistfm import SetlistFMClient
+from api.spotify import PlaylistWriter, SpotifyAppClient, SpotifyUserClient
+from app import create_app
+from routes import playlists, setlists
+
+MBID = "b10bbbfc-cf9e-42e0-be17-e2c3e1d2600d"
+
+VENUES = ["Madison Square Garden", "The Forum", "Red Rocks Amphitheatre", "O2 Arena", "Wembley Stadium"]
+CITIES = [("New York", "United States"), ("Inglewood", "United States"), ("Morrison", "United States"),
+          ("London", "United Kingdom"), ("London", "United Kingdom")]
+TOURS = ["World Tour", "Summer Tour", None]
+
+
+def _setlist(mbid, index, artist_name = "Stub Artist", newest = date(2025, 6, 1), songs = 0):
+    """setlist.fm setlist JSON; one show every 3 days going back from ``newest``."""
+    event_date = newest - timedelta(days=3 * index)
+    venue_idx = index % len(VENUES)
+    city, country = CITIES[venue_idx]
+    tour = TOURS[index % len(TOURS)]
+    setlist = {
+        "id": f"{mbid[:6]}{index:06d}",
+        "eventDate": event_date.strftime("%d-%m-%Y"),
+        "artist": {"mbid": mbid, "name": artist_name},
+        "venue": {
+            "id": f"v{venue_idx}",
+            "name": VENUES[venue_idx],
+            "city": {"name": city, "country": {"name": country}},
+        },
+        "url": f"https://www.setlist.fm/setlist/{index}",
+    }
+    if tour:
+        setlist["tour"] = {"name": f"{tour} {event_date.year}"}
+    if songs:
+        setlist["sets"] = {"set": [{"song": [{"name": f"Song {n}"} for n in range(1, songs + 1)]}]}
+    return setlist
+
+
+def _setlist_page(mbid, page, per_page = 20, total = 400, artist_name = "Stub Artist"):
+    start = (page - 1) * per_page
+    return {
+        "type": "setlists",
+        "itemsPerPage": per_page,
+        "page": page,
+        "total": total,
+        "setlist": [_setlist(mbid, i, artist_name) for i in range(start, min(start + per_page, total))],
+    }
+
+
+class FakeSetlistAPI:
+    """Stands in for ``RequestHandler``: an artist with ``total`` setlists, newest first.
+
+    Records the requested pages, can publish new setlists at the top and
+    counts how many requests were in flight at once.
+    """
+
+    def __init__(self, total = 400, latency = 0.0):
+        self.setlists = [_setlist(MBID, n) for n in range(total)]
+        self.latency = latency
+        self.published = 0
+        self.calls = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def pages(self):
+        return [page for endpoint, page in self.calls if endpoint != "search/artists"]
+
+    def ids(self):
+        return {s["id"] for s in self.setlists}
+
+    def publish(self):
+        self.published += 1
+        self.setlists.insert(0, _setlist(MBID, -self.published))
+
+    def make_request(self, endpoint, params = None):
+        with self.lock:
+            self.calls.append((endpoint, params.get("p")))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if endpoint == "search/artists":
+                return {"artist": [{"name": "Radiohead", "mbid": MBID}]}
+            page = params["p"]
+            return {
+                "type": "setlists",
+                "itemsPerPage": 20,
+                "page": page,
+                "total": len(self.setlists),
+                "setlist": self.setlists[(page - 1) * 20:page * 20],
+            }
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def mbid():
+    return MBID
+
+
+@pytest.fixture
+def make_setlist():
+    return _setlist
+
+
+@pytest.fixture
+def make_setlist_page():
+    return _setlist_page
+
+
+@pytest.fixture
+def setlist_client():
+    """Factory for a ``SetlistFMClient`` whose request handler is a ``FakeSetlistAPI``."""
+    def make(total = 400, latency = 0.0):
+        client = SetlistFMClient("key")
+        client.request_handler = FakeSetlistAPI(total, latency)
+        return client
+    return make
+
+
+class StubServer:
+    """Local HTTP server answering from ``handler(method, path, query, headers, body)``.
+
+    The handler returns ``(status, payload)`` or ``(status, payload, headers)``.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._request_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def call_count(self):
+        return len(self.calls)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _request_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                stub.calls.append(("GET", parsed.path, query))
+
+                result = stub.handler("GET", parsed.path, query, self.headers, body)
+                status, payload = result[0], result[1]
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (result[2] if len(result) > 2 else {}).items():
+                    self.send_header(name, str(value))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def stub_server():
+    """Factory starting a ``StubServer`` per handler; all are shut down after the test."""
+    servers = []
+
+    def start(handler):
+        server = StubServer(handler)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+class FakeSpotify:
+    """Spotify search that finds every song; artists have one image each."""
+
+    def __init__(self, artists_per_song = 1):
+        self.artists_per_song = artists_per_song
+
+    def search(self, q, type, limit):
+        name = q.split("track:", 1)[1].split(" artist:", 1)[0].title()
+        artist_id = f"artist{hash(name) % self.artists_per_song}"
+        return {"tracks": {"items": [{
+            "uri": f"spotify:track:{name}",
+            "name": name,
+            "artists": [{"id": artist_id, "name": "Band"}],
+            "album": {"name": "Album", "images": [{"url": "album.jpg"}]},
+        }]}}
+
+    def artists(self, artists):
+        return {"artists": [{"id": a, "images": [{"url": f"{a}.jpg"}]} for a in artists]}
+
+
+@pytest.fixture
+def spotify_app_client():
+    """Factory for a ``SpotifyAppClient`` calling ``fake`` (a ``FakeSpotify`` by default).
+
+    The artist catalog is off unless ``catalog_min_songs`` is given, so
+    every song is searched.
+    """
+    def make(fake = None, track_cache = None, catalog_min_songs = None):
+        client = SpotifyAppClient(
+            "id", "secret", max_workers=4, track_cache=track_cache, catalog_min_songs=catalog_min_songs
+        )
+        client.sp = fake or FakeSpotify()
+        return client
+    return make
+
+
+class FakePlaylistSpotify:
+    """Playlist endpoints over an in-memory track list."""
+
+    def __init__(self, items = None, fail_adds = None, landed_adds = ()):
+        self.items = list(items or [])
+        self.calls = []
+        # Map of add-call number -> HTTP status to fail that call with (None: no response)
+        self.fail_adds = dict(fail_adds or {})
+        # Failed add calls whose tracks were added anyway
+        self.landed_adds = set(landed_adds)
+        self.adds = 0
+
+    def playlist_add_items(self, playlist_id, items, position = None):
+        self.adds += 1
+        self.calls.append(("add", len(items)))
+        assert len(items) <= 100
+        failed = self.adds in self.fail_adds
+        status = self.fail_adds.pop(self.adds, None)
+        if failed and self.adds not in self.landed_adds:
+            raise SpotifyException(status, -1, "failed", headers={"Retry-After": "0"})
+        self.items.extend(items)
+        if failed:
+            raise SpotifyException(status, -1, "failed")
+
+    def playlist_items(self, playlist_id, fields = None, limit = 100, offset = 0):
+        self.calls.append(("items", offset))
+        page = self.items[offset:offset + limit]
+        has_next = offset + limit < len(self.items)
+        return {
+            "items": [{"track": {"uri": uri}} for uri in page],
+            "next": "more" if has_next else None,
+            "total": len(self.items),
+        }
+
+    def playlist_replace_items(self, playlist_id, items):
+        self.calls.append(("replace", len(items)))
+        self.items = list(items)
+
+    def playlist_remove_all_occurrences_of_items(self, playlist_id, items, snapshot_id = None):
+        self.calls.append(("remove", len(items)))
+        self.items = [uri for uri in self.items if uri not in items]
+
+
+@pytest.fixture
+def playlist_spotify():
+    return FakePlaylistSpotify
+
+
+class FakeUserSpotify(FakePlaylistSpotify):
+    def me(self):
+        return {"id": "user"}
+
+    def user_playlist_create(self, user, name, public, description):
+        return {"id": "p1", "external_urls": {"spotify": "https://open.spotify.com/playlist/p1"}}
+
+
+class FakeUserClient(SpotifyUserClient):
+    def __init__(self, access_token, user_id = None):
+        self.access_token = access_token
+        self.sp = FakeUserSpotify()
+        self.user_id = user_id or self.sp.me()["id"]
+        self.writer = PlaylistWriter(self.sp)
+
+
+class FakeSetlistFM:
+    """Every setlist has the same five songs."""
+
+    def __init__(self):
+        self.fetches = 0
+
+    def get_setlist_songs(self, setlist_id):
+        self.fetches += 1
+        return [Song(name=f"Song {n}", artist="Band", position=n + 1) for n in range(5)]
+
+
+@pytest.fixture
+def fake_app(monkeypatch, spotify_app_client):
+    """The app with fake setlist.fm, Spotify app and per-user Spotify clients.
+
+    Returns ``(app, setlistfm, spotify)``; a user's client is in
+    ``get_registry(app).user_clients``.
+    """
+    app = create_app()
+    app.config["TESTING"] = True
+    registry = get_registry(app)
+    setlistfm = registry._setlistfm = FakeSetlistFM()
+    spotify = spotify_app_client()
+    monkeypatch.setattr(setlists, "get_spotify_app_client", lambda: spotify)
+    monkeypatch.setattr(playlists, "get_spotify_app_client", lambda: spotify)
+    registry.user_clients.client_factory = FakeUserClient
+    return app, setlistfm, spotify
+
+
+def log_in(client, user_id = "user", **token):
+    """Put a Spotify token and profile in the test client's session."""
+    with client.session_transaction() as session:
+        session["spotify_token"] = {"access_token": "token", **token}
+        session["spotify_user"] = {"id": user_id, "name": user_id}
+
+
+@pytest.fixture
+def login():
+    return log_in
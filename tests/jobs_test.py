@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from api.exceptions import APIError
+from api.jobs import FAILED, SUCCEEDED, JobManager, JobQueueFullError
+
+
+def wait(job):
+    for _ in range(200):
+        if job.finished:
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_same_key_returns_the_same_job():
+    jobs = JobManager(max_workers=2)
+    release = threading.Event()
+    runs = []
+
+    def work(job):
+        runs.append(job.id)
+        release.wait(1)
+        job.progress(3, 3)
+        return "done"
+
+    first = jobs.submit("user:setlist", work)
+    second = jobs.submit("user:setlist", work)
+    release.set()
+    wait(first)
+    third = jobs.submit("user:setlist", work)
+
+    assert first is second is third
+    assert len(runs) == 1
+    assert first.to_dict()["state"] == SUCCEEDED
+    assert first.to_dict()["result"] == "done"
+    assert (first.resolved, first.total) == (3, 3)
+
+
+def test_failed_job_can_be_resubmitted():
+    jobs = JobManager(max_workers=1)
+
+    def fail(job):
+        raise APIError("No songs selected")
+
+    failed = wait(jobs.submit("key", fail))
+    retried = wait(jobs.submit("key", lambda job: "ok"))
+
+    assert failed.state == FAILED and failed.error == "No songs selected"
+    assert retried is not failed and retried.result == "ok"
+    assert jobs.get(failed.id) is failed
+
+
+def test_unexpected_errors_are_not_leaked():
+    jobs = JobManager(max_workers=1)
+
+    def crash(job):
+        raise KeyError("secret")
+
+    assert wait(jobs.submit("key", crash)).error == "Internal server error"
+
+
+def test_pending_jobs_are_bounded():
+    jobs = JobManager(max_workers=1, max_pending=2)
+    release = threading.Event()
+    jobs.submit("a", lambda job: release.wait(1))
+    jobs.submit("b", lambda job: release.wait(1))
+
+    with pytest.raises(JobQueueFullError):
+        jobs.submit("c", lambda job: None)
+    release.set()
@@ -0,0 +1,56 @@
+from api.matching import TrackMatcher, normalize_artist, normalize_title, query_cascade, score
+
+
+def track(name, artist, album = "Album", uri = None):
+    return {"uri": uri or f"spotify:track:{name}", "name": name, "artists": [{"id": artist, "name": artist}],
+            "album": {"name": album, "images": []}}
+
+
+def test_normalize_title_strips_versions_featuring_punctuation_and_diacritics():
+    assert normalize_title("Wonderwall (Live)") == "wonderwall"
+    assert normalize_title("Hotel California - 2013 Remaster") == "hotel california"
+    assert normalize_title("Umbrella ft. JAY Z") == "umbrella"
+    assert normalize_title("Don't Look Back in Anger") == "dont look back in anger"
+    assert normalize_title("Hoppípolla") == "hoppipolla"
+    assert normalize_title("Rock & Roll All Nite") == "rock and roll all nite"
+    assert normalize_title("Stay With Me") == "stay with me"
+    assert normalize_artist("The Killers") == "killers"
+
+
+def test_score_prefers_studio_recording_by_the_right_artist():
+    studio = score(track("Creep", "Radiohead"), "Creep", "Radiohead")
+    live = score(track("Creep - Live", "Radiohead"), "Creep", "Radiohead")
+    karaoke = score(track("Creep (Karaoke Version)", "Tribute Band", "Karaoke Hits"), "Creep", "Radiohead")
+    other_artist = score(track("Creep", "Stone Temple Pilots"), "Creep", "Radiohead")
+
+    assert studio == 1.0
+    assert studio > live > karaoke
+    assert other_artist < 0.65
+
+
+def test_cascade_starts_precise_and_ends_wide():
+    queries = query_cascade("Brighton Rock / Killer Queen", "Queen")
+
+    assert queries[0] == ("track:brighton rock killer queen artist:queen", 10)
+    assert ("track:brighton rock artist:queen", 10) in queries
+    assert queries[-1] == ("artist:queen", 50)
+
+
+def test_matcher_stops_at_first_confident_match():
+    queries = []
+
+    def search(query, limit):
+        queries.append(query)
+        return [track("Creep (Karaoke Version)", "Tribute"), track("Creep", "Radiohead", uri="spotify:track:right")]
+
+    found, found_score, calls = TrackMatcher(search).match("Creep (Live)", "Radiohead")
+
+    assert found["uri"] == "spotify:track:right"
+    assert calls == 1 and len(queries) == 1
+
+
+def test_matcher_falls_through_cascade_and_rejects_weak_candidates():
+    found, _, calls = TrackMatcher(lambda query, limit: [track("Jam", "Michael Jackson")]).match("Jam", "Pearl Jam")
+
+    assert found is None
+    assert calls == len(query_cascade("Jam", "Pearl Jam"))
@@ -0,0 +1,45 @@
+import json
+from datetime import date
+
+import pytest
+
+from api.models import SetListInfo, Song, to_dicts
+from api.serialization import dumps
+
+
+def make_setlist(event_date = "05-06-2025"):
+    return SetListInfo("s1", "Band", event_date, "Arena", "London", "United Kingdom", tour="Tour")
+
+
+def test_event_date_is_parsed_once_into_an_ordinal():
+    setlist = make_setlist()
+
+    assert setlist.date_ordinal == date(2025, 6, 5).toordinal()
+    assert setlist.event_date == date(2025, 6, 5)
+    assert setlist.formatted_date.year == 2025
+    assert make_setlist("2025-06-05").event_date is None
+    assert make_setlist("").formatted_date is None
+    assert make_setlist() == make_setlist()
+
+
+def test_models_are_slotted():
+    with pytest.raises(AttributeError):
+        make_setlist().extra = 1
+    with pytest.raises(AttributeError):
+        Song(name="Song", artist="Band").extra = 1
+
+
+def test_to_dicts_matches_route_shape():
+    setlist, = to_dicts([make_setlist()])
+    assert setlist["display_title"] == "Band - Arena, London (05-06-2025)"
+    assert set(setlist) == {"id", "artist", "date", "venue", "city", "country", "tour", "url", "display_title"}
+
+    song = Song(name="Song", artist="Band", cover="Other", encore=1).to_dict()
+    assert song["original_artist"] == "Other" and song["is_cover"] and song["is_encore"]
+
+
+def test_dumps_is_compact_utf8_json():
+    payload = {"venue": "Estadio Azteca", "city": "Ciudad de México", "songs": [1, None]}
+
+    assert json.loads(dumps(payload)) == payload
+    assert b" " not in dumps([1, 2])
@@ -0,0 +1,50 @@
+import time
+
+from api.registry import get_registry
+
+
+def user_client(app):
+    return get_registry(app).user_clients.clients.get("user")
+
+
+def create(client, body):
+    job = client.post("/api/playlists/create", json=body).get_json()["data"]
+    for _ in range(200):
+        if job["state"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.01)
+        job = client.get(job["status_url"]).get_json()["data"]
+    raise AssertionError("job did not finish")
+
+
+def test_resolution_id_skips_setlist_fetch_and_searches(fake_app, login):
+    app, setlistfm, spotify = fake_app
+    client = app.test_client()
+    login(client)
+    details = client.get("/api/setlists/abc").get_json()["data"]
+    searches = spotify.request_counts["search"]
+
+    job = create(client, {
+        "setlist_id": "abc",
+        "resolution_id": details["resolution_id"],
+        "selected": [{"set_number": 1, "position": 2}, {"set_number": 1, "position": 4}],
+    })
+
+    assert job["state"] == "succeeded"
+    assert user_client(app).sp.items == ["spotify:track:Song 1", "spotify:track:Song 3"]
+    assert setlistfm.fetches == 1
+    assert spotify.request_counts["search"] == searches
+
+
+def test_unknown_resolution_falls_back_to_searching(fake_app, login):
+    app, setlistfm, spotify = fake_app
+    client = app.test_client()
+    login(client)
+
+    job = create(client, {"setlist_id": "abc", "resolution_id": "expired"})
+
+    assert job["state"] == "succeeded"
+    assert job["result"]["songs_count"] == 5
+    assert len(user_client(app).sp.items) == 5
+    assert setlistfm.fetches == 1
+    assert spotify.request_counts["search"] == 5
@@ -0,0 +1,59 @@
+import time
+
+from api.registry import get_registry
+
+
+def finished_job(app, owner):
+    job = get_registry(app).jobs.submit(f"{owner}:abc", lambda job: {"playlist_url": "url"}, owner=owner)
+    for _ in range(200):
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_owner_sees_job_progress_and_result(fake_app, login):
+    app, _, _ = fake_app
+    client = app.test_client()
+    login(client, "alice")
+    job = finished_job(app, "alice")
+
+    response = client.get(f"/api/playlists/jobs/{job.id}")
+
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert data["state"] == "succeeded"
+    assert data["result"] == {"playlist_url": "url"}
+    assert data["status_url"] == f"/api/playlists/jobs/{job.id}"
+
+
+def test_unknown_job_id_is_not_found(fake_app, login):
+    app, _, _ = fake_app
+    client = app.test_client()
+    login(client, "alice")
+
+    response = client.get("/api/playlists/jobs/does-not-exist")
+
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "Job not found"}
+
+
+def test_another_users_job_is_not_found(fake_app, login):
+    app, _, _ = fake_app
+    client = app.test_client()
+    login(client, "mallory")
+    job = finished_job(app, "alice")
+
+    response = client.get(f"/api/playlists/jobs/{job.id}")
+
+    assert response.status_code == 404
+    assert "result" not in response.get_json()
+
+
+def test_job_status_requires_login(fake_app):
+    app, _, _ = fake_app
+    job = finished_job(app, "alice")
+
+    response = app.test_client().get(f"/api/playlists/jobs/{job.id}")
+
+    assert response.status_code == 401
@@ -0,0 +1,122 @@
+from api.spotify import PlaylistWriter
+
+
+def uris(count, prefix = "t"):
+    return [f"spotify:track:{prefix}{n}" for n in range(count)]
+
+
+def test_adds_in_order_in_chunks_of_100(playlist_spotify):
+    sp = playlist_spotify()
+
+    result = PlaylistWriter(sp).add("p", uris(250))
+
+    assert sp.items == uris(250)
+    assert [c for c in sp.calls] == [("add", 100), ("add", 100), ("add", 50)]
+    assert result.added == 250 and result.ok
+
+
+def test_throttled_chunk_is_retried_on_its_own(playlist_spotify):
+    sp = playlist_spotify(fail_adds={2: 429})
+
+    result = PlaylistWriter(sp).add("p", uris(250))
+
+    assert sp.items == uris(250)
+    assert sp.adds == 4
+    assert result.ok
+
+
+def test_failed_chunks_are_reported_and_the_rest_still_added(playlist_spotify):
+    sp = playlist_spotify(fail_adds={2: 502})
+
+    result = PlaylistWriter(sp, max_retries=0).add("p", uris(250))
+
+    assert result.added == 150
+    assert result.failed_chunks == [{"start": 100, "count": 100, "error": "failed"}]
+    assert not result.ok
+
+
+def test_server_error_resends_a_chunk_that_did_not_land(playlist_spotify):
+    sp = playlist_spotify(fail_adds={2: 502})
+
+    result = PlaylistWriter(sp, backoff_base=0).add("p", uris(250))
+
+    assert sp.items == uris(250)
+    assert sp.calls == [("add", 100), ("add", 100), ("items", 0), ("add", 100), ("add", 50)]
+    assert result.added == 250 and result.ok
+
+
+def test_server_error_after_the_chunk_landed_is_not_resent(playlist_spotify):
+    sp = playlist_spotify(fail_adds={2: 500}, landed_adds={2})
+
+    result = PlaylistWriter(sp, backoff_base=0).add("p", uris(250))
+
+    assert sp.items == uris(250)
+    assert sp.adds == 3
+    assert result.added == 250 and result.ok
+
+
+def test_server_error_is_not_retried_when_the_playlist_changed(playlist_spotify):
+    sp = playlist_spotify(fail_adds={1: 503})
+    sp.items.append("spotify:track:other")
+
+    result = PlaylistWriter(sp, backoff_base=0).add("p", uris(10))
+
+    assert sp.adds == 1
+    assert result.failed_chunks == [{"start": 0, "count": 10, "error": "failed"}]
+
+
+def test_client_errors_are_not_retried(playlist_spotify):
+    sp = playlist_spotify(fail_adds={1: 403})
+
+    result = PlaylistWriter(sp).add("p", uris(10))
+
+    assert sp.adds == 1
+    assert result.failed_chunks[0]["start"] == 0
+
+
+def test_sync_appends_only_missing_tail(playlist_spotify):
+    sp = playlist_spotify(items=uris(150))
+
+    result = PlaylistWriter(sp).sync("p", uris(180))
+
+    assert sp.items == uris(180)
+    assert ("replace", 100) not in sp.calls
+    assert (result.added, result.removed) == (30, 0)
+
+
+def test_sync_removes_unwanted_tracks_when_order_survives(playlist_spotify):
+    sp = playlist_spotify(items=uris(5) + uris(3, prefix="old"))
+
+    result = PlaylistWriter(sp).sync("p", uris(7))
+
+    assert sp.items == uris(7)
+    assert (result.added, result.removed) == (2, 3)
+
+
+def test_sync_rewrites_reordered_playlist_in_place(playlist_spotify):
+    sp = playlist_spotify(items=list(reversed(uris(120))))
+
+    result = PlaylistWriter(sp).sync("p", uris(150))
+
+    assert sp.items == uris(150)
+    assert sp.calls[-2:] == [("replace", 100), ("add", 50)]
+    assert (result.added, result.removed) == (150, 120)
+
+
+def test_failure_without_a_status_checks_whether_the_chunk_landed(playlist_spotify):
+    sp = playlist_spotify(fail_adds={1: None}, landed_adds={1})
+
+    result = PlaylistWriter(sp, backoff_base=0).add("p", uris(10))
+
+    assert sp.items == uris(10) and sp.adds == 1
+    assert result.ok
+
+
+def test_sync_rewrites_playlist_holding_items_without_uri(playlist_spotify):
+    sp = playlist_spotify(items=uris(3) + [None] + uris(2, prefix="old"))
+
+    result = PlaylistWriter(sp, backoff_base=0).sync("p", uris(5))
+
+    assert sp.items == uris(5)
+    assert ("replace", 5) in sp.calls
+    assert (result.added, result.removed) == (5, 6)
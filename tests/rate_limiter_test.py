@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import time
+
+from api.utils import RateLimiter
+
+
+def test_burst_then_try_acquire_fails_without_waiting():
+    limiter = RateLimiter(max_requests=2, time_window=1)
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+
+    start = time.monotonic()
+    assert not limiter.try_acquire(timeout=0.1)
+    assert time.monotonic() - start < 0.05
+
+
+def test_try_acquire_waits_up_to_its_deadline():
+    limiter = RateLimiter(max_requests=10, time_window=1)
+    for _ in range(10):
+        limiter.acquire()
+
+    start = time.monotonic()
+    assert limiter.try_acquire(timeout=0.5)
+    assert 0.05 <= time.monotonic() - start < 0.3
+
+
+def test_waiting_threads_do_not_hold_the_lock():
+    limiter = RateLimiter(max_requests=1, time_window=1)
+    limiter.acquire()
+    sleeper = threading.Thread(target=limiter.acquire)
+    sleeper.start()
+    time.sleep(0.05)
+
+    start = time.monotonic()
+    assert not limiter.try_acquire(timeout=0)
+    assert time.monotonic() - start < 0.05
+    sleeper.join()
+
+
+def test_async_acquire_respects_rate():
+    limiter = RateLimiter(max_requests=20, time_window=1)
+
+    async def run():
+        await asyncio.gather(*(limiter.acquire_async() for _ in range(24)))
+
+    start = time.monotonic()
+    asyncio.run(run())
+    assert time.monotonic() - start >= 0.15
+
+
+def test_file_bucket_shares_budget_between_limiters(tmp_path):
+    path = str(tmp_path / "bucket")
+    first = RateLimiter(max_requests=3, shared_path=path)
+    second = RateLimiter(max_requests=3, shared_path=path)
+
+    assert first.try_acquire()
+    assert second.try_acquire()
+    assert first.try_acquire()
+    assert not second.try_acquire()
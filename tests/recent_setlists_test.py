@@ -0,0 +1,46 @@
+from datetime import date
+
+from api.setlist_index import SetlistIndex
+
+# Window reaching back to the start of 2025; fixture setlists end on 2025-06-01
+DAYS_2025 = (date.today() - date(2025, 1, 1)).days
+
+
+def test_returns_exactly_limit_from_one_page(setlist_client, mbid):
+    client = setlist_client()
+
+    results = client.get_recent_setlists("Radiohead", days=DAYS_2025, limit=5)
+
+    assert len(results) == 5
+    assert client.request_handler.calls == [("search/artists", 1), (f"/artist/{mbid}/setlists", 1)]
+
+
+def test_stops_paging_at_days_window(setlist_client, mbid):
+    client = setlist_client()
+
+    results = client.get_recent_setlists(artist_mbid=mbid, days=DAYS_2025, limit=1000)
+
+    assert results and all(s.formatted_date.year == 2025 for s in results)
+    assert len(client.request_handler.calls) == len(results) // 20 + 1
+
+
+def test_artist_name_resolution_is_cached(setlist_client, mbid):
+    client = setlist_client()
+
+    client.resolve_artist_mbid("Radiohead")
+    assert client.resolve_artist_mbid(" radiohead ") == mbid
+    assert [c for c in client.request_handler.calls if c[0] == "search/artists"] == [("search/artists", 1)]
+
+
+def test_fresh_index_serves_recent_without_upstream_calls(setlist_client, mbid):
+    client = setlist_client()
+    index = SetlistIndex()
+
+    first = index.recent(client, mbid, days=DAYS_2025, limit=10)
+    calls = len(client.request_handler.calls)
+    second = index.recent(client, mbid, days=DAYS_2025, limit=10)
+
+    assert calls == 1
+    assert len(client.request_handler.calls) == calls
+    assert [s.id for s in first] == [s.id for s in second]
+    assert len(first) == 10
@@ -0,0 +1,112 @@
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from api.exceptions import APIError, RateLimitError
+from api.utils import (
+    AIMDRateController, CacheManager, RateLimiter, RequestHandler, build_session, parse_retry_after
+)
+
+OK = (200, {"setlist": []})
+
+
+class Script:
+    """Replies with the scripted (status, payload[, headers]) tuples in order."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    def __call__(self, method, path, query, headers, body):
+        return self.responses.pop(0) if self.responses else OK
+
+
+def make_handler(server, **kwargs):
+    kwargs.setdefault("backoff_base", 0.01)
+    return RequestHandler(
+        "key", RateLimiter(max_requests=10), CacheManager(),
+        session=build_session(), base_url=server.url, **kwargs
+    )
+
+
+def test_retry_after_is_honoured_on_429(stub_server):
+    server = stub_server(Script((429, {}, {"Retry-After": "0.3"}), OK))
+    handler = make_handler(server)
+    start = time.monotonic()
+
+    assert handler.make_request("/artist/x/setlists") == {"setlist": []}
+
+    assert time.monotonic() - start >= 0.3
+    assert server.call_count == 2
+    assert handler.metrics["throttled"] == 1
+    assert handler.metrics["retries"] == 1
+
+
+def test_server_errors_back_off_and_retry(stub_server):
+    server = stub_server(Script((503, {}), (502, {}), OK))
+    handler = make_handler(server)
+
+    assert handler.make_request("/setlist/1") == {"setlist": []}
+    assert handler.metrics["server_errors"] == 2
+    assert handler.metrics["retries"] == 2
+
+
+def test_invalid_json_is_retried_and_raised_as_api_error(stub_server):
+    server = stub_server(Script((200, b'{"setlist": ['), OK))
+    handler = make_handler(server)
+    assert handler.make_request("/setlist/1") == {"setlist": []}
+    assert handler.metrics["invalid_responses"] == 1 and handler.metrics["retries"] == 1
+
+    server = stub_server(Script(*[(200, b"<html>Bad gateway</html>")] * 3))
+    with pytest.raises(APIError):
+        make_handler(server).make_request("/setlist/1")
+
+
+def test_gives_up_after_max_retries(stub_server):
+    server = stub_server(Script((500, {}), (500, {}), (500, {})))
+    handler = make_handler(server)
+
+    with pytest.raises(APIError):
+        handler.make_request("/setlist/1")
+    assert server.call_count == 3
+
+
+def test_retry_after_beyond_deadline_fails_fast(stub_server):
+    server = stub_server(Script((429, {}, {"Retry-After": "120"})))
+    handler = make_handler(server, retry_deadline=1.0)
+    start = time.monotonic()
+
+    with pytest.raises(RateLimitError):
+        handler.make_request("/setlist/1")
+    assert time.monotonic() - start < 0.5
+
+
+def test_client_errors_are_not_retried(stub_server):
+    server = stub_server(Script((400, {})))
+    handler = make_handler(server)
+
+    with pytest.raises(APIError):
+        handler.make_request("/search/artists", {"artistName": ""})
+    assert server.call_count == 1
+
+
+def test_throttling_lowers_rate_and_success_recovers_it():
+    limiter = RateLimiter(max_requests=2)
+    controller = AIMDRateController(limiter, increase=0.5)
+
+    controller.on_throttle()
+    controller.on_throttle()
+    assert limiter.rate == 1.0
+
+    controller.on_success()
+    controller.on_success()
+    controller.on_success()
+    assert limiter.rate == 2.0
+
+
+def test_parse_retry_after_accepts_http_dates():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 <= parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("soon") is None
@@ -0,0 +1,132 @@
+import time
+
+from api.setlist_index import SetlistIndex
+
+
+def test_backfills_until_complete_then_answers_locally(setlist_client, mbid):
+    client = setlist_client(total=100)
+    index = SetlistIndex(backfill_pages=3)
+
+    index.browse(client, mbid)
+    assert sorted(client.request_handler.pages) == [1, 2, 3]
+    index.browse(client, mbid)
+    assert sorted(client.request_handler.pages) == [1, 2, 3, 4, 5]
+    assert index.sync_state(mbid)["complete"]
+
+    results = index.browse(client, mbid, venue="forum")
+    assert len(client.request_handler.pages) == 5
+    assert len(results) == 20
+    assert all("Forum" in s.venue for s in results)
+
+
+def test_year_filter_only_backfills_as_far_as_needed(setlist_client, mbid):
+    client = setlist_client(total=400)
+    index = SetlistIndex(backfill_pages=20)
+
+    results = index.browse(client, mbid, year="2025")
+
+    assert results and all(s.formatted_date.year == 2025 for s in results)
+    assert len(client.request_handler.pages) < 20
+    assert not index.sync_state(mbid)["complete"]
+
+
+def test_stale_index_refreshes_only_newest_page(setlist_client, mbid):
+    client = setlist_client(total=60)
+    index = SetlistIndex(stale_after=0.01)
+    index.sync(client, mbid)
+    client.request_handler.calls.clear()
+
+    time.sleep(0.02)
+    index.browse(client, mbid)
+
+    assert client.request_handler.pages == [1]
+
+
+def test_prefix_and_substring_lookups(setlist_client, mbid):
+    client = setlist_client(total=100)
+    index = SetlistIndex()
+    index.sync(client, mbid)
+
+    assert {s.venue for s in index.query(mbid, venue="red", prefix=True)} == {"Red Rocks Amphitheatre"}
+    assert index.query(mbid, venue="rocks", prefix=True) == []
+    assert {s.venue for s in index.query(mbid, venue="rocks")} == {"Red Rocks Amphitheatre"}
+    assert {s.city for s in index.query(mbid, city="lon")} == {"London"}
+    assert all(s.tour.startswith("World Tour") for s in index.query(mbid, tour="world", prefix=True))
+
+
+def test_year_and_month_lookup_is_newest_first(setlist_client, mbid):
+    client = setlist_client(total=100)
+    index = SetlistIndex()
+    index.sync(client, mbid)
+
+    results = index.query(mbid, year=2025, month=5)
+
+    assert results and all(s.date.endswith("-05-2025") for s in results)
+    assert [s.formatted_date for s in results] == sorted((s.formatted_date for s in results), reverse=True)
+
+
+def test_unfiltered_browse_stops_at_limit(setlist_client, mbid):
+    client = setlist_client(total=400)
+    index = SetlistIndex(backfill_pages=10)
+
+    first = index.browse(client, mbid, limit=40)
+    second = index.browse(client, mbid, limit=40)
+
+    assert sorted(client.request_handler.pages) == [1, 2]
+    assert [s.id for s in first] == [s.id for s in second]
+
+
+def browse_until_complete(index, client, mbid, rounds = 10):
+    for _ in range(rounds):
+        index.browse(client, mbid)
+        if index.sync_state(mbid)["complete"]:
+            break
+    return {s.id for s in index.query(mbid)}
+
+
+def test_setlists_published_mid_backfill_do_not_stall_it(setlist_client, mbid):
+    client = setlist_client(total=100)
+    upstream = client.request_handler
+    index = SetlistIndex(backfill_pages=3)
+
+    index.browse(client, mbid)
+    upstream.publish()
+    indexed = browse_until_complete(index, client, mbid)
+
+    assert indexed == upstream.ids()
+    assert upstream.pages.count(4) <= 2 and len(upstream.pages) <= 9
+
+
+def test_setlists_deleted_mid_backfill_are_not_skipped(setlist_client, mbid):
+    client = setlist_client(total=100)
+    upstream = client.request_handler
+    index = SetlistIndex(backfill_pages=3)
+
+    index.browse(client, mbid)
+    del upstream.setlists[5:7]
+    indexed = browse_until_complete(index, client, mbid)
+
+    assert upstream.ids() <= indexed
+    assert index.sync_state(mbid)["complete"]
+
+
+def test_indexes_without_a_backfill_position_are_migrated(tmp_path, setlist_client, mbid):
+    path = str(tmp_path / "index.sqlite3")
+    index = SetlistIndex(path, backfill_pages=2)
+    index.sync(setlist_client(total=100), mbid)
+    index.conn.execute("ALTER TABLE artist_sync DROP COLUMN backfilled")
+    index.close()
+
+    state = SetlistIndex(path).sync_state(mbid)
+
+    assert state["backfilled"] == state["count"] == 40
+
+
+def test_backfill_keeps_several_pages_in_flight(setlist_client, mbid):
+    client = setlist_client(total=400, latency=0.02)
+    index = SetlistIndex(backfill_pages=7, prefetch=3)
+
+    index.browse(client, mbid, year="2023")
+
+    assert sorted(client.request_handler.pages) == list(range(1, 8))
+    assert client.request_handler.max_in_flight == 3
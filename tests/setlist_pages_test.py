@@ -0,0 +1,24 @@
+def test_year_filter_stops_once_pages_are_older(setlist_client, mbid):
+    client = setlist_client(total=400)
+
+    results = list(client.iter_artist_setlists_filtered(mbid, page_limit=20, year="2025", prefetch=1))
+
+    assert results and all(s.formatted_date.year == 2025 for s in results)
+    assert max(client.request_handler.pages) < 20
+
+
+def test_results_keep_newest_first_order_across_prefetched_pages(setlist_client, mbid):
+    client = setlist_client(total=400)
+
+    results = client.get_artist_setlists_filtered(mbid, page_limit=5)
+
+    assert len(results) == 100
+    dates = [s.formatted_date for s in results]
+    assert dates == sorted(dates, reverse=True)
+
+
+def test_event_dates_are_parsed_day_first(setlist_client, mbid):
+    setlist = setlist_client().get_artist_setlists(mbid)[0]
+
+    assert setlist.date == "01-06-2025"
+    assert (setlist.formatted_date.month, setlist.formatted_date.day) == (6, 1)
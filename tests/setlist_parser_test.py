@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from api.serialization import iter_array_items
+from api.setlistfm import DataParser
+
+
+def test_iter_setlist_search_from_raw_body_matches_decoded_page(make_setlist_page):
+    page = make_setlist_page("0123456789ab", 1)
+    raw = json.dumps(page, indent=2).encode()
+
+    assert list(DataParser.iter_setlist_search(raw)) == DataParser.parse_setlist_search(page)
+    assert list(DataParser.iter_setlist_search(page)) == DataParser.parse_setlist_search(page)
+
+
+def test_raw_pages_are_decoded_one_setlist_at_a_time(make_setlist_page):
+    page = json.dumps(make_setlist_page("0123456789ab", 1))
+    truncated = page[:len(page) // 2]
+
+    setlists = DataParser.iter_setlist_search(truncated)
+    assert next(setlists).id == "012345000000"
+    with pytest.raises(ValueError):
+        list(setlists)
+
+
+def test_iter_array_items_skips_other_keys_and_handles_empty_arrays():
+    body = b'{"type": "setlists", "nested": {"setlist": [0]}, "setlist": [{"id": 1}, {"id": 2}], "total": 2}'
+
+    assert list(iter_array_items(body, "setlist")) == [{"id": 1}, {"id": 2}]
+    assert list(iter_array_items(b'{"setlist": []}', "setlist")) == []
+    assert list(iter_array_items(b'{"total": 0}', "setlist")) == []
+
+
+def test_null_nested_objects_fall_back_to_defaults():
+    setlist = DataParser.parse_setlist_info({"id": "s1", "venue": {"name": "Arena", "city": None}, "tour": None})
+
+    assert (setlist.artist, setlist.city, setlist.country, setlist.tour) == (
+        "Unknown Artist", "Unknown City", "Unknown Country", None
+    )
+    assert DataParser.parse_setlist_search({"setlist": None}) == []
+
+
+def test_parse_setlist_songs_numbers_sets_and_keeps_covers():
+    songs = DataParser.parse_setlist_songs({
+        "artist": {"name": "Band"},
+        "sets": {"set": [
+            {"song": [{"name": "One"}, {"name": "Two", "cover": {"name": "Other"}}]},
+            {"song": []},
+            {"encore": 1, "song": [{"name": "Three"}]},
+        ]},
+    })
+
+    assert [(s.name, s.set_number, s.position) for s in songs] == [("One", 1, 1), ("Two", 1, 2), ("Three", 3, 1)]
+    assert songs[1].original_artist == "Other" and songs[0].original_artist == "Band"
+    assert songs[2].is_encore
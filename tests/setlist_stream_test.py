@@ -0,0 +1,37 @@
+import json
+
+
+def test_plain_request_keeps_json_shape(fake_app):
+    app, _, _ = fake_app
+
+    data = app.test_client().get("/api/setlists/abc").get_json()
+
+    assert data["success"]
+    assert data["data"]["artist_image"] == "artist0.jpg"
+    assert [s["spotify_uri"] for s in data["data"]["songs"]] == [f"spotify:track:Song {n}" for n in range(5)]
+
+
+def test_ndjson_streams_song_list_then_matches(fake_app):
+    app, _, _ = fake_app
+
+    response = app.test_client().get("/api/setlists/abc", headers={"Accept": "application/x-ndjson"})
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert response.mimetype == "application/x-ndjson"
+    assert events[0]["type"] == "setlist"
+    assert [s["spotify_uri"] for s in events[0]["data"]["songs"]] == [None] * 5
+    songs = {e["index"]: e["data"] for e in events if e["type"] == "song"}
+    assert sorted(songs) == list(range(5))
+    assert songs[2]["spotify_uri"] == "spotify:track:Song 2"
+    assert events[-1]["type"] == "done" and events[-1]["resolution_id"]
+
+
+def test_event_stream_uses_sse_framing(fake_app):
+    app, _, _ = fake_app
+
+    response = app.test_client().get("/api/setlists/abc", headers={"Accept": "text/event-stream"})
+    body = response.get_data(as_text=True)
+
+    assert body.startswith("event: setlist\ndata: ")
+    assert body.count("event: song\n") == 5
+    assert body.split("\n\n")[-2].startswith("event: done\ndata: ")
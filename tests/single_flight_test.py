@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.exceptions import NotFoundError
+from api.models import Song
+from api.spotify import SpotifyAppClient
+from api.utils import CacheManager, RateLimiter, RequestHandler
+
+CALLERS = 100
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+        self.content = json.dumps(payload).encode()
+        self.headers = {}
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        pass
+
+
+class SlowSession:
+    def __init__(self, status_code = 200, payload = None, delay = 0.2):
+        self.status_code = status_code
+        self.payload = payload or {"setlist": [{"id": "63de4613"}]}
+        self.delay = delay
+        self.headers = {}
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, params = None, timeout = None, **kwargs):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return FakeResponse(self.status_code, self.payload)
+
+
+def call_concurrently(fn):
+    barrier = threading.Barrier(CALLERS)
+
+    def run():
+        barrier.wait()
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        futures = [pool.submit(run) for _ in range(CALLERS)]
+    return futures
+
+
+def make_handler(session):
+    return RequestHandler("key", RateLimiter(), CacheManager(), session=session)
+
+
+def test_identical_requests_share_one_upstream_call():
+    session = SlowSession()
+    handler = make_handler(session)
+
+    futures = call_concurrently(lambda: handler.make_request("/setlist/63de4613"))
+
+    assert session.calls == 1
+    assert all(f.result() == {"setlist": [{"id": "63de4613"}]} for f in futures)
+    assert handler.single_flight.coalesced + handler.cache.stats()["hits"] == CALLERS - 1
+
+
+def test_errors_are_shared_with_waiting_callers():
+    session = SlowSession(status_code=404)
+    handler = make_handler(session)
+
+    futures = call_concurrently(lambda: handler.make_request("/setlist/missing"))
+
+    assert session.calls == 1
+    for future in futures:
+        with pytest.raises(NotFoundError):
+            future.result()
+
+
+class SlowSpotify:
+    def search(self, q, type, limit):
+        time.sleep(0.2)
+        return {"tracks": {"items": [{
+            "uri": "spotify:track:1",
+            "name": "Song",
+            "artists": [{"id": "artist", "name": "Band"}],
+            "album": {"name": "Album", "images": []},
+        }]}}
+
+    def artists(self, artists):
+        return {"artists": [{"id": a, "images": []} for a in artists]}
+
+
+def test_identical_spotify_searches_share_one_call():
+    client = SpotifyAppClient("id", "secret", max_workers=8)
+    client.sp = SlowSpotify()
+    song = Song(name="Song", artist="Band")
+
+    futures = call_concurrently(lambda: client.search_track(song))
+
+    assert client.request_counts["search"] == 1
+    assert all(f.result()["uri"] == "spotify:track:1" for f in futures)
@@ -0,0 +1,89 @@
+from api.models import Song
+from api.track_cache import TrackResolutionCache
+
+
+def make_songs(count):
+    return [Song(name=f"Song {n}", artist="Band", position=n) for n in range(count)]
+
+
+def test_resolve_tracks_makes_one_artist_call_per_setlist(spotify_app_client):
+    client = spotify_app_client()
+
+    tracks = client.resolve_tracks(make_songs(25))
+
+    assert [t["uri"] for t in tracks] == [f"spotify:track:Song {n}" for n in range(25)]
+    assert all(t["artist_image"] == "artist0.jpg" for t in tracks)
+    assert client.request_counts["search"] == 25
+    assert client.request_counts["artists"] == 1
+
+
+def test_artist_lookups_are_batched_by_fifty_and_cached(spotify_app_client):
+    client = spotify_app_client()
+
+    ids = [f"a{n}" for n in range(120)]
+    images = client.get_artist_images(ids)
+    assert client.request_counts["artists"] == 3
+    assert images["a119"] == "a119.jpg"
+
+    client.get_artist_images(ids)
+    client.search_track(Song(name="Song 1", artist="Band"))
+    assert client.request_counts["artists"] == 4
+
+
+def test_search_track_reuses_cached_artist_image(spotify_app_client):
+    client = spotify_app_client()
+
+    for song in make_songs(5):
+        assert client.search_track(song)["artist_image"] == "artist0.jpg"
+
+    assert client.request_counts["artists"] == 1
+
+
+def test_track_cache_is_consulted_before_search(spotify_app_client):
+    cache = TrackResolutionCache()
+    songs = make_songs(10)
+
+    spotify_app_client(track_cache=cache).resolve_tracks(songs)
+    client = spotify_app_client(track_cache=cache)
+    tracks = client.resolve_tracks(songs)
+
+    assert client.request_counts["search"] == 0
+    assert tracks[3]["uri"] == "spotify:track:Song 3"
+    assert tracks[3]["artist_image"] == "artist0.jpg"
+
+
+def test_iter_resolve_tracks_covers_every_song_including_duplicates(spotify_app_client):
+    client = spotify_app_client()
+    songs = make_songs(10) + [Song(name="Song 3", artist="Band", position=10)]
+
+    results = dict(client.iter_resolve_tracks(songs))
+
+    assert sorted(results) == list(range(11))
+    assert results[10]["uri"] == results[3]["uri"] == "spotify:track:Song 3"
+    assert all(t["artist_image"] == "artist0.jpg" for t in results.values())
+    assert client.request_counts["search"] == 10
+    assert client.request_counts["artists"] == 1
+
+
+class EmptySpotify:
+    def search(self, q, type, limit):
+        return {"tracks": {"items": []}}
+
+    def artists(self, artists):
+        return {"artists": [None for _ in artists]}
+
+
+def test_empty_searches_and_unknown_artists_are_not_repeated(spotify_app_client):
+    client = spotify_app_client(EmptySpotify())
+    song = Song(name="Unreleased", artist="Band")
+
+    assert client.search_track(song) is None
+    searches = client.request_counts["search"]
+    assert client.search_track(song) is None
+
+    assert client.request_counts["search"] == searches
+    assert client.negative_hits["search"] == searches
+
+    assert client.get_artist_images(["gone"]) == {"gone": None}
+    assert client.get_artist_images(["gone"]) == {"gone": None}
+    assert client.request_counts["artists"] == 1
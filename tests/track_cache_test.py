@@ -0,0 +1,65 @@
+import time
+
+from api.track_cache import MISSING, TrackResolutionCache, normalize_key
+
+
+def test_normalize_key_ignores_case_and_spacing():
+    assert normalize_key("  Hey  Jude ", "The BEATLES") == normalize_key("hey jude", "the beatles")
+
+
+def test_hits_misses_and_negative_entries(tmp_path):
+    cache = TrackResolutionCache(str(tmp_path / "tracks.sqlite3"))
+
+    assert cache.get("a") is MISSING
+    cache.set("a", {"uri": "spotify:track:a"})
+    cache.set("b", None)
+
+    assert cache.get("a") == {"uri": "spotify:track:a"}
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["negative_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_survive_restart(tmp_path):
+    path = str(tmp_path / "tracks.sqlite3")
+    cache = TrackResolutionCache(path)
+    cache.set("a", {"uri": "spotify:track:a"})
+    cache.close()
+
+    assert TrackResolutionCache(path).get("a") == {"uri": "spotify:track:a"}
+
+
+def test_expired_entries_are_misses():
+    cache = TrackResolutionCache(ttl=-1, negative_ttl=-1)
+    cache.set("a", {"uri": "spotify:track:a"})
+    cache.set("b", None)
+
+    assert cache.get("a") is MISSING
+    assert cache.get("b") is MISSING
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = TrackResolutionCache(max_entries=100, touch_interval=0)
+    for n in range(100):
+        cache.set(f"k{n}", {"n": n})
+    time.sleep(0.01)
+    cache.get("k0")
+
+    for n in range(100, 150):
+        cache.set(f"k{n}", {"n": n})
+
+    assert len(cache) <= 101
+    assert cache.get("k0") == {"n": 0}
+    assert cache.get("k1") is MISSING
+
+
+def test_recent_hits_do_not_rewrite_last_used():
+    cache = TrackResolutionCache(touch_interval=60)
+    cache.set("a", {"n": 1})
+    written = cache.conn.total_changes
+
+    for _ in range(10):
+        assert cache.get("a") == {"n": 1}
+
+    assert cache.conn.total_changes == written
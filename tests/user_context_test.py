@@ -0,0 +1,74 @@
+import threading
+import time
+
+from api.user_context import UserClientPool, token_needs_refresh
+
+
+class FakeUserClient:
+    instances = 0
+
+    def __init__(self, access_token, user_id = None):
+        FakeUserClient.instances += 1
+        self.access_token = access_token
+        self.user_id = user_id
+
+    def set_access_token(self, access_token):
+        self.access_token = access_token
+
+
+class FakeOAuth:
+    def __init__(self):
+        self.calls = 0
+
+    def refresh_access_token(self, refresh_token):
+        self.calls += 1
+        time.sleep(0.05)
+        return {"access_token": "new", "refresh_token": refresh_token, "expires_at": time.time() + 3600}
+
+
+def test_pool_reuses_one_client_per_user_and_updates_its_token():
+    pool = UserClientPool(client_factory=FakeUserClient)
+    FakeUserClient.instances = 0
+
+    first = pool.get("alice", "token-1")
+    second = pool.get("alice", "token-2")
+    other = pool.get("bob", "token-3")
+
+    assert first is second and first is not other
+    assert first.access_token == "token-2"
+    assert first.user_id == "alice"
+    assert FakeUserClient.instances == 2
+
+
+def test_least_recently_used_users_are_evicted():
+    pool = UserClientPool(max_users=2, client_factory=FakeUserClient)
+    alice = pool.get("alice", "t")
+    pool.get("bob", "t")
+    pool.get("alice", "t")
+    pool.get("carol", "t")
+
+    assert pool.get("alice", "t") is alice
+    assert len(pool.clients) == 2
+
+
+def test_token_needs_refresh_only_near_expiry():
+    now = time.time()
+    assert token_needs_refresh({"refresh_token": "r", "expires_at": now + 30})
+    assert not token_needs_refresh({"refresh_token": "r", "expires_at": now + 600})
+    assert not token_needs_refresh({"expires_at": now - 10})
+
+
+def test_concurrent_refreshes_share_one_call():
+    pool = UserClientPool(client_factory=FakeUserClient)
+    oauth = FakeOAuth()
+    token = {"refresh_token": "r", "expires_at": time.time()}
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(pool.refresh(token, oauth))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert oauth.calls == 1
+    assert [r["access_token"] for r in results] == ["new"] * 5